@@ -0,0 +1,66 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Nodes, PDF rendering time and PDF size of the drawings converted with and without
+baked transforms, for documents of many small transformed groups, and time to bake
+long paths with and without NumPy.
+
+    $ python benchmarks/bench_bake.py [groups]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import sys
+import time
+import timeit
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from reportlab.graphics import renderPDF  # noqa: E402
+
+from svg2rlg import bake, data_to_rlg  # noqa: E402
+from svg2rlg.optimize import count_nodes  # noqa: E402
+
+
+def make_document(groups, rotate):
+    items = []
+    for i in range(groups):
+        items.append(
+            '<g transform="translate(%d %d) scale(%s) rotate(%d)">'
+            '<path d="M0 0 L10 0 L10 10 Z"/><rect width="4" height="3"/><circle r="2"/></g>'
+            % (i % 100 * 10, i // 100 * 10, (1, 1.5)[i % 2], i % 360 if rotate else 0)
+        )
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">'
+        '<g fill="red" stroke="black">%s</g></svg>' % ''.join(items)
+    ).encode('ascii')
+
+
+def main():
+    groups = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    for rotate in (False, True):
+        data = make_document(groups, rotate)
+        for bake_transforms in (False, True):
+            drawing = data_to_rlg(data, bake_transforms=bake_transforms)
+            timer = timeit.Timer(lambda: renderPDF.drawToString(drawing), timer=time.process_time)
+            seconds = min(timer.repeat(repeat=3, number=1))
+            print("%d %s groups, bake_transforms=%-5s  %6d nodes  render %.3fs  %7d bytes" % (
+                groups, 'rotated' if rotate else 'scaled', bake_transforms, count_nodes(drawing),
+                seconds, len(renderPDF.drawToString(drawing))))
+
+    transform = (0.5, 0.8, -0.8, 0.5, 10, 20)
+    for count in (64, 512, 4096, 100000):
+        points = [float(i) for i in range(count)]
+        line = "%6d coordinates:" % count
+        for engine in ('python', 'numpy'):
+            if engine == 'numpy' and bake.numpy is None:
+                continue
+            bake.NUMPY_MIN_POINTS = 0 if engine == 'numpy' else count + 1
+            number = max(1, 200000 // count)
+            seconds = min(timeit.repeat(lambda: bake.transform_points(points, transform), number=number, repeat=3))
+            line += "  %s %8.1f us" % (engine, seconds / number * 1e6)
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
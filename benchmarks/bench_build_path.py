@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Compares the pure python and NumPy engines of pathdata.build_path on long, mostly
+relative paths like the ones found in cartographic exports, building Paths (lists)
+and CompactPaths (arrays).
+
+    $ python benchmarks/bench_build_path.py [segments ...]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import random
+import sys
+import timeit
+from os.path import dirname, join
+
+from reportlab.graphics.shapes import Path
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from svg2rlg import pathdata  # noqa: E402
+from svg2rlg.paths import CompactPath  # noqa: E402
+
+# command mixes: plain polylines, every relative command, and many small closed rings
+MIXES = [
+    ("l", "l"),
+    ("lhvcsqt", "lhvcsqt"),
+    ("rings", "lllz"),
+]
+
+
+def make_path(segments, commands, seed=0):
+    rnd = random.Random(seed)
+    parts = ["M 100 100"]
+    for i in range(segments):
+        op = commands[i % len(commands)] if commands == "lllz" else rnd.choice(commands)
+        parts.append(op + " ".join("%.3f" % rnd.uniform(-5, 5) for _ in range(pathdata.ARG_COUNT[op])))
+        if op == "z":
+            parts.append("m%.3f %.3f" % (rnd.uniform(-5, 5), rnd.uniform(-5, 5)))
+    return " ".join(parts)
+
+
+def bench(segments, repeat=3):
+    number = max(1, 100000 // segments)
+    for label, commands in MIXES:
+        ops, args = pathdata.parse_path_data(make_path(segments, commands))
+        timings = {}
+        for path_class in (Path, CompactPath):
+            for use_numpy in (False, True):
+                timings[path_class, use_numpy] = min(timeit.repeat(
+                    lambda: pathdata.build_path(path_class(), ops, args, use_numpy=use_numpy),
+                    repeat=repeat, number=number
+                )) / number
+        print("%8d segments %-8s" % (len(ops), label), "  ".join(
+            "%s python %8.2f ms  numpy %8.2f ms  x%.1f" % (
+                name, timings[path_class, False] * 1000, timings[path_class, True] * 1000,
+                timings[path_class, False] / timings[path_class, True])
+            for name, path_class in (("Path", Path), ("CompactPath", CompactPath))
+        ))
+
+
+if __name__ == '__main__':
+    if pathdata.numpy is None:
+        print("NumPy is not installed, nothing to compare")
+        sys.exit(1)
+    for n in [int(v) for v in sys.argv[1:]] or [100, 1000, 10000, 100000]:
+        bench(n)
@@ -0,0 +1,88 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Time and peak memory of converting SVG documents to PDF with a Drawing and renderPDF,
+and straight on a canvas with `data_to_pdf`.
+
+    $ python benchmarks/bench_canvas.py [shapes]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import gc
+import glob
+import io
+import sys
+import time
+import tracemalloc
+from os.path import basename, dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from reportlab.graphics import renderPDF  # noqa: E402
+
+from svg2rlg import data_to_pdf, data_to_rlg  # noqa: E402
+
+SAMPLES = join(dirname(__file__), '..', 'tests', 'samples', 'misc', '*.svg')
+
+
+def make_document(shapes):
+    items = []
+    for i in range(shapes):
+        x, y = i % 200 * 5, i // 200 * 5
+        items.append(
+            '<g transform="translate(%d %d)"><path d="M0 0 L4 0 L4 4 C2 5 1 5 0 4 Z"/>'
+            '<circle cx="2" cy="2" r="1" fill="white"/></g>' % (x, y)
+        )
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">'
+        '<g fill="navy" stroke="black" stroke-width="0.2">%s</g></svg>' % ''.join(items)
+    ).encode('ascii')
+
+
+def via_drawing(data):
+    return renderPDF.drawToString(data_to_rlg(data))
+
+
+def via_canvas(data):
+    out = io.BytesIO()
+    data_to_pdf(data, out)
+    return out.getvalue()
+
+
+def measure(convert, data, repeat=3):
+    """
+    (seconds, peak bytes) of `convert(data)`
+    """
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.process_time()
+        convert(data)
+        seconds.append(time.process_time() - start)
+    gc.collect()
+    tracemalloc.start()
+    convert(data)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return min(seconds), peak
+
+
+def report(name, data):
+    drawing = measure(via_drawing, data)
+    canvas = measure(via_canvas, data)
+    print("%-20s time %7.3f -> %7.3fs (%4.2fx)   peak %9.1f -> %9.1f KiB (%4.1fx)" % (
+        name, drawing[0], canvas[0], drawing[0] / canvas[0],
+        drawing[1] / 1024.0, canvas[1] / 1024.0, drawing[1] / float(canvas[1]),
+    ))
+
+
+def main():
+    shapes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for path in sorted(glob.glob(SAMPLES)):
+        with open(path, 'rb') as f:
+            report(basename(path), f.read())
+    report("%d groups" % shapes, make_document(shapes))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Memory of the drawings converted from the bundled samples, and from a document with
+millions of coordinates, with list based and with compact (array based) paths.
+
+    $ python benchmarks/bench_compact_paths.py [coordinates]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import glob
+import gc
+import sys
+import tracemalloc
+from os.path import basename, dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from svg2rlg import data_to_rlg  # noqa: E402
+
+SAMPLES = join(dirname(__file__), '..', 'tests', 'samples', 'misc', '*.svg')
+
+
+def make_document(coordinates, per_path=10000):
+    paths = []
+    for start in range(0, coordinates // 2, per_path // 2):
+        segments = range(start, min(start + per_path // 2, coordinates // 2))
+        d = 'M0 0 ' + ' '.join('L%d.5 %d.25' % (i % 1000, (i * 7) % 1000) for i in segments)
+        paths.append('<path d="%s"/>' % d)
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">'
+        '<g fill="none" stroke="black">%s</g></svg>' % ''.join(paths)
+    ).encode('ascii')
+
+
+def measure(data, compact_paths):
+    """
+    (retained, peak) bytes allocated while converting `data`; retained is what the
+    drawing holds on to
+    """
+    gc.collect()
+    tracemalloc.start()
+    drawing = data_to_rlg(data, compact_paths=compact_paths)
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del drawing
+    return retained, peak
+
+
+def report(name, data):
+    lists = measure(data, compact_paths=False)
+    arrays = measure(data, compact_paths=True)
+    print("%-24s retained %9.1f -> %9.1f KiB (%4.1fx)   peak %9.1f -> %9.1f KiB" % (
+        name, lists[0] / 1024.0, arrays[0] / 1024.0, lists[0] / float(arrays[0]),
+        lists[1] / 1024.0, arrays[1] / 1024.0,
+    ))
+
+
+def main():
+    coordinates = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    for path in sorted(glob.glob(SAMPLES)):
+        with open(path, 'rb') as f:
+            report(basename(path), f.read())
+    report("%d coordinates" % coordinates, make_document(coordinates))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Shapes, memory and PDF size and rendering time of a cropped export of a large sheet,
+whose view box shows a tenth of it, converted without and with viewport culling.
+
+    $ python benchmarks/bench_cull.py [tiles]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import sys
+import time
+import timeit
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from lxml import etree  # noqa: E402
+from reportlab.graphics import renderPDF  # noqa: E402
+
+from svg2rlg import render  # noqa: E402
+from svg2rlg.optimize import count_nodes  # noqa: E402
+
+
+def make_document(tiles):
+    """
+    A sheet of `tiles` x `tiles` tiles of 100x100, the view box showing about a tenth of it
+    """
+    items = []
+    for i in range(tiles):
+        for j in range(tiles):
+            items.append(
+                '<g transform="translate(%d %d)"><rect width="90" height="90" fill="#ccc"/>'
+                '<path d="M5 5 L85 5 L85 85 L5 85 Z M20 20 L70 70" stroke="black"/></g>' % (i * 100, j * 100)
+            )
+    side = tiles * 100 * 0.316
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="%d" viewBox="0 0 %d %d">%s</svg>'
+        % (side, side, side, side, ''.join(items))
+    ).encode('ascii')
+
+
+def main():
+    tiles = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    svg = etree.fromstring(make_document(tiles))
+    for cull in (False, True):
+        renderer = render.SvgRenderer(cull=cull)
+        start = time.process_time()
+        drawing = renderer.render(svg)
+        convert = time.process_time() - start
+        timer = timeit.Timer(lambda: renderPDF.drawToString(drawing), timer=time.process_time)
+        seconds = min(timer.repeat(repeat=3, number=1))
+        stats = renderer.stats.get('cull')
+        print("cull=%-5s  %6d nodes  convert %.3fs  render %.3fs  %8d PDF bytes  %s" % (
+            cull, count_nodes(drawing), convert, seconds, len(renderPDF.drawToString(drawing)),
+            "%d culled, ~%d KiB" % (stats.culled, stats.bytes // 1024) if stats else ''))
+        drawing = None  # not to slow the next conversion's garbage collections down
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Time of getting the primitives of SVG documents, with their absolute transforms and
+styles, by converting to a Drawing and walking it and by converting to a display list;
+time of going over them again, and size of the Drawing and of the list pickled.
+
+    $ python benchmarks/bench_display_list.py [shapes]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import gc
+import glob
+import pickle
+import sys
+import time
+from os.path import basename, dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from reportlab.graphics.shapes import Group, mmult  # noqa: E402
+
+from svg2rlg import data_to_display_list, data_to_rlg  # noqa: E402
+from svg2rlg.optimize import IDENTITY  # noqa: E402
+
+SAMPLES = join(dirname(__file__), '..', 'tests', 'samples', 'misc', '*.svg')
+
+
+def make_document(shapes):
+    items = []
+    for i in range(shapes):
+        x, y = i % 200 * 5, i // 200 * 5
+        items.append(
+            '<g transform="translate(%d %d)"><path d="M0 0 L4 0 L4 4 C2 5 1 5 0 4 Z"/>'
+            '<circle cx="2" cy="2" r="1" fill="white"/></g>' % (x, y)
+        )
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">'
+        '<g fill="navy" stroke="black" stroke-width="0.2">%s</g></svg>' % ''.join(items)
+    ).encode('ascii')
+
+
+def walk(shape, transform, out):
+    # what a consumer of a Drawing does: compose the transforms, read the styles
+    if isinstance(shape, Group):
+        transform = mmult(transform, shape.transform)
+        for child in shape.contents:
+            walk(child, transform, out)
+        return
+    out.append((shape, getattr(shape, 'fillColor', None), getattr(shape, 'strokeColor', None),
+                getattr(shape, 'strokeWidth', None), transform))
+    return out
+
+
+def iterate(display_list):
+    out = []
+    for command in display_list.commands:
+        out.append((command, command.fill, command.transform))
+    return out
+
+
+def measure(function, argument, repeat=3):
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.process_time()
+        function(argument)
+        seconds.append(time.process_time() - start)
+    return min(seconds)
+
+
+def report(name, data):
+    drawing = data_to_rlg(data)
+    display_list = data_to_display_list(data)
+    convert = (
+        measure(lambda data: walk(data_to_rlg(data), IDENTITY, []), data),
+        measure(lambda data: iterate(data_to_display_list(data)), data),
+    )
+    again = measure(lambda drawing: walk(drawing, IDENTITY, []), drawing), measure(iterate, display_list)
+    size = (
+        len(pickle.dumps(drawing, pickle.HIGHEST_PROTOCOL)),
+        len(pickle.dumps(display_list, pickle.HIGHEST_PROTOCOL)),
+    )
+    print("%-16s convert %6.3f -> %6.3fs (%4.2fx)  again %6.4f -> %6.4fs (%4.1fx)  pickled %7.1f -> %7.1f KiB (%3.1fx)" % (
+        name, convert[0], convert[1], convert[0] / convert[1], again[0], again[1], again[0] / again[1],
+        size[0] / 1024.0, size[1] / 1024.0, size[0] / float(size[1]),
+    ))
+
+
+def main():
+    shapes = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    for path in sorted(glob.glob(SAMPLES)):
+        with open(path, 'rb') as f:
+            report(basename(path), f.read())
+    report("%d groups" % shapes, make_document(shapes))
+
+
+if __name__ == '__main__':
+    main()
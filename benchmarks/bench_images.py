@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Cost of referencing the same image file many times: validating it with PDFImage at
+every reference, as converting used to, against the remembered `images.FileImage`;
+and time of converting and drawing documents of many labels showing the same photo.
+
+    $ python benchmarks/bench_images.py [references]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from PIL import Image as PILImage  # noqa: E402
+from reportlab.graphics import renderPDF  # noqa: E402
+from reportlab.pdfgen.pdfimages import PDFImage  # noqa: E402
+
+from svg2rlg import data_to_rlg, images  # noqa: E402
+
+
+def make_photo(path, format):
+    # noise doesn't compress, like a photo
+    PILImage.frombytes('RGB', (320, 240), os.urandom(320 * 240 * 3)).save(path, format)
+
+
+def make_document(name, labels):
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        'width="1000" height="1000">%s</svg>' % ''.join(
+            '<image x="%d" y="%d" width="40" height="30" xlink:href="%s"/>' % (i % 25 * 40, i // 25 * 30, name)
+            for i in range(labels))
+    )
+
+
+def per_reference(function, path, references):
+    start = time.perf_counter()
+    for _ in range(references):
+        function(path)
+    return (time.perf_counter() - start) / references
+
+
+def main():
+    references = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    directory = tempfile.mkdtemp()
+    try:
+        for format, name in (('JPEG', 'photo.jpg'), ('PNG', 'photo.png')):
+            path = join(directory, name)
+            make_photo(path, format)
+            validate = per_reference(lambda path: PDFImage(path, 0, 0), path, 20)
+            cached = per_reference(images.open_image_file, path, references)
+            print("%-10s per reference: PDFImage %8.3f ms -> cached %8.4f ms (%.0fx)" % (
+                name, validate * 1000, cached * 1000, validate / cached))
+
+            document = make_document(name, references)
+            start = time.perf_counter()
+            drawing = data_to_rlg(document, file_path=join(directory, 'labels.svg'))
+            converted = time.perf_counter() - start
+            start = time.perf_counter()
+            renderPDF.drawToFile(drawing, io.BytesIO())
+            drawn = time.perf_counter() - start
+            print("%-10s %d labels: converted in %.3fs, drawn in %.3fs" % (name, references, converted, drawn))
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == '__main__':
+    main()
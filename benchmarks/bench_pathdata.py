@@ -0,0 +1,53 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Compares the single pass path data parser against the old normalize_svg_path/split_floats
+approach, on the `d` attributes of the bundled samples.
+
+    $ python benchmarks/bench_pathdata.py [file.svg ...]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import sys
+import timeit
+from os.path import dirname, join
+
+from lxml import etree
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from svg2rlg import utils, pathdata  # noqa: E402
+
+SAMPLES = join(dirname(__file__), '..', 'tests', 'samples', 'misc')
+DEFAULT_FILES = [join(SAMPLES, 'tiger.svg'), join(SAMPLES, 'newlion.svg')]
+
+
+def legacy(d):
+    # what convert_path used to do: normalize, then walk the nested lists pairwise
+    for op, nums in utils.pairwise(utils.normalize_svg_path(d)):
+        pass
+
+
+def single_pass(d):
+    pathdata.parse_path_data(d)
+
+
+def path_data(file_name):
+    tree = etree.parse(file_name)
+    return [n.get('d') for n in tree.iter() if utils.node_name(n) == 'path' and n.get('d')]
+
+
+def bench(file_name, repeat=5, number=20):
+    data = path_data(file_name)
+    print("%s: %d paths, %d bytes of path data" % (
+        os.path.basename(file_name), len(data), sum(len(d) for d in data)
+    ))
+    for label, func in (("normalize_svg_path", legacy), ("parse_path_data", single_pass)):
+        best = min(timeit.repeat(lambda: [func(d) for d in data], repeat=repeat, number=number))
+        print("  %-20s %8.2f ms/document" % (label, best / number * 1000))
+
+
+if __name__ == '__main__':
+    for fn in sys.argv[1:] or DEFAULT_FILES:
+        bench(fn)
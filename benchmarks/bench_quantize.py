@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+PDF size (compressed and not) and PDF writing time of the bundled samples, converted
+without and with quantized coordinates.
+
+    $ python benchmarks/bench_quantize.py [digits]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import glob
+import sys
+import time
+import timeit
+from os.path import basename, dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from reportlab import rl_config  # noqa: E402
+from reportlab.graphics import renderPDF  # noqa: E402
+
+from svg2rlg import data_to_rlg  # noqa: E402
+
+SAMPLES = join(dirname(__file__), '..', 'tests', 'samples', 'misc', '*.svg')
+
+
+def write(drawing, compression):
+    """
+    (bytes, seconds) of the PDF of `drawing`
+    """
+    saved = rl_config.pageCompression
+    rl_config.pageCompression = compression
+    try:
+        timer = timeit.Timer(lambda: renderPDF.drawToString(drawing), timer=time.process_time)
+        seconds = min(timer.repeat(repeat=5, number=1))
+        return len(renderPDF.drawToString(drawing)), seconds
+    finally:
+        rl_config.pageCompression = saved
+
+
+def main():
+    digits = int(sys.argv[1]) if len(sys.argv) > 1 else 2
+    print("%-16s %17s %17s %21s" % ('', 'compressed bytes', 'plain bytes', 'write ms'))
+    totals = [0] * 6
+    for path in sorted(glob.glob(SAMPLES)):
+        with open(path, 'rb') as f:
+            data = f.read()
+        full = data_to_rlg(data)
+        quantized = data_to_rlg(data, quantize_digits=digits)
+        values = [
+            write(full, 1)[0], write(quantized, 1)[0],
+            write(full, 0)[0], write(quantized, 0)[0],
+        ]
+        values += [write(full, 1)[1] * 1000, write(quantized, 1)[1] * 1000]
+        totals = [t + v for t, v in zip(totals, values)]
+        print("%-16s %8d %8d %8d %8d %10.2f %10.2f" % tuple([basename(path)] + values))
+    print("%-16s %8d %8d %8d %8d %10.2f %10.2f" % tuple(['total'] + totals))
+
+
+if __name__ == '__main__':
+    main()
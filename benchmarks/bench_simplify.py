@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Vertices, PDF rendering time and PDF size of a map like document of long noisy paths,
+converted without and with path simplification at a few tolerances.
+
+    $ python benchmarks/bench_simplify.py [paths] [vertices per path]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import math
+import random
+import sys
+import time
+import timeit
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from lxml import etree  # noqa: E402
+from reportlab.graphics import renderPDF  # noqa: E402
+
+from svg2rlg import render  # noqa: E402
+
+
+def make_document(paths, vertices):
+    rnd = random.Random(1)
+    items = []
+    for k in range(paths):
+        points = []
+        for i in range(vertices):
+            a = i * 6.0 / vertices + k
+            points.append('%.3f %.3f' % (
+                500 + 300 * math.cos(a) + rnd.uniform(-0.05, 0.05),
+                500 + 300 * math.sin(a) * math.cos(a * k) + rnd.uniform(-0.05, 0.05),
+            ))
+        items.append('<path d="M%s"/>' % ' L'.join(points))
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">'
+        '<g fill="none" stroke="black">%s</g></svg>' % ''.join(items)
+    ).encode('ascii')
+
+
+def main():
+    paths = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    vertices = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    svg = etree.fromstring(make_document(paths, vertices))
+    for tolerance in (None, 0.05, 0.25, 1.0):
+        renderer = render.SvgRenderer(simplify_tolerance=tolerance)
+        start = time.process_time()
+        drawing = renderer.render(svg)
+        convert = time.process_time() - start
+        timer = timeit.Timer(lambda: renderPDF.drawToString(drawing), timer=time.process_time)
+        seconds = min(timer.repeat(repeat=3, number=1))
+        stats = renderer.stats.get('simplify')
+        print("tolerance %-5s  %7d vertices removed  convert %.3fs  render %.3fs  %8d bytes" % (
+            tolerance, stats.removed if stats else 0, convert, seconds,
+            len(renderPDF.drawToString(drawing))))
+
+
+if __name__ == '__main__':
+    main()
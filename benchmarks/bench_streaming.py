@@ -0,0 +1,71 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Peak memory and time of converting a large document loaded whole, and streamed.
+
+Each conversion runs in a fresh process, as lxml allocates outside of the Python heap
+and the peak resident set size is what matters.
+
+    $ python benchmarks/bench_streaming.py [shapes]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+
+def write_document(fh, shapes):
+    """
+    A map-like export: many shapes carrying metadata that is not rendered
+    """
+    fh.write(b'<svg xmlns="http://www.w3.org/2000/svg" width="1000" height="1000">\n')
+    for i in range(shapes):
+        if i % 1000 == 0:
+            fh.write(b'<g class="layer" stroke="black" stroke-width="0.1">\n')
+        x, y = i % 1000, (i // 1000) % 1000
+        fh.write((
+            '<path d="M%d %d h1 v1 h-1 z" fill="#%06x" data-feature-id="feature-%d" '
+            'data-source="survey-2017/tile-%d"><title>Feature %d, parcel %d of tile %d</title></path>\n'
+            % (x, y, i % 0xffffff, i, i // 1000, i, i % 1000, i // 1000)
+        ).encode('ascii'))
+        if i % 1000 == 999 or i == shapes - 1:
+            fh.write(b'</g>\n')
+    fh.write(b'</svg>\n')
+
+
+def convert(path, streaming):
+    from svg2rlg import file_to_rlg
+
+    start = time.time()
+    file_to_rlg(path, streaming=streaming)
+    elapsed = time.time() - start
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KiB on Linux
+    print("%-10s %7d ms  peak RSS %8.1f MiB" % ("streamed" if streaming else "whole", elapsed * 1000, peak / 1024.0))
+
+
+def main():
+    if len(sys.argv) > 2 and sys.argv[1] == '--convert':
+        convert(sys.argv[2], streaming=sys.argv[3] == 'streaming')
+        return
+
+    shapes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    fd, path = tempfile.mkstemp(suffix='.svg')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            write_document(fh, shapes)
+        print("%d shapes, %.1f MiB" % (shapes, os.path.getsize(path) / 1024.0 ** 2))
+        for mode in ('whole', 'streaming'):
+            subprocess.check_call([sys.executable, __file__, '--convert', path, mode])
+    finally:
+        os.remove(path)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*
+"""
+Memory and time of converting a document with many identically styled shapes, with
+and without the shared (interned) colours and resolved styles.
+
+    $ python benchmarks/bench_styles.py [shapes]
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import copy
+import sys
+import time
+import tracemalloc
+from os.path import dirname, join
+
+sys.path.insert(0, join(dirname(__file__), '..'))
+
+from svg2rlg import attributes, data_to_rlg  # noqa: E402
+from svg2rlg.shapes import ShapeConverter  # noqa: E402
+
+
+def make_document(shapes):
+    items = []
+    for i in range(shapes):
+        x, y = i % 200, i // 200
+        if i % 2:
+            items.append('<rect x="%d" y="%d" width="1" height="1"/>' % (x, y))
+        else:
+            items.append('<path d="M%d %d h1 v1 h-1 z" style="stroke-width: 0.1"/>' % (x, y))
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" width="200" height="%d">'
+        '<g style="fill: #336699; fill-opacity: 0.8; stroke: rgb(10, 20, 30)">%s</g>'
+        '</svg>' % (shapes // 200 + 1, ''.join(items))
+    ).encode('ascii')
+
+
+def measure(data):
+    start = time.time()
+    data_to_rlg(data)
+    elapsed = time.time() - start
+
+    # tracing slows conversion down a lot, so it is timed separately
+    tracemalloc.start()
+    drawing = data_to_rlg(data)
+    size, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return drawing, elapsed, size, peak
+
+
+def count_colors(drawing):
+    found = set()
+
+    def walk(node):
+        for child in getattr(node, 'contents', []):
+            walk(child)
+        for name in ('fillColor', 'strokeColor'):
+            if getattr(node, name, None) is not None:
+                found.add(id(getattr(node, name)))
+
+    walk(drawing)
+    return len(found)
+
+
+def unshared():
+    """
+    Every shape converts its own style and gets its own colour objects, as before
+    interning was added.
+    """
+    original = ShapeConverter.resolve_style
+
+    def resolve_style(self, style, text=False, only_explicit=False):
+        self._resolved_styles = {}
+        return tuple((k, copy.copy(v)) for k, v in original(self, style, text, only_explicit))
+
+    ShapeConverter.resolve_style = resolve_style
+    attributes.intern_color = lambda color: color
+
+
+def report(label, data):
+    drawing, elapsed, size, peak = measure(data)
+    print("%-12s %7.0f ms  retained %8.1f KiB  peak %8.1f KiB  colour objects %d" % (
+        label, elapsed * 1000, size / 1024., peak / 1024., count_colors(drawing)
+    ))
+    return drawing
+
+
+if __name__ == '__main__':
+    shapes = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    data = make_document(shapes)
+    print("%d identically styled shapes" % shapes)
+    report("interned", data)
+    unshared()
+    report("unshared", data)
@@ -38,6 +38,9 @@ setup(
     name='svg2rlg',
     version=get_version(),
     install_requires=install_requires,
+    extras_require={
+        'numpy': ['numpy'],
+    },
     author='Sebastian Wehrmann, Dinu Gherman, Deeplook, ScanTrust',
     author_email='sebastian.wehrmann@icloud.com, gherman@darwin.in-berlin.de, andrew.backer@scantrust.com',
     url='https://github.com/ScanTrust/svg2rlg',
@@ -2,7 +2,8 @@
 from __future__ import print_function, absolute_import, unicode_literals
 
 from svg2rlg.utils import monkeypatch_reportlab
-from .api import data_to_rlg, file_to_rlg
+from .api import data_to_rlg, file_to_rlg, data_to_pdf, file_to_pdf, data_to_display_list, file_to_display_list, convert_many
+from .cache import DrawingCache, DiskCache
 
 __version__ = "1.2.3"
 __license__ = "LGPL 3"
@@ -14,6 +15,13 @@ VERISON = __version__
 __all__ = [
     'data_to_rlg',
     'file_to_rlg',
+    'data_to_pdf',
+    'file_to_pdf',
+    'data_to_display_list',
+    'file_to_display_list',
+    'convert_many',
+    'DrawingCache',
+    'DiskCache',
     'VERSION'
 ]
 
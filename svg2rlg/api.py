@@ -17,37 +17,160 @@ from __future__ import print_function, absolute_import, unicode_literals
 import logging
 
 from . import utils, render
+from .cache import cache_key
 from lxml import etree
+from reportlab.graphics.shapes import STATE_DEFAULTS
+from reportlab.pdfgen.canvas import Canvas
 
 _logger = logging.getLogger(__name__)
 
 
-def file_to_rlg(path_or_file):
+def file_to_rlg(path_or_file, streaming=False, cache=None, **options):
     """
     Converts an SVG file to an RLG Drawing object.
+
+    With `streaming`, the document is converted while it is read instead of being
+    loaded whole first, see `render.StreamingSvgRenderer`.  See `data_to_rlg` for `cache`
+    and `options`.
     :rtype: reportlab.graphics.shapes.Drawing
     """
 
+    if streaming and cache is None:
+        if utils.is_string(path_or_file):
+            with open(path_or_file, 'rb') as f:
+                return _stream_to_rlg(utils.decompress_fp(f), file_path=path_or_file, **options)
+        return _stream_to_rlg(path_or_file, file_path=path_or_file, **options)
+
     data = utils.read_any(path_or_file)
-    return data_to_rlg(data, file_path=path_or_file)
+    return data_to_rlg(data, file_path=path_or_file, streaming=streaming, cache=cache, **options)
 
 
-def data_to_rlg(data, file_path=None):
+def data_to_rlg(data, file_path=None, streaming=False, cache=None, **options):
     """
     Converts a string representation of an xml svg document to a RLG Drawing object.
+
+    If a `cache.DrawingCache` is given, a document that has been converted before is
+    not converted again; a copy of the cached drawing is returned instead.
+
+    `options` are passed on to the renderer, see `render.SvgRenderer`:
+      compact_paths: convert paths to array backed `paths.CompactPath`s, using a
+        fraction of the memory of ReportLab's list based paths
+      optimize: collapse empty, identity and single child groups, see `optimize`
+      bake_transforms: apply group transforms to the coordinates of the shapes below
+        them, leaving mostly flat, transform free geometry, see `bake`; PDFs of the
+        drawing usually get much bigger, and don't render faster
+      simplify_tolerance: remove the path vertices within this many points of the
+        simplified outline, see `simplify`
+      quantize_digits: round coordinates, lengths and transforms to this many decimal
+        places in points, making smaller PDFs, see `quantize`
+      cull: drop the shapes lying wholly outside the view box, see `cull`
     :rtype: reportlab.graphics.shapes.Drawing
     """
     # noinspection PyUnresolvedReferences
 
+    if cache is not None:
+        key = cache_key(data, file_path, options)
+        drawing = cache.get(key)
+        if drawing is None:
+            drawing = data_to_rlg(data, file_path=file_path, streaming=streaming, **options)
+            cache.set(key, drawing)
+        return drawing
+
+    if streaming:
+        if isinstance(data, utils.TEXT_TYPE):
+            data = data.encode('utf-8')
+        return _stream_to_rlg(utils.BytesIO(data), file_path=file_path, **options)
+
+    svg = _parse(data, file_path)
+    renderer = render.SvgRenderer(file_path=file_path, **options)
+    return renderer.render(svg)
+
+
+def file_to_pdf(path_or_file, out, **options):
+    """
+    Converts an SVG file to a PDF, see `data_to_pdf`.
+    """
+    data = utils.read_any(path_or_file)
+    return data_to_pdf(data, out, file_path=path_or_file, **options)
+
+
+def data_to_pdf(data, out, file_path=None, **options):
+    """
+    Converts a string representation of an xml svg document to a PDF of one page the
+    size of its view box, written to `out`, a file name or a binary file-like object.
+
+    The shapes are drawn on the page as they are converted, without making a Drawing
+    first, see `render.CanvasRenderer`.  `options` are passed on to the renderer:
+      compact_paths: as for `data_to_rlg`
+    """
+    svg = _parse(data, file_path)
+    renderer = render.CanvasRenderer(file_path=file_path, **options)
+    box = renderer.get_viewbox(svg)
+    canvas = Canvas(
+        out, pagesize=(box.width, box.height),
+        initialFontName=STATE_DEFAULTS['fontName'], initialFontSize=STATE_DEFAULTS['fontSize'],
+    )
+    renderer.render(svg, canvas)
+    canvas.showPage()
+    canvas.save()
+
+
+def file_to_display_list(path_or_file, **options):
+    """
+    Converts an SVG file to a display list, see `data_to_display_list`.
+    :rtype: svg2rlg.displaylist.DisplayList
+    """
+    data = utils.read_any(path_or_file)
+    return data_to_display_list(data, file_path=path_or_file, **options)
+
+
+def data_to_display_list(data, file_path=None, **options):
+    """
+    Converts a string representation of an xml svg document to a flat list of draw
+    commands, with their geometry, resolved styles and absolute transforms, see
+    `displaylist`.  Lists are cheap to iterate, pickle and send to other processes.
+
+    The commands are made as the shapes are converted, without making a Drawing first,
+    see `render.DisplayListRenderer`.  `options` are passed on to the renderer:
+      compact_paths: as for `data_to_rlg`, on by default
+    :rtype: svg2rlg.displaylist.DisplayList
+    """
+    svg = _parse(data, file_path)
+    renderer = render.DisplayListRenderer(file_path=file_path, **options)
+    return renderer.render(svg)
+
+
+def _parse(data, file_path=None):
     try:
         parser = etree.XMLParser(remove_comments=True, recover=True)
-        svg = etree.fromstring(data, parser=parser)
+        return etree.fromstring(data, parser=parser)
     except Exception as exc:
         _logger.error("Failed to load input file! (%s)" % file_path)
         raise
 
-    renderer = render.SvgRenderer(file_path=file_path)
-    return renderer.render(svg)
+
+def _stream_to_rlg(fp, file_path=None, **options):
+    renderer = render.StreamingSvgRenderer(file_path=file_path, **options)
+    try:
+        return renderer.render_stream(fp)
+    except etree.XMLSyntaxError:
+        _logger.error("Failed to load input file! (%s)" % file_path)
+        raise
+
+
+def convert_many(paths_or_blobs, workers=None, chunksize=1, ordered=True, **options):
+    """
+    Converts many SVG documents (file paths, or the documents themselves as str/bytes)
+    over a pool of `workers` processes, one per CPU by default; with 0 workers they
+    are converted in this process.
+
+    Returns an iterator of `BatchResult(index, drawing, error)`, in the order of the
+    input unless `ordered` is False.  A document that fails to convert yields a result
+    with the formatted exception as `error` and does not stop the batch.  Items are
+    sent to the workers `chunksize` at a time.  `options` are as for `data_to_rlg`.
+    """
+    from . import batch
+    return batch.iter_results(paths_or_blobs, workers=workers, chunksize=chunksize, ordered=ordered, **options)
 
 
 def __minidom_parser():
@@ -3,12 +3,12 @@ from __future__ import print_function, absolute_import, unicode_literals
 
 import logging
 import re
+import weakref
 
 from reportlab.lib import colors, units
-from reportlab.pdfbase import pdfmetrics
 from reportlab.pdfgen.canvas import FILL_NON_ZERO, FILL_EVEN_ODD
 
-from . import utils, settings
+from . import colornames, fonts, utils, settings
 
 _logger = logging.getLogger(__name__)
 
@@ -144,42 +144,103 @@ def convert_fill_rule(value):
     }.get(value, '')
 
 
+# colours handed out by convert_color, shared by every shape using the same colour
+_interned_colors = weakref.WeakValueDictionary()
+
+# raw colour string -> converted colour
+_color_cache = utils.LRUCache(settings.COLOR_CACHE_SIZE)
+_MISSING = object()
+
+_RGB_FUNCTION = re.compile(r'^rgba?\((.*)\)$')
+
+
+def intern_color(color):
+    """
+    Returns the shared instance of a colour equal to `color`.  Interned colours are
+    shared between shapes and must not be modified, see `color_with_alpha`.
+    """
+    if not isinstance(color, colors.Color):
+        return color
+
+    key = (color.__class__, color.red, color.green, color.blue, color.alpha)
+    shared = _interned_colors.get(key)
+    if shared is None:
+        _interned_colors[key] = shared = color
+    return shared
+
+
+def color_with_alpha(color, alpha):
+    """
+    Returns the interned version of `color` with its alpha replaced.
+    """
+    if color.alpha == alpha:
+        return color
+    return intern_color(colors.Color(color.red, color.green, color.blue, alpha))
+
+
 def convert_color(value):
     """
-    Convert string to a RL color object.
+    Convert string to a RL color object.  The returned colours are interned and
+    must not be modified.
     :type value: str | unicode
     """
 
-    # fix it: most likely all "web colors" are allowed
-    predefined = "aqua black blue fuchsia gray green lime maroon navy "
-    predefined += "olive orange purple red silver teal white yellow "
-    predefined += "lawngreen indianred aquamarine lightgreen brown"
-
     # This needs also to lookup values like "url(#SomeName)"...
 
-    text = value
-    if not text or text == "none":
+    if not value or value == "none":
         return None
 
-    text = utils.enc(text)
+    color = _color_cache.get(value, _MISSING)
+    if color is _MISSING:
+        color = parse_color(utils.enc(value))
+        _color_cache.set(value, color)
+    return color
+
 
-    if text in predefined.split():
-        return getattr(colors, text)  # ??
-    elif text == "currentColor":
+def _color_component(text, scale):
+    """
+    A number, or a percentage of `scale`, as a fraction clamped to 0..1
+    """
+    if text.endswith('%'):
+        fraction = float(text[:-1]) / 100.0
+    else:
+        fraction = float(text) / scale
+    return min(max(fraction, 0.0), 1.0)
+
+
+def parse_color(text):
+    """
+    Parse a colour keyword, `#rgb`, `#rrggbb`, `rgb(r, g, b)` or `rgba(r, g, b, a)`
+    where the components are numbers or percentages.  Use `convert_color`, which
+    remembers the result.
+    """
+    text = text.strip()
+    if text == "currentColor":
         return "currentColor"
-    elif len(text) == 7 and text[0] == '#':
-        return colors.HexColor(text)
-    elif len(text) == 4 and text[0] == '#':
-        return colors.HexColor('#%s%s%s' % (text[1] * 2, text[2] * 2, text[3] * 2))
-    elif text.startswith('rgb') and '%' not in text:
-        t = text[3:].strip('()')
-        hex_values = [hex(int(num))[2:] for num in t.split(',')]
-        hex_values = [h.zfill(2) for h in hex_values]
-        return colors.HexColor("#%s%s%s" % tuple(hex_values))
-    elif text.startswith('rgb') and '%' in text:
-        t = text[3:].replace('%', '').strip('()')
-        tup = (int(val) / 100.0 for val in t.split(','))
-        return colors.Color(*tup)
+
+    try:
+        if text.startswith('#'):
+            digits = text[1:]
+            if len(digits) == 3:
+                digits = ''.join(c * 2 for c in digits)
+            if len(digits) == 6:
+                return intern_color(colors.HexColor(int(digits, 16)))
+
+        elif text.startswith('rgb'):
+            match = _RGB_FUNCTION.match(text)
+            if match:
+                components = match.group(1).replace(',', ' ').split()
+                if len(components) in (3, 4):
+                    rgb = [_color_component(c, 255.0) for c in components[:3]]
+                    alpha = _color_component(components[3], 1.0) if len(components) == 4 else 1
+                    return intern_color(colors.Color(rgb[0], rgb[1], rgb[2], alpha))
+
+        else:
+            rgb = colornames.COLOR_NAMES.get(text.lower())
+            if rgb is not None:
+                return intern_color(colors.Color(rgb[0] / 255.0, rgb[1] / 255.0, rgb[2] / 255.0))
+    except ValueError:
+        pass
 
     _logger.debug("Can't handle color: %s" % text)
 
@@ -202,7 +263,7 @@ def convert_dash_offset(value):
     return convert_length(value)
 
 
-def convert_font_family(value):
+def convert_font_family(value, weight='', style=''):
     """
     Converts a font-family to a standard font name, or returns the value unmodified.  PDFs are
     expected to register their own font names, and the SVG must use this exact font name as well if it
@@ -212,27 +273,17 @@ def convert_font_family(value):
     > f("'Arial-Bold'") == "Arial-Bold"
     > f("sans-serif")   == "Helvetica" (unless overidden in settings)
     > f("")             == "Helvetica" (unless overidden in settings)
+    > f("Times-Roman", "bold", "italic") == "Times-BoldItalic"
+
+    The first known family of a list such as "Verdana, sans-serif" is used.
     """
     # in svg-land, *Arial* is == 'Arial-Bold' (with the quotes)!
     # <text fill="#000000" font-family="'Arial-Bold'" font-size="14">My Bold!</text>
-    if not value:
-        return ''
-
-    value = value.replace("'", "")  # strip single quotes, e.g. 'Arial-Bold'
-
-    # todo: cache this mapping, rebuilding it each time rendering starts
-    if value in pdfmetrics.getRegisteredFontNames():
-        return value
-
-    # if this font name is already known to us, then just return it
-    if value in settings.FONT_ALIASES:
-        return settings.FONT_ALIASES[value]
-
-    if value in settings.FONT_ALIASES.values():
-        return value
-
-    # couldn't find it, so use the default font
-    return settings.DEFAULT_FONT
+    font_name = fonts.font_index.resolve(value, weight, style) if value else None
+    if font_name is None:
+        # couldn't find it, so use the default font
+        font_name = fonts.font_index.resolve(settings.DEFAULT_FONT, weight, style) or settings.DEFAULT_FONT
+    return font_name
 
 
 def parse_multi_attribute_string(line):
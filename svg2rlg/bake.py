@@ -0,0 +1,282 @@
+# -*- coding: utf-8 -*
+"""
+Transform baking: multiplies group transforms into the coordinates of the shapes below
+them, leaving flat geometry that renders without any transform.
+
+Paths, polygons, polylines and lines take any transform.  Rects, circles and ellipses
+keep their kind under the transforms that keep them axis aligned (or round), and are
+converted to paths, with the curves ReportLab would draw, under the others.  Strokes
+only scale uniformly, so a stroked shape is baked under similarity transforms (rotation,
+reflection, uniform scale and translation) only, its stroke width and dashes scaled.
+
+Shapes that can't be baked, e.g. strings under anything but a translation, or images,
+keep the transform in a group of their own.  Groups holding a clipping path stay as
+clipping scopes, without a transform.  Shapes may be shared (e.g. by <use> instances),
+so baked shapes are copies; a shape under the identity transform is kept as it is.
+
+Baking is a trade-off, not a plain gain.  It leaves fewer nodes, which is what
+consumers walking the drawing (or rasterising it without transforms) gain from, but
+ReportLab's PDF output usually gets bigger, and isn't faster to render: a shape
+repeated under many transforms compresses well in a PDF stream, while its baked
+copies all have distinct coordinates.  For 5000 small transformed groups (see
+benchmarks/bench_bake.py) the PDF grows 7-10x (25 KB -> 269 KB scaled, 76 KB ->
+548 KB rotated), rendering it takes as long when scaled and up to 15% longer when
+rotated, and `quantize` only partly makes up for it.  Leave it off for PDF output.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+import math
+from collections import namedtuple
+
+from reportlab.graphics.shapes import (
+    Circle, Ellipse, Group, Line, Path, PolyLine, Polygon, Rect, String, mmult,
+)
+from reportlab.pdfgen import pdfgeom
+
+from svg2rlg.optimize import IDENTITY, PLAIN_GROUP_ATTRIBUTES, copy_shape, is_clipping, new_group
+from svg2rlg.pathdata import OP_CLOSEPATH, OP_CURVETO, OP_LINETO, OP_MOVETO
+
+try:
+    import numpy
+except ImportError:  # optional, only used to speed up long paths
+    numpy = None
+
+_logger = logging.getLogger(__name__)
+
+# paths with fewer coordinates are transformed in pure python
+NUMPY_MIN_POINTS = 512
+
+# multiplier of the radius for the control points of rounded corners, as in pdfgen's roundRect
+_ROUND_RECT_FACTOR = 0.4472
+
+# attributes of Rect/Circle/Ellipse that are geometry, and not carried over to a path
+_GEOMETRY_ATTRIBUTES = frozenset(('x', 'y', 'width', 'height', 'rx', 'ry', 'cx', 'cy', 'r'))
+
+BakeStats = namedtuple('BakeStats', ['baked', 'kept'])
+
+
+def _close(a, b):
+    return abs(a - b) <= 1e-9 * max(1.0, abs(a), abs(b))
+
+
+def is_axis_aligned(transform):
+    return transform[1] == 0 and transform[2] == 0
+
+
+def similarity_scale(transform):
+    """
+    The scale factor of a similarity transform, or None for any other transform
+    """
+    a, b, c, d = transform[:4]
+    if (_close(a, d) and _close(b, -c)) or (_close(a, -d) and _close(b, c)):
+        return math.sqrt(abs(a * d - b * c))
+    return None
+
+
+def transform_points(points, transform):
+    """
+    Applies `transform` to a flat x, y, x, y... sequence, returning a sequence of the
+    same type (a list, or an array for compact paths).
+    """
+    a, b, c, d, e, f = transform
+    result = points[:0]
+    if numpy is not None and len(points) >= NUMPY_MIN_POINTS:
+        xy = numpy.asarray(points, dtype=float).reshape(-1, 2)
+        baked = xy.dot(numpy.array([[a, b], [c, d]])) + (e, f)
+        result.extend(baked.ravel().tolist())
+        return result
+    for x, y in zip(points[0::2], points[1::2]):
+        result.append(a * x + c * y + e)
+        result.append(b * x + d * y + f)
+    return result
+
+
+def is_stroked(shape):
+    return getattr(shape, 'strokeColor', None) is not None and getattr(shape, 'strokeWidth', 0)
+
+
+def _scale_stroke(shape, scale):
+    if scale == 1:
+        return
+    shape.__dict__['strokeWidth'] = shape.strokeWidth * scale
+    dashes = shape.__dict__.get('strokeDashArray')
+    if dashes:
+        shape.__dict__['strokeDashArray'] = [v * scale for v in dashes]
+
+
+def _as_path(shape, points, operators):
+    path = Path()
+    for name, value in shape.__dict__.items():
+        if name not in _GEOMETRY_ATTRIBUTES and name in path._attrMap:
+            path.__dict__[name] = value
+    path.__dict__['points'] = points
+    path.__dict__['operators'] = operators
+    return path
+
+
+def rect_outline(rect):
+    """
+    (points, operators) of the outline ReportLab draws for `rect`
+    """
+    x0, x1 = sorted((rect.x, rect.x + rect.width))
+    y0, y1 = sorted((rect.y, rect.y + rect.height))
+    r = rect.rx  # ReportLab draws rects with the x radius for both
+    if not r:
+        points = [x0, y0, x1, y0, x1, y1, x0, y1]
+        return points, [OP_MOVETO, OP_LINETO, OP_LINETO, OP_LINETO, OP_CLOSEPATH]
+    t = _ROUND_RECT_FACTOR * r
+    points = [
+        x0 + r, y0, x1 - r, y0, x1 - t, y0, x1, y0 + t, x1, y0 + r,
+        x1, y1 - r, x1, y1 - t, x1 - t, y1, x1 - r, y1,
+        x0 + r, y1, x0 + t, y1, x0, y1 - t, x0, y1 - r,
+        x0, y0 + r, x0, y0 + t, x0 + t, y0, x0 + r, y0,
+    ]
+    operators = [OP_MOVETO] + [OP_LINETO, OP_CURVETO] * 4 + [OP_CLOSEPATH]
+    return points, operators
+
+
+def ellipse_outline(cx, cy, rx, ry):
+    """
+    (points, operators) of the outline ReportLab draws for an ellipse
+    """
+    curves = pdfgeom.bezierArc(cx - rx, cy - ry, cx + rx, cy + ry, 0, 360)
+    points = list(curves[0][:2])
+    for curve in curves:
+        points.extend(curve[2:])
+    return points, [OP_MOVETO] + [OP_CURVETO] * len(curves) + [OP_CLOSEPATH]
+
+
+def bake_shape(shape, transform):
+    """
+    A copy of `shape` with `transform` applied to its coordinates, or None if the
+    transform can't be baked into it.
+    """
+    if isinstance(shape, Group):
+        return None
+    stroke_scale = similarity_scale(transform)
+    if is_stroked(shape) and stroke_scale is None:
+        return None
+
+    a, b, c, d, e, f = transform
+    if isinstance(shape, (Path, Polygon, PolyLine)):
+        baked = copy_shape(shape)
+        baked.__dict__['points'] = transform_points(shape.points, transform)
+    elif isinstance(shape, Line):
+        baked = copy_shape(shape)
+        baked.__dict__['x1'], baked.__dict__['y1'], baked.__dict__['x2'], baked.__dict__['y2'] = \
+            transform_points([shape.x1, shape.y1, shape.x2, shape.y2], transform)
+    elif isinstance(shape, Rect):
+        if is_axis_aligned(transform) and (not shape.rx or stroke_scale is not None):
+            baked = copy_shape(shape)
+            x0, y0, x1, y1 = transform_points(
+                [shape.x, shape.y, shape.x + shape.width, shape.y + shape.height], transform)
+            baked.__dict__.update(
+                x=min(x0, x1), y=min(y0, y1), width=abs(x1 - x0), height=abs(y1 - y0),
+                rx=shape.rx * abs(a), ry=shape.ry * abs(d),
+            )
+        else:
+            points, operators = rect_outline(shape)
+            baked = _as_path(shape, transform_points(points, transform), operators)
+    elif isinstance(shape, (Circle, Ellipse)):
+        if isinstance(shape, Circle):
+            rx = ry = shape.r
+        else:
+            rx, ry = shape.rx, shape.ry
+        cx, cy = transform_points([shape.cx, shape.cy], transform)
+        if rx == ry and stroke_scale is not None:
+            baked = copy_shape(shape)
+            baked.__dict__.update(cx=cx, cy=cy)
+            if isinstance(shape, Circle):
+                baked.__dict__['r'] = rx * stroke_scale
+            else:
+                baked.__dict__.update(rx=rx * stroke_scale, ry=ry * stroke_scale)
+        elif is_axis_aligned(transform):
+            baked = Ellipse(cx, cy, rx * abs(a), ry * abs(d))
+            baked.__dict__.update(
+                (name, value) for name, value in shape.__dict__.items()
+                if name not in _GEOMETRY_ATTRIBUTES and name in baked._attrMap
+            )
+        else:
+            points, operators = ellipse_outline(shape.cx, shape.cy, rx, ry)
+            baked = _as_path(shape, transform_points(points, transform), operators)
+    elif isinstance(shape, String):
+        if (a, b, c, d) != (1, 0, 0, 1):
+            return None
+        baked = copy_shape(shape)
+        baked.__dict__.update(x=shape.x + e, y=shape.y + f)
+    else:
+        return None
+
+    if is_stroked(baked):
+        _scale_stroke(baked, stroke_scale)
+    return baked
+
+
+class _Baker(object):
+    def __init__(self):
+        self.baked = 0
+        self.kept = 0
+
+    def bake(self, group, transform):
+        """
+        The shapes replacing `group`, in the coordinates `transform` maps to
+        """
+        transform = tuple(mmult(transform, group.transform))
+        if transform != IDENTITY and any(
+                is_clipping(child) and bake_shape(child, transform) is None for child in group.contents):
+            return self.keep(group, transform)
+
+        contents = []
+        kept = []  # run of shapes that couldn't be baked, sharing a group with the transform
+        for child in group.contents:
+            if isinstance(child, Group):
+                baked = self.bake(child, transform)
+            elif transform == IDENTITY:
+                baked = [child]
+            else:
+                shape = bake_shape(child, transform)
+                baked = None if shape is None else [shape]
+            if baked is None:
+                kept.append(child)
+                self.kept += 1
+                continue
+            if kept:
+                contents.append(new_group(kept, transform))
+                kept = []
+            if transform != IDENTITY and not isinstance(child, Group):
+                self.baked += 1
+            contents.extend(baked)
+        if kept:
+            contents.append(new_group(kept, transform))
+
+        if set(group.__dict__) - PLAIN_GROUP_ATTRIBUTES or any(is_clipping(s) for s in contents):
+            scope = copy_shape(group)
+            scope.__dict__.update(contents=contents, transform=IDENTITY)
+            return [scope]
+        return contents
+
+    def keep(self, group, transform):
+        # the group keeps its transform, only what's below it is baked
+        scope = copy_shape(group)
+        contents = []
+        for child in group.contents:
+            contents.extend(self.bake(child, IDENTITY) if isinstance(child, Group) else [child])
+        scope.__dict__.update(contents=contents, transform=transform)
+        return [scope]
+
+
+def bake_group(group):
+    """
+    Bakes the transforms of the groups below `group` into their shapes.  `group` keeps
+    its own transform and is the only group changed.
+    :rtype: BakeStats
+    """
+    baker = _Baker()
+    contents = []
+    for child in group.contents:
+        contents.extend(baker.bake(child, IDENTITY) if isinstance(child, Group) else [child])
+    group.__dict__['contents'] = contents
+    stats = BakeStats(baker.baked, baker.kept)
+    _logger.debug("Baked transforms: %d shapes baked, %d kept under a transform" % stats)
+    return stats
@@ -0,0 +1,86 @@
+# -*- coding: utf-8 -*
+"""
+Conversion of many documents over a pool of worker processes, see `api.convert_many`.
+
+Workers are started once per batch and convert many documents each, so reportlab is
+imported, patched and has its caches (fonts, colours, text widths) warmed once per
+worker rather than once per document.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+import multiprocessing
+import traceback
+from collections import namedtuple
+from functools import partial
+
+from . import api, fonts, settings, text, utils
+
+_logger = logging.getLogger(__name__)
+
+BatchResult = namedtuple('BatchResult', ['index', 'drawing', 'error'])
+BatchResult.__doc__ = """
+Outcome of converting the `index`th item of a batch: either `drawing` or, if the
+conversion failed, `error` (the formatted exception) is set.
+"""
+
+
+def is_svg_data(item):
+    """
+    Whether a batch item is an SVG document, rather than the path of one
+    """
+    if isinstance(item, utils.BINARY_TYPE):
+        return True
+    return item.lstrip()[:1] == '<'
+
+
+def init_worker():
+    """
+    Prepares a worker process for converting documents
+    """
+    utils.monkeypatch_reportlab()
+    font_name = fonts.font_index.resolve(settings.DEFAULT_FONT)
+    text.string_width(' ', font_name, 12)
+
+
+def convert_item(indexed_item, options=None):
+    """
+    Converts one (index, path or data) batch item; never raises.
+    :rtype: BatchResult
+    """
+    index, item = indexed_item
+    options = options or {}
+    try:
+        if is_svg_data(item):
+            drawing = api.data_to_rlg(item, **options)
+        else:
+            drawing = api.file_to_rlg(item, **options)
+    except Exception:
+        _logger.debug("Failed to convert batch item %d", index, exc_info=True)
+        return BatchResult(index, None, traceback.format_exc())
+    return BatchResult(index, drawing, None)
+
+
+def iter_results(items, workers=None, chunksize=1, ordered=True, **options):
+    """
+    Yields a `BatchResult` per item.  With `workers` 0 the items are converted in
+    this process, otherwise over a pool of `workers` processes (default: one per CPU).
+    """
+    indexed_items = enumerate(items)
+    convert = partial(convert_item, options=options)
+    if workers == 0:
+        init_worker()
+        for indexed_item in indexed_items:
+            yield convert(indexed_item)
+        return
+
+    pool = multiprocessing.Pool(workers, initializer=init_worker)
+    try:
+        imap = pool.imap if ordered else pool.imap_unordered
+        for result in imap(convert, indexed_items, chunksize):
+            yield result
+        pool.close()
+    finally:
+        # also reached when the caller stops iterating early
+        pool.terminate()
+        pool.join()
@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*
+"""
+Caches of converted drawings, keyed by the content of the SVG document: in memory
+(`DrawingCache`) or in a directory shared between processes and runs (`DiskCache`).
+
+Drawings are mutable, so they are stored pickled: every hit unpickles an independent
+copy, which is much cheaper than converting the document again, and the size of an
+entry is known exactly.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import errno
+import hashlib
+import logging
+import os
+import pickle
+import re
+import tempfile
+import threading
+import time
+import zlib
+from collections import OrderedDict, namedtuple
+
+from . import fonts, settings, utils
+
+_logger = logging.getLogger(__name__)
+
+CacheStats = namedtuple('CacheStats', ['hits', 'misses', 'evictions', 'entries', 'size'])
+
+_HREF = re.compile(br'href\s*=\s*("[^"]*"|\'[^\']*\')')
+
+
+def cache_key(data, file_path=None, options=None):
+    """
+    Key of a document: the hash of its bytes, and of everything else the drawing depends
+    on, including the conversion `options` and the image files it refers to
+    """
+    import svg2rlg
+
+    if isinstance(data, utils.TEXT_TYPE):
+        data = data.encode('utf-8')
+
+    digest = hashlib.sha1(data)
+    context = (
+        svg2rlg.__version__,
+        settings.DEFAULT_FONT,
+        fonts.font_index.fingerprint(),
+        file_path if utils.is_string(file_path) else None,  # images are relative to it
+        sorted((options or {}).items()),
+        _image_files(data, file_path),
+    )
+    digest.update(repr(context).encode('utf-8'))
+    return digest.hexdigest()
+
+
+def _image_files(data, file_path):
+    """
+    (path, mtime, size) of the files referenced by the document, as images are read
+    by `shapes.ShapeConverter.convert_image`; (path, None, None) if missing
+    """
+    directory = os.path.dirname(file_path) if utils.is_string(file_path) else ''
+    files = []
+    for href in sorted(set(_HREF.findall(data))):
+        href = href[1:-1].strip().decode('utf-8', 'replace')
+        if not href or href.startswith('#') or href.startswith('data:'):
+            continue
+        path = os.path.abspath(os.path.join(directory, href))
+        try:
+            stat = os.stat(path)
+        except OSError:
+            files.append((path, None, None))
+        else:
+            files.append((path, stat.st_mtime, stat.st_size))
+    return files
+
+
+class DrawingCache(object):
+    """
+    LRU cache of drawings, holding at most `maxsize` drawings and `maxbytes` bytes of
+    pickled drawings (no limit if None).  Safe to share between threads.
+
+    >>> cache = DrawingCache(maxsize=100)
+    >>> drawing = svg2rlg.data_to_rlg(data, cache=cache)
+    """
+
+    def __init__(self, maxsize=128, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.size = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __getstate__(self):
+        # e.g. for the worker processes of `convert_many`, which each get a copy
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """
+        A new copy of the drawing cached under `key`, or None
+        """
+        with self._lock:
+            pickled = self._entries.pop(key, None)
+            if pickled is None:
+                self.misses += 1
+                return None
+            self._entries[key] = pickled  # most recently used goes last
+            self.hits += 1
+        return pickle.loads(pickled)
+
+    def set(self, key, drawing):
+        """
+        Caches a copy of `drawing`; later changes to `drawing` don't affect the cache
+        """
+        pickled = pickle.dumps(drawing, pickle.HIGHEST_PROTOCOL)
+        if self.maxbytes is not None and len(pickled) > self.maxbytes:
+            _logger.debug("Not caching a drawing of %d bytes" % len(pickled))
+            return
+
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= len(previous)
+            self._entries[key] = pickled
+            self.size += len(pickled)
+
+            while len(self._entries) > self.maxsize or (self.maxbytes is not None and self.size > self.maxbytes):
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def stats(self):
+        """
+        :rtype: CacheStats
+        """
+        with self._lock:
+            return CacheStats(self.hits, self.misses, self.evictions, len(self._entries), self.size)
+
+
+class DiskCache(object):
+    """
+    Cache of drawings in a directory, holding at most `maxbytes` bytes of compressed
+    pickled drawings (no limit if None); the least recently used are removed first.
+
+    Any number of processes may use the same directory at once: entries are written
+    to a temporary file and renamed into place, so readers never see partial entries.
+    Each process adds up the size of what it writes, and scans the directory for what
+    the others wrote every `SCAN_INTERVAL` seconds, so the directory only exceeds
+    `maxbytes` by what is written in between.
+    Temporary files left by writers that crashed are removed by `clear` and when
+    entries are evicted, once they are `TEMP_MAX_AGE` seconds old.
+
+    Entries are unpickled, which can run arbitrary code: the directory must only be
+    writable by trusted users, like any other code the application runs.
+
+    >>> cache = DiskCache('/var/cache/svg2rlg', maxbytes=500 * 1024 ** 2)
+    >>> drawing = svg2rlg.file_to_rlg(path, cache=cache)
+    """
+
+    SUFFIX = '.drawing'
+    TEMP_SUFFIX = '.tmp'
+    TEMP_MAX_AGE = 600
+    # seconds after which the size of the directory is scanned again, for the entries
+    # written by other processes, rather than only added up from this one's
+    SCAN_INTERVAL = 1.0
+
+    def __init__(self, directory, maxbytes=None):
+        self.directory = directory
+        self.maxbytes = maxbytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._size = None  # estimated size of the directory, computed when first needed
+        self._scanned = 0  # time of the last scan
+        self._lock = threading.Lock()
+        _makedirs(directory)
+
+    def __getstate__(self):
+        # e.g. for the worker processes of `convert_many`, which share the directory
+        state = dict(self.__dict__)
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + self.SUFFIX)
+
+    def get(self, key):
+        """
+        The drawing cached under `key`, or None
+        """
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as f:
+                compressed = f.read()
+            drawing = pickle.loads(zlib.decompress(compressed))
+        except (IOError, OSError):
+            drawing = None
+        except Exception:
+            _logger.warning("Removing unreadable cache entry %s" % path, exc_info=True)
+            _remove(path)
+            drawing = None
+        else:
+            try:
+                os.utime(path, None)  # the modification time is the last access
+            except OSError:
+                pass
+
+        with self._lock:
+            if drawing is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return drawing
+
+    def set(self, key, drawing):
+        compressed = zlib.compress(pickle.dumps(drawing, pickle.HIGHEST_PROTOCOL))
+        if self.maxbytes is not None and len(compressed) > self.maxbytes:
+            _logger.debug("Not caching a drawing of %d bytes" % len(compressed))
+            return
+
+        path = self._path(key)
+        _makedirs(os.path.dirname(path))
+        fd, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=self.TEMP_SUFFIX)
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(compressed)
+            _replace(temp_path, path)
+        except Exception:
+            _remove(temp_path)
+            raise
+
+        if self.maxbytes is not None:
+            with self._lock:
+                if self._size is None or time.time() - self._scanned >= self.SCAN_INTERVAL:
+                    self._size = sum(size for _, size, _ in self._entries())
+                    self._scanned = time.time()
+                else:
+                    self._size += len(compressed)
+                if self._size > self.maxbytes:
+                    self._evict()
+
+    def _entries(self, suffix=SUFFIX):
+        """
+        (path, size, last access) of every entry, or of every temporary file
+        """
+        for name in os.listdir(self.directory):
+            subdirectory = os.path.join(self.directory, name)
+            if not os.path.isdir(subdirectory):
+                continue
+            for entry in os.listdir(subdirectory):
+                if not entry.endswith(suffix):
+                    continue
+                path = os.path.join(subdirectory, entry)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue  # removed by another process
+                yield path, stat.st_size, stat.st_mtime
+
+    def _evict(self):
+        # other processes share the directory, so its actual content is what counts
+        entries = sorted(self._entries(), key=lambda entry: entry[2])
+        size = sum(entry[1] for entry in entries)
+        for path, entry_size, _ in entries:
+            if size <= self.maxbytes:
+                break
+            if _remove(path):
+                self.evictions += 1
+            size -= entry_size
+        self._size = size
+        self._scanned = time.time()
+        self._remove_stale_temp_files()
+
+    def _remove_stale_temp_files(self):
+        # those of writers that crashed, not of the ones still writing
+        expired = time.time() - self.TEMP_MAX_AGE
+        for path, _, modified in list(self._entries(self.TEMP_SUFFIX)):
+            if modified < expired:
+                _remove(path)
+
+    def clear(self):
+        for path, _, _ in list(self._entries()):
+            _remove(path)
+        self._remove_stale_temp_files()
+        with self._lock:
+            self._size = 0
+
+    def stats(self):
+        """
+        :rtype: CacheStats
+        """
+        entries = list(self._entries())
+        with self._lock:
+            counts = self.hits, self.misses, self.evictions
+        return CacheStats(*counts + (len(entries), sum(e[1] for e in entries)))
+
+
+def _makedirs(directory):
+    try:
+        os.makedirs(directory)
+    except OSError as exc:
+        if exc.errno != errno.EEXIST:
+            raise
+
+
+def _replace(source, destination):
+    """
+    Atomically renames `source` to `destination`, replacing it if it exists
+    """
+    getattr(os, 'replace', os.rename)(source, destination)
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+        return True
+    except OSError:
+        return False
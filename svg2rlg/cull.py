@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*
+"""
+Viewport culling: drops the shapes and groups lying wholly outside the view box, which
+are converted but never seen, e.g. the off-canvas geometry of cropped exports.
+
+Bounds are cheap and conservative: the extent of a path's points (its control points
+included), widened by the stroke as if every join were a miter at its limit; strings
+are as wide as their advance on both sides of their anchor and a font size high on
+both sides of the baseline.  A group is bounded by its transformed contents and by its
+clipping path.  Shapes without known bounds, e.g. images of unknown kind, are kept,
+and so are clipping paths.
+
+ReportLab doesn't clip a drawing to its size when it's drawn into a larger canvas, so
+culling changes what shows outside the view box there; it is opt-in.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+import math
+import sys
+from collections import namedtuple
+
+from reportlab.graphics.shapes import (
+    Circle, Ellipse, Group, Image, Line, Path, PolyLine, Polygon, Rect, String, mmult,
+)
+
+from svg2rlg.optimize import IDENTITY, copy_shape, is_clipping
+from svg2rlg.text import string_width
+
+_logger = logging.getLogger(__name__)
+
+# PDF's miter limit when a shape doesn't set one
+DEFAULT_MITER_LIMIT = 10
+
+_FLOAT_SIZE = sys.getsizeof(0.0)
+
+CullStats = namedtuple('CullStats', ['culled', 'kept', 'bytes'])
+
+
+def _points_bounds(points):
+    if not len(points):
+        return None
+    xs, ys = points[0::2], points[1::2]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _stroke_margin(shape):
+    if getattr(shape, 'strokeColor', None) is None or not getattr(shape, 'strokeWidth', 0):
+        return 0
+    miter_limit = getattr(shape, 'strokeMiterLimit', 0) or DEFAULT_MITER_LIMIT
+    # square caps reach sqrt(2) half widths from an end, miters `miter_limit` half widths
+    return shape.strokeWidth / 2.0 * max(miter_limit, math.sqrt(2))
+
+
+def shape_bounds(shape):
+    """
+    (x0, y0, x1, y1) containing all that `shape` draws, in its own coordinates, or
+    None if unknown
+    """
+    if isinstance(shape, (Path, Polygon, PolyLine)):
+        bounds = _points_bounds(shape.points)
+    elif isinstance(shape, (Rect, Image)):
+        bounds = (
+            min(shape.x, shape.x + shape.width), min(shape.y, shape.y + shape.height),
+            max(shape.x, shape.x + shape.width), max(shape.y, shape.y + shape.height),
+        )
+    elif isinstance(shape, Circle):
+        bounds = shape.cx - shape.r, shape.cy - shape.r, shape.cx + shape.r, shape.cy + shape.r
+    elif isinstance(shape, Ellipse):
+        bounds = shape.cx - shape.rx, shape.cy - shape.ry, shape.cx + shape.rx, shape.cy + shape.ry
+    elif isinstance(shape, Line):
+        bounds = (
+            min(shape.x1, shape.x2), min(shape.y1, shape.y2),
+            max(shape.x1, shape.x2), max(shape.y1, shape.y2),
+        )
+    elif isinstance(shape, String):
+        try:
+            width = string_width(shape.text, shape.fontName, shape.fontSize)
+        except KeyError:  # font unknown to ReportLab
+            return None
+        size = shape.fontSize
+        bounds = shape.x - width, shape.y - size, shape.x + width, shape.y + size
+    else:
+        return None
+
+    if bounds is None:
+        return None
+    margin = _stroke_margin(shape)
+    if margin:
+        x0, y0, x1, y1 = bounds
+        bounds = x0 - margin, y0 - margin, x1 + margin, y1 + margin
+    return bounds
+
+
+def transform_bounds(bounds, transform):
+    """
+    Bounds of the rectangle `bounds` once transformed
+    """
+    if tuple(transform) == IDENTITY:
+        return bounds
+    a, b, c, d, e, f = transform
+    x0, y0, x1, y1 = bounds
+    xs = [a * x + c * y + e for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))]
+    ys = [b * x + d * y + f for x, y in ((x0, y0), (x1, y0), (x0, y1), (x1, y1))]
+    return min(xs), min(ys), max(xs), max(ys)
+
+
+def _union(bounds, other):
+    return (
+        min(bounds[0], other[0]), min(bounds[1], other[1]),
+        max(bounds[2], other[2]), max(bounds[3], other[3]),
+    )
+
+
+def _intersect(bounds, other):
+    return (
+        max(bounds[0], other[0]), max(bounds[1], other[1]),
+        min(bounds[2], other[2]), min(bounds[3], other[3]),
+    )
+
+
+def _disjoint(bounds, other):
+    return bounds[2] < other[0] or bounds[0] > other[2] or bounds[3] < other[1] or bounds[1] > other[3]
+
+
+def _inside(bounds, other):
+    return bounds[0] >= other[0] and bounds[1] >= other[1] and bounds[2] <= other[2] and bounds[3] <= other[3]
+
+
+def approximate_size(shape):
+    """
+    Rough number of bytes held by a shape or group and what's below it, counting shared
+    ones every time they appear
+    """
+    size = sys.getsizeof(shape) + sys.getsizeof(shape.__dict__)
+    if isinstance(shape, Group):
+        size += sys.getsizeof(shape.contents)
+        return size + sum(approximate_size(child) for child in shape.contents)
+    points = shape.__dict__.get('points')
+    if points is not None:
+        size += sys.getsizeof(points)
+        if isinstance(points, list):
+            size += _FLOAT_SIZE * len(points)
+    return size
+
+
+class _Culler(object):
+    def __init__(self, viewport):
+        self.viewport = viewport
+        self.bounds = {}  # id -> (group, bounds in its parent's coordinates)
+        self.culled = 0
+        self.kept = 0
+        self.bytes = 0
+
+    def bounds_of(self, shape):
+        """
+        Bounds of `shape` in the coordinates of its parent, None if unknown, or empty
+        (x0 > x1) if it draws nothing
+        """
+        if not isinstance(shape, Group):
+            return shape_bounds(shape)  # cheaper than remembering it
+        try:
+            return self.bounds[id(shape)][1]
+        except KeyError:
+            pass
+        bounds = (0, 0, -1, -1)  # nothing drawn
+        clip = None
+        for child in shape.contents:
+            if is_clipping(child):
+                child_bounds = shape_bounds(child)
+                if child_bounds is not None:
+                    clip = child_bounds if clip is None else _intersect(clip, child_bounds)
+                continue
+            child_bounds = self.bounds_of(child)
+            if child_bounds is None:
+                bounds = None
+            elif bounds is not None and child_bounds[0] <= child_bounds[2]:
+                bounds = child_bounds if bounds[0] > bounds[2] else _union(bounds, child_bounds)
+        if clip is not None:
+            bounds = clip if bounds is None else _intersect(bounds, clip)
+        if bounds is not None and bounds[0] <= bounds[2]:
+            bounds = transform_bounds(bounds, shape.transform)
+        self.bounds[id(shape)] = (shape, bounds)  # keeps `shape`, and its id, alive
+        return bounds
+
+    def cull(self, group, transform):
+        """
+        Contents of `group` without the shapes outside the viewport, `transform` mapping
+        them to the viewport's coordinates
+        """
+        transform = mmult(transform, group.transform)
+        contents = []
+        for child in group.contents:
+            if is_clipping(child):
+                contents.append(child)
+                continue
+            bounds = self.bounds_of(child)
+            if bounds is not None:
+                if bounds[0] <= bounds[2]:
+                    bounds = transform_bounds(bounds, transform)
+                if bounds[0] > bounds[2] or _disjoint(bounds, self.viewport):
+                    self.culled += 1
+                    self.bytes += approximate_size(child)
+                    continue
+                if _inside(bounds, self.viewport):
+                    self.kept += 1
+                    contents.append(child)
+                    continue
+            if isinstance(child, Group):
+                culled = self.cull(child, transform)
+                if all(is_clipping(shape) for shape in culled):
+                    continue  # nothing left to draw
+                if len(culled) != len(child.contents):
+                    child = copy_shape(child)
+                    child.__dict__['contents'] = culled
+            else:
+                self.kept += 1
+            contents.append(child)
+        return contents
+
+
+def cull_group(group, viewport):
+    """
+    Drops the shapes and groups below `group` lying outside `viewport`, a (x, y, width,
+    height) box in the coordinates of `group`'s parent.  `group` is the only group changed.
+    :rtype: CullStats
+    """
+    x, y, width, height = viewport
+    culler = _Culler((x, y, x + width, y + height))
+    group.__dict__['contents'] = culler.cull(group, IDENTITY)
+    stats = CullStats(culler.culled, culler.kept, culler.bytes)
+    _logger.debug("Culled %d shapes and groups outside the view box, about %d bytes; %d kept" % (
+        stats.culled, stats.bytes, stats.kept))
+    return stats
@@ -0,0 +1,243 @@
+# -*- coding: utf-8 -*
+"""
+Display list output: a flat list of draw commands, each with its geometry, its resolved
+fill and stroke and its absolute transform, for the rasterisers, hit testers and such
+that would otherwise walk a Drawing to find its shapes.
+
+  * paths, polygons, polylines, lines, rects, circles and ellipses are `PathCommand`s,
+    with the outline ReportLab draws for them as an array('d') of points and an
+    array('b') of `pathdata` operators,
+  * strings are `TextCommand`s, their anchor resolved to the x of their start,
+  * images are `ImageCommand`s.
+
+A command's transform maps its coordinates to those of the drawing (points, y up, from
+the bottom left corner of the view box), as the transforms of the groups above the
+shape would.  Clipping paths are the `ClipPath`s of the list's `clips`, each clipped in
+turn by its `parent`; a command's `clip` is the index of the innermost clipping path
+applying to it, or None.
+
+Only what ReportLab would draw is listed: shapes without fill or stroke are left out,
+and so is the fill of a path not closed.  Equal transforms, fills and strokes are shared
+between commands, as are the outlines of equal rects, circles, ellipses and lines, and
+the arrays of compact paths, so lists are small in memory and once pickled; nothing in
+a list may be changed in place.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+from array import array
+from collections import namedtuple
+
+from reportlab.graphics.shapes import (
+    Circle, Ellipse, Group, Image, Line, Path, PolyLine, Polygon, Rect, String, mmult,
+)
+from reportlab.pdfgen.canvas import FILL_EVEN_ODD
+
+from svg2rlg.bake import ellipse_outline, rect_outline
+from svg2rlg.cull import DEFAULT_MITER_LIMIT
+from svg2rlg.optimize import IDENTITY, is_clipping
+from svg2rlg.pathdata import OP_CLOSEPATH, OP_LINETO, OP_MOVETO
+from svg2rlg.paths import NoStrokePath
+from svg2rlg.text import string_width
+
+_logger = logging.getLogger(__name__)
+
+NONZERO = 'nonzero'
+EVENODD = 'evenodd'
+
+DisplayList = namedtuple('DisplayList', ['width', 'height', 'commands', 'clips'])
+
+PathCommand = namedtuple('PathCommand', ['points', 'operators', 'fill', 'stroke', 'transform', 'clip'])
+TextCommand = namedtuple('TextCommand', ['text', 'x', 'y', 'font_name', 'font_size', 'fill', 'transform', 'clip'])
+ImageCommand = namedtuple('ImageCommand', ['path', 'x', 'y', 'width', 'height', 'transform', 'clip'])
+ClipPath = namedtuple('ClipPath', ['points', 'operators', 'rule', 'transform', 'parent'])
+
+# the geometry of the shapes whose outlines are shared by all the shapes with the same
+SHAPE_GEOMETRY = (
+    (Rect, ('x', 'y', 'width', 'height', 'rx')),
+    (Circle, ('cx', 'cy', 'r')),
+    (Ellipse, ('cx', 'cy', 'rx', 'ry')),
+    (Line, ('x1', 'y1', 'x2', 'y2')),
+)
+
+# colors are (red, green, blue, alpha) tuples of 0..1 floats, the opacity included
+Fill = namedtuple('Fill', ['color', 'rule'])
+Stroke = namedtuple('Stroke', ['color', 'width', 'line_cap', 'line_join', 'miter_limit', 'dashes', 'dash_phase'])
+
+
+def _as_array(typecode, values):
+    if isinstance(values, array) and values.typecode == typecode:
+        return values  # e.g. of a compact path, shared
+    return array(str(typecode), values)
+
+
+def shape_outline(shape):
+    """
+    (points, operators) arrays of the outline ReportLab draws for a geometric shape, or
+    None for other shapes
+    """
+    if isinstance(shape, Path):
+        points, operators = shape.points, shape.operators
+    elif isinstance(shape, (Polygon, PolyLine)):
+        points = shape.points
+        if not points:
+            return None
+        operators = [OP_MOVETO] + [OP_LINETO] * (len(points) // 2 - 1)
+        if isinstance(shape, Polygon):
+            operators.append(OP_CLOSEPATH)
+    elif isinstance(shape, Line):
+        points, operators = [shape.x1, shape.y1, shape.x2, shape.y2], [OP_MOVETO, OP_LINETO]
+    elif isinstance(shape, Rect):
+        points, operators = rect_outline(shape)
+    elif isinstance(shape, Circle):
+        points, operators = ellipse_outline(shape.cx, shape.cy, shape.r, shape.r)
+    elif isinstance(shape, Ellipse):
+        points, operators = ellipse_outline(shape.cx, shape.cy, shape.rx, shape.ry)
+    else:
+        return None
+    return _as_array('d', points), _as_array('b', operators)
+
+
+def is_closed(operators):
+    """
+    Whether every subpath is closed, without which ReportLab doesn't fill a path
+    """
+    return operators.count(OP_MOVETO) == operators.count(OP_CLOSEPATH)
+
+
+def fill_rule(shape):
+    # ReportLab only honours the rule of paths, see `utils.monkeypatch_reportlab`
+    if isinstance(shape, Path) and getattr(shape, '_fillRule', None) == FILL_EVEN_ODD:
+        return EVENODD
+    return NONZERO
+
+
+def rgba(color, opacity=None):
+    """
+    (red, green, blue, alpha) of a ReportLab color, `opacity` replacing its alpha as
+    when ReportLab draws with both
+    """
+    red, green, blue, alpha = color.rgba()
+    return red, green, blue, alpha if opacity is None else float(opacity)
+
+
+class DisplayListBuilder(object):
+    """
+    Sink of a `render.SinkRenderer`, listing the shapes handed over as draw commands
+    """
+
+    def __init__(self):
+        self.box = None
+        self.commands = []
+        self.clips = []
+        self.interned = {}
+        self.outlines = {}  # (kind, geometry) -> outline
+        self.scopes = [(IDENTITY, None)]  # (absolute transform, clip index) of each open group
+
+    def intern(self, value):
+        return self.interned.setdefault(value, value)
+
+    def outline(self, shape):
+        """
+        `shape_outline` of `shape`, the same arrays for rects, circles, ellipses and lines
+        of the same geometry
+        """
+        for kind, names in SHAPE_GEOMETRY:
+            if isinstance(shape, kind):
+                break
+        else:
+            return shape_outline(shape)
+        key = (kind,) + tuple(getattr(shape, name) for name in names)
+        outline = self.outlines.get(key)
+        if outline is None:
+            outline = self.outlines[key] = shape_outline(shape)
+        return outline
+
+    def start(self, box):
+        self.box = box
+
+    def stop(self):
+        pass
+
+    def push(self, transform, clipping=None):
+        parent, clip = self.scopes[-1]
+        if tuple(transform) != IDENTITY:
+            parent = self.intern(tuple(mmult(parent, transform)))
+        self.scopes.append((parent, clip))
+        if clipping is not None:
+            self.add(clipping)
+
+    def pop(self):
+        self.scopes.pop()
+
+    def add(self, shape):
+        if isinstance(shape, Group):
+            self.push(shape.transform)
+            for child in shape.contents:
+                self.add(child)
+            self.pop()
+            return
+
+        transform, clip = self.scopes[-1]
+        if is_clipping(shape):
+            # clips what follows in the group, as a clipping path in a PDF graphics state
+            points, operators = shape_outline(shape)
+            self.clips.append(ClipPath(points, operators, fill_rule(shape), transform, clip))
+            self.scopes[-1] = (transform, len(self.clips) - 1)
+            return
+        command = self.command(shape, transform, clip)
+        if command is not None:
+            self.commands.append(command)
+
+    def command(self, shape, transform, clip):
+        """
+        The command drawing `shape`, None if it draws nothing
+        """
+        if isinstance(shape, String):
+            fill = self.fill(shape)
+            if fill is None:
+                return None
+            x = shape.x
+            if shape.textAnchor in ('middle', 'end'):
+                width = string_width(shape.text, shape.fontName, shape.fontSize)
+                x -= width / 2.0 if shape.textAnchor == 'middle' else width
+            return TextCommand(shape.text, x, shape.y, shape.fontName, shape.fontSize, fill, transform, clip)
+
+        if isinstance(shape, Image):
+            return ImageCommand(shape.path, shape.x, shape.y, shape.width, shape.height, transform, clip)
+
+        outline = self.outline(shape)
+        if outline is None:
+            _logger.debug("Ignoring shape: %s" % shape.__class__.__name__)
+            return None
+        points, operators = outline
+        fill = None if isinstance(shape, (Line, PolyLine)) else self.fill(shape)
+        if fill is not None and isinstance(shape, Path) and not is_closed(operators):
+            fill = None
+        stroke = self.stroke(shape)
+        if fill is None and stroke is None:
+            return None
+        return PathCommand(points, operators, fill, stroke, transform, clip)
+
+    def fill(self, shape):
+        color = shape.fillColor
+        if color is None:
+            return None
+        return self.intern(Fill(rgba(color, getattr(shape, 'fillOpacity', None)), fill_rule(shape)))
+
+    def stroke(self, shape):
+        color = shape.strokeColor
+        if color is None or isinstance(shape, NoStrokePath):
+            return None
+        dashes, phase = shape.strokeDashArray, 0
+        if dashes and len(dashes) == 2 and isinstance(dashes[1], (list, tuple)):
+            phase, dashes = dashes  # (phase, dashes), as ReportLab takes them too
+        return self.intern(Stroke(
+            rgba(color, getattr(shape, 'strokeOpacity', None)), shape.strokeWidth,
+            shape.strokeLineCap, shape.strokeLineJoin,
+            getattr(shape, 'strokeMiterLimit', None) or DEFAULT_MITER_LIMIT,
+            tuple(dashes) if dashes else None, phase,
+        ))
+
+    def display_list(self):
+        return DisplayList(self.box.width, self.box.height, self.commands, self.clips)
@@ -0,0 +1,165 @@
+# -*- coding: utf-8 -*
+"""
+Resolution of SVG font-family/font-weight/font-style to the name of a ReportLab font.
+
+The registered fonts, the font families known to ReportLab and `settings.FONT_ALIASES`
+are indexed once, and the index is rebuilt when any of them changes, e.g. after
+`pdfmetrics.registerFont` or `registerFontFamily`, or when an alias is remapped.
+Changes are told apart by a few counters, without scanning the registry.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import hashlib
+import logging
+import threading
+
+from reportlab.lib import fonts
+from reportlab.pdfbase import pdfmetrics
+
+from . import settings
+
+_logger = logging.getLogger(__name__)
+
+BOLD_WEIGHTS = frozenset(('bold', 'bolder', '600', '700', '800', '900'))
+ITALIC_STYLES = frozenset(('italic', 'oblique'))
+
+# calls of fonts.addMapping, which may remap a family without adding any
+_mapping_changes = 0
+
+
+def _count_mapping_changes():
+    """
+    Wraps fonts.addMapping, which registerFontFamily calls too, to count its calls.
+    Wrapping more than once has no further effect.
+    """
+    original_add_mapping = fonts.addMapping
+    if getattr(original_add_mapping, '_svg2rlg_counted', False):
+        return
+
+    # noinspection PyPep8Naming
+    def addMapping(*args, **kwargs):
+        global _mapping_changes
+        _mapping_changes += 1
+        return original_add_mapping(*args, **kwargs)
+
+    addMapping._svg2rlg_counted = True
+    fonts.addMapping = addMapping
+
+
+_count_mapping_changes()
+
+
+def registry_generation():
+    """
+    Changes whenever a font, a font family or an alias is added, removed or remapped.
+    Font names are only added or removed, so their number is enough; `FONT_ALIASES`
+    counts its own changes, see `settings.FontAliases`.  Only meaningful within a
+    process, see `FontIndex.fingerprint` for a key shared between processes.
+    """
+    aliases = settings.FONT_ALIASES
+    return (
+        id(pdfmetrics._fonts), len(pdfmetrics._fonts),
+        id(fonts._tt2ps_map), len(fonts._tt2ps_map), _mapping_changes,
+        id(aliases), len(aliases), getattr(aliases, 'changes', None),
+    )
+
+
+class FontIndex(object):
+    """
+    Maps font family names to registered font names, remembering every resolution.
+    Safe to share between threads.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._generation = None
+        self._fingerprint = None
+        self._names = {}
+        self._variants = {}
+        self._resolved = {}
+
+    def _rebuild(self, generation):
+        # font names, then aliases, exact first and then case insensitive
+        names = {}
+        for name in pdfmetrics.getRegisteredFontNames():
+            names[name] = name
+        for name in fonts._tt2ps_map.values():
+            names.setdefault(name, name)
+        for alias, name in settings.FONT_ALIASES.items():
+            names.setdefault(name, name)
+            names.setdefault(alias, name)
+        for key, name in list(names.items()):
+            names.setdefault(key.lower(), name)
+
+        # (family, bold, italic) -> font name
+        variants = {}
+        for (family, bold, italic), name in fonts._tt2ps_map.items():
+            variants[(family.lower(), bool(bold), bool(italic))] = name
+            # a family is also known by the name of its regular font, e.g. Times-Roman
+            regular = fonts._tt2ps_map.get((family, 0, 0))
+            if regular:
+                variants.setdefault((regular.lower(), bool(bold), bool(italic)), name)
+
+        content = (
+            sorted(pdfmetrics.getRegisteredFontNames()),
+            sorted(fonts._tt2ps_map.items()),
+            sorted(settings.FONT_ALIASES.items()),
+        )
+
+        self._names = names
+        self._variants = variants
+        self._resolved = {}
+        self._fingerprint = hashlib.sha1(repr(content).encode('utf-8')).hexdigest()
+        self._generation = generation
+
+    def _update(self):
+        generation = registry_generation()
+        if generation != self._generation:
+            with self._lock:
+                if generation != self._generation:
+                    self._rebuild(generation)
+
+    def fingerprint(self):
+        """
+        Hash of the registered fonts, font families and aliases, the same in every
+        process with the same ones
+        """
+        self._update()
+        return self._fingerprint
+
+    def resolve(self, family, weight='', style=''):
+        """
+        Name of the font for a CSS font-family list, or None if no family is known.
+        """
+        self._update()
+
+        key = (family, weight, style)
+        try:
+            return self._resolved[key]
+        except KeyError:
+            pass
+
+        bold = weight in BOLD_WEIGHTS
+        italic = style in ITALIC_STYLES
+        font_name = None
+        for name in family.split(','):
+            name = name.strip().strip('\'"')
+            font_name = self._find(name, bold, italic)
+            if font_name is not None:
+                break
+
+        self._resolved[key] = font_name
+        return font_name
+
+    def _find(self, name, bold, italic):
+        font_name = self._names.get(name) or self._names.get(name.lower())
+        if font_name is None:
+            font_name = self._variants.get((name.lower(), False, False))
+            if font_name is None:
+                return None
+        if bold or italic:
+            font_name = self._variants.get((font_name.lower(), bold, italic), font_name)
+        return font_name
+
+
+font_index = FontIndex()
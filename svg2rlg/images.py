@@ -0,0 +1,239 @@
+# -*- coding: utf-8 -*
+"""
+Images of <image> elements, embedded as data URIs or referenced as files, kept in
+memory and shared.
+
+The data of a PNG, GIF or JPEG data URI is decoded into an `EmbeddedImage`, and an
+image file is opened as a `FileImage`.  Both are drawn by ReportLab like the PIL image
+they stand for, without any temporary file.  Only the header of an image is read when
+it is converted, for its format, mode and size; its pixels are decoded once it is
+drawn, and dropped again, least recently decoded first, when the decoded images
+exceed `settings.IMAGE_PIXEL_BYTES`.
+
+Images are remembered across documents: embedded ones by the hash of their content,
+files by their path, modification time and size.  An image embedded or referenced
+many times, or in many documents, is read and decoded once, and a file referenced
+again costs a stat call.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import base64
+import binascii
+import hashlib
+import logging
+import os
+import re
+import threading
+from collections import OrderedDict
+
+from PIL import Image as PILImage
+
+from . import settings, utils
+
+_logger = logging.getLogger(__name__)
+
+DATA_URI = re.compile(r'data:image/(png|gif|jpe?g);base64,', re.IGNORECASE)
+
+# PIL's errors for files that aren't images it can read
+_READ_ERRORS = (IOError, OSError, SyntaxError, ValueError)
+
+# sha1 of the image data -> EmbeddedImage
+_images = utils.LRUCache(settings.IMAGE_CACHE_SIZE)
+
+# (absolute path, mtime, size) -> FileImage, or None if it isn't an image
+_files = utils.LRUCache(settings.IMAGE_FILE_CACHE_SIZE)
+_MISSING = object()
+
+
+def is_data_uri(href):
+    return href[:5].lower() == 'data:'
+
+
+class _DecodedImages(object):
+    """
+    The images whose pixels are decoded, and their size in bytes
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.images = OrderedDict()  # id -> (image, bytes), least recently decoded first
+        self.bytes = 0
+
+    def add(self, image, pixels):
+        # called with `lock` held
+        while self.images and self.bytes + pixels > settings.IMAGE_PIXEL_BYTES:
+            self.forget(next(iter(self.images.values()))[0])
+        self.images[id(image)] = (image, pixels)
+        self.bytes += pixels
+
+    def forget(self, image):
+        # called with `lock` held
+        entry = self.images.pop(id(image), None)
+        if entry is not None:
+            self.bytes -= entry[1]
+            image._image = None
+
+
+_decoded = _DecodedImages()
+
+
+class LazyImage(object):
+    """
+    Base of the images that read like the PIL image they open on first use, which is
+    what ReportLab draws.  The format, mode and size are known without opening it.
+    Images are shared, e.g. by all the Image shapes of the same data or file, and must
+    not be changed.  Subclasses define `open()`, returning a new file object of the
+    encoded image.
+    """
+
+    def __init__(self, format, mode, size):
+        self.format = format
+        self.mode = mode
+        self.size = size
+        self._image = None
+
+    @property
+    def image(self):
+        """
+        The PIL image, its pixels decoded
+        """
+        image = self._image
+        if image is None:
+            # decoded without the lock, so that other images are decoded meanwhile; an
+            # image decoded by two threads at once is registered once
+            image = PILImage.open(self.open())
+            image.load()
+            width, height = image.size
+            with _decoded.lock:
+                if self._image is None:
+                    _decoded.add(self, width * height * len(image.getbands()))
+                    self._image = image
+                else:
+                    image = self._image
+        return image
+
+    def unload(self):
+        """
+        Drops the decoded pixels, decoded again if needed
+        """
+        with _decoded.lock:
+            _decoded.forget(self)
+
+    @property
+    def fp(self):
+        # ReportLab copies JPEG data as it is from the file of the image, a new one
+        # every time so that images can be drawn from many threads
+        return self.open()
+
+    def __getattr__(self, name):
+        # only called for the attributes not found otherwise: those of the PIL image
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.image, name)
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        del state['_image']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._image = None
+
+
+class EmbeddedImage(LazyImage):
+    """
+    An image held as its encoded data; it pickles as the data.
+    """
+
+    def __init__(self, data, format, mode, size):
+        LazyImage.__init__(self, format, mode, size)
+        self.data = data
+
+    def open(self):
+        return utils.BytesIO(self.data)
+
+    def __repr__(self):
+        return '<EmbeddedImage %s, %d bytes>' % (hashlib.sha1(self.data).hexdigest()[:12], len(self.data))
+
+
+class FileImage(LazyImage):
+    """
+    An image file, read when decoded; it pickles as its path.
+    """
+
+    def __init__(self, path, format, mode, size):
+        LazyImage.__init__(self, format, mode, size)
+        self.path = path
+
+    def open(self):
+        with open(self.path, 'rb') as f:
+            return utils.BytesIO(f.read())
+
+    def __repr__(self):
+        return '<FileImage %s>' % self.path
+
+
+def _header(fp):
+    """
+    (format, mode, size) of an image, reading its header only
+    """
+    image = PILImage.open(fp)
+    try:
+        return image.format, image.mode, image.size
+    finally:
+        image.close()
+
+
+def decode_data_uri(href):
+    """
+    The `EmbeddedImage` of a PNG, GIF or JPEG base64 data URI, the same for the same
+    image data, or None if the URI isn't one of those or its image can't be read
+    """
+    match = DATA_URI.match(href)
+    if not match:
+        _logger.error("Unsupported image data URI %s... Skipping..." % href[:32])
+        return None
+    try:
+        # whitespace, e.g. line breaks in the attribute, is discarded
+        data = base64.b64decode(href[match.end():].encode('ascii'))
+    except (binascii.Error, UnicodeError, ValueError):
+        _logger.error("Unable to decode an embedded %s image. Skipping..." % match.group(1))
+        return None
+
+    key = hashlib.sha1(data).digest()
+    image = _images.get(key)
+    if image is None:
+        try:
+            header = _header(utils.BytesIO(data))
+        except _READ_ERRORS:
+            _logger.error("Unable to read an embedded %s image. Skipping..." % match.group(1))
+            return None
+        image = EmbeddedImage(data, *header)
+        _images.set(key, image)
+    return image
+
+
+def open_image_file(path):
+    """
+    The `FileImage` of the image file at `path`, the same while the file doesn't
+    change, or None if it can't be read
+    """
+    path = os.path.abspath(path)
+    try:
+        stat = os.stat(path)
+    except OSError:
+        image = None
+    else:
+        key = (path, stat.st_mtime, stat.st_size)
+        image = _files.get(key, _MISSING)
+        if image is _MISSING:
+            try:
+                with open(path, 'rb') as f:
+                    image = FileImage(path, *_header(f))
+            except _READ_ERRORS:
+                image = None
+            _files.set(key, image)  # files that aren't images too
+    if image is None:
+        _logger.error("Unable to read the image %s. Skipping..." % path)
+    return image
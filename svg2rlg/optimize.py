@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*
+"""
+Optimizer pass over a converted drawing: collapses the groups that only add nesting.
+
+Every <g>, transformed shape and clipped element becomes a Group, most of which are
+empty, have an identity transform or hold a single group.  The pass
+
+  * drops empty groups,
+  * hoists the children of groups with an identity transform into their parent,
+  * merges a group holding a single group into one group, multiplying the transforms.
+
+A group holding a clipping path is a clipping scope: its children are never hoisted out
+of it.  Shapes and groups may be shared (e.g. by <use> instances), so nothing is changed
+in place; groups that change are replaced by new ones.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import copy
+import logging
+from collections import namedtuple
+
+from reportlab.graphics.shapes import Group, mmult
+
+_logger = logging.getLogger(__name__)
+
+IDENTITY = (1, 0, 0, 1, 0, 0)
+
+# attributes of a Group that only groups, and doesn't change how its contents render
+PLAIN_GROUP_ATTRIBUTES = frozenset(('_attrMap', 'contents', 'transform'))
+
+OptimizeStats = namedtuple('OptimizeStats', ['nodes_before', 'nodes_after'])
+
+
+def count_nodes(shape):
+    """
+    Number of groups and shapes in a tree, counting shared ones every time they appear
+    """
+    if isinstance(shape, Group):
+        return 1 + sum(count_nodes(child) for child in shape.contents)
+    return 1
+
+
+def is_clipping(shape):
+    return bool(getattr(shape, 'isClipPath', 0))
+
+
+def copy_shape(shape):
+    """
+    Shallow copy of a shape or group, whose attributes can be replaced without changing
+    the original
+    """
+    shape = copy.copy(shape)
+    shape.__dict__ = dict(shape.__dict__)
+    return shape
+
+
+def new_group(contents, transform):
+    group = Group()
+    # contents were valid shapes in their original groups, no need to validate them again
+    group.__dict__['contents'] = contents
+    group.__dict__['transform'] = transform
+    return group
+
+
+def _collapse(group):
+    """
+    The shapes that replace `group` in its parent
+    """
+    if set(group.__dict__) - PLAIN_GROUP_ATTRIBUTES:
+        return [group]  # e.g. overprinting, keep as it is
+
+    contents = []
+    for child in group.contents:
+        if isinstance(child, Group):
+            contents.extend(_collapse(child))
+        else:
+            contents.append(child)
+
+    if not contents:
+        return []
+
+    transform = tuple(group.transform)
+    clipping = any(is_clipping(child) for child in contents)
+    if not clipping:
+        if transform == IDENTITY:
+            return contents
+        if len(contents) == 1 and isinstance(contents[0], Group):
+            child = contents[0]
+            return [new_group(list(child.contents), tuple(mmult(transform, child.transform)))]
+
+    if len(contents) == len(group.contents) and all(a is b for a, b in zip(contents, group.contents)):
+        return [group]
+    return [new_group(contents, transform)]
+
+
+def optimize_group(group):
+    """
+    Collapses the groups below `group`, which itself is kept and is the only group changed.
+    :rtype: OptimizeStats
+    """
+    before = count_nodes(group)
+    contents = []
+    for child in group.contents:
+        if isinstance(child, Group):
+            contents.extend(_collapse(child))
+        else:
+            contents.append(child)
+    group.__dict__['contents'] = contents
+    stats = OptimizeStats(before, count_nodes(group))
+    _logger.debug("Optimized groups: %d -> %d nodes" % stats)
+    return stats
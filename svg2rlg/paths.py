@@ -1,25 +1,89 @@
 # -*- coding: utf-8 -*
 from __future__ import print_function, absolute_import, unicode_literals
 
-import copy
 import logging
+from array import array
 
 from reportlab.graphics.shapes import Path
+from reportlab.lib.attrmap import AttrMap, AttrMapValue
+from reportlab.lib.validators import Validator, isListOfNumbers
+
+from svg2rlg.pathdata import OP_CLOSEPATH
 
 _logger = logging.getLogger(__name__)
 
+# the geometry of a path, shared with copies made by `copy_path_attributes` instead of duplicated
+SHARED_ATTRIBUTES = ('points', 'operators')
+
+
+def copy_path_attributes(to_path, from_path):
+    """
+    Copies the attributes of `from_path` to `to_path`.  The geometry is shared, not copied,
+    so neither path may change it in place afterwards.  Colours are immutable and shared
+    as well.
+    """
+    for name, value in from_path.__dict__.items():
+        if name not in SHARED_ATTRIBUTES and isinstance(value, list):
+            value = list(value)  # e.g. strokeDashArray
+        to_path.__dict__[name] = value
+
+
+def insert_close_paths(operators, pointers):
+    """
+    Returns a copy of `operators` with a close path operator inserted before each of the
+    (ascending) indices in `pointers`, in linear time.
+    """
+    result = operators[:0]  # a list, or an array for compact paths
+    start = 0
+    for pointer in pointers:
+        result.extend(operators[start:pointer])
+        result.append(OP_CLOSEPATH)
+        start = pointer
+    result.extend(operators[start:])
+    return result
+
+
+class _IsArrayOrListOfNumbers(Validator):
+    def test(self, x):
+        return isinstance(x, array) or isListOfNumbers(x)
+
+
+class CompactPath(Path):
+    """
+    Path keeping its points in an array('d') and its operators in an array('b'): 8 and
+    1 bytes per item, instead of a list slot plus a float object for every coordinate.
+
+    Arrays index, slice, iterate and extend like the lists ReportLab reads and builds
+    paths with, so it renders and is built like any other Path.
+    """
+
+    _attrMap = AttrMap(
+        BASE=Path,
+        points=AttrMapValue(_IsArrayOrListOfNumbers()),
+        operators=AttrMapValue(_IsArrayOrListOfNumbers()),
+    )
+
+    def __init__(self, points=None, operators=None, **kwargs):
+        Path.__init__(self, array(str('d'), points or ()), array(str('b'), operators or ()), **kwargs)
+
 
 class NoStrokePath(Path):
     """
     This path object never gets a stroke width whatever the properties it's
     getting assigned.
+
+    NoStrokePath(copy_from=path, close_at=pointers) is a copy of `path`, sharing its
+    points, with its subpaths closed at the operator indices `pointers`.
     """
 
     def __init__(self, *args, **kwargs):
-        copy_from = kwargs.pop(b'copy_from', None)
+        copy_from = kwargs.pop(str('copy_from'), None)
+        close_at = kwargs.pop(str('close_at'), None)
         Path.__init__(self, *args, **kwargs)  # we're old-style class on PY2
         if copy_from:
-            self.__dict__.update(copy.deepcopy(copy_from.__dict__))
+            copy_path_attributes(self, copy_from)
+            if close_at:
+                self.__dict__['operators'] = insert_close_paths(copy_from.operators, close_at)
 
     def getProperties(self, *args, **kwargs):
         # __getattribute__ wouldn't suit, as RL is directly accessing self.__dict__
@@ -37,10 +101,10 @@ class ClippingPath(Path):
     """
 
     def __init__(self, *args, **kwargs):
-        copy_from = kwargs.pop(b'copy_from', None)
+        copy_from = kwargs.pop(str('copy_from'), None)
         Path.__init__(self, *args, **kwargs)
         if copy_from:
-            self.__dict__.update(copy.deepcopy(copy_from.__dict__))
+            copy_path_attributes(self, copy_from)
         self.isClipPath = 1
 
     def getProperties(self, *args, **kwargs):
@@ -0,0 +1,211 @@
+# -*- coding: utf-8 -*
+"""
+Coordinate quantization: rounds the coordinates, lengths and transforms of a drawing
+to a number of decimal places in output units (points), so that they are written to
+PDF content streams with a few digits instead of ReportLab's seven significant ones.
+
+Coordinates are rounded in the coordinates of their shape, to the decimal places that
+keep the rounding within the output step under the transforms above the shape, e.g.
+one more place under a scale(10).  Consecutive points made equal by the rounding are
+merged.  The translation of a transform is rounded like the coordinates of the group
+holding it, its linear part to `LINEAR_EXTRA_DIGITS` more places.
+
+Shapes may be shared, so quantized shapes are copies, made once for every shape and
+number of places.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+import math
+from collections import namedtuple
+
+from reportlab.graphics.shapes import (
+    Circle, Ellipse, Group, Line, Path, PolyLine, Polygon, Rect, String, mmult,
+)
+
+from svg2rlg.optimize import copy_shape
+from svg2rlg.pathdata import OP_CURVETO, OP_LINETO, OP_MOVETO
+from svg2rlg.simplify import max_stretch
+
+try:
+    import numpy
+except ImportError:  # optional, only used to speed up long paths
+    numpy = None
+
+_logger = logging.getLogger(__name__)
+
+# points lists with fewer coordinates are rounded in pure python
+NUMPY_MIN_POINTS = 256
+
+# extra decimal places of the linear part (scale, rotation, skew) of transforms: its
+# rounding moves a coordinate x by less than |x| * 10**-(digits + extra), within the step
+# for drawings up to 10**extra points wide
+LINEAR_EXTRA_DIGITS = 3
+
+# the coordinates and lengths of each kind of shape
+SHAPE_LENGTHS = (
+    (Rect, ('x', 'y', 'width', 'height', 'rx', 'ry')),
+    (Circle, ('cx', 'cy', 'r')),
+    (Ellipse, ('cx', 'cy', 'rx', 'ry')),
+    (Line, ('x1', 'y1', 'x2', 'y2')),
+    (String, ('x', 'y')),
+)
+
+QuantizeStats = namedtuple('QuantizeStats', ['values', 'merged'])
+
+
+def _round(value, digits):
+    return round(value, digits) + 0.0  # no -0.0, written as "-0"
+
+
+def round_points(points, digits):
+    """
+    Copy of a sequence of numbers rounded to `digits` places, of the same type
+    """
+    result = points[:0]
+    if numpy is not None and len(points) >= NUMPY_MIN_POINTS:
+        result.extend((numpy.round(numpy.asarray(points, dtype=float), digits) + 0.0).tolist())
+    else:
+        result.extend(_round(v, digits) for v in points)
+    return result
+
+
+def merge_points(points, operators=None):
+    """
+    (points, operators) without the line segments, or polygon/polyline vertices,
+    repeating the point before them.  The line right after a move is kept, it may be
+    the dot of a round cap.
+    """
+    result = points[:0]
+    if operators is None:
+        last = None
+        for x, y in zip(points[0::2], points[1::2]):
+            if (x, y) != last:
+                result.append(x)
+                result.append(y)
+                last = x, y
+        if len(result) == 2 and len(points) > 2:
+            result.extend(result)  # a polyline of a single point draws nothing
+        return result, None
+
+    result_operators = operators[:0]
+    i = 0
+    last = None
+    previous = None
+    for op in operators:
+        if op == OP_LINETO and previous != OP_MOVETO and (points[i], points[i + 1]) == last:
+            i += 2
+            continue
+        result_operators.append(op)
+        if op == OP_MOVETO or op == OP_LINETO:
+            last = points[i], points[i + 1]
+            result.extend(points[i:i + 2])
+            i += 2
+        elif op == OP_CURVETO:
+            last = points[i + 4], points[i + 5]
+            result.extend(points[i:i + 6])
+            i += 6
+        previous = op
+    return result, result_operators
+
+
+def digits_for(transform, digits):
+    """
+    Decimal places of the coordinates under `transform` for a step of 10**-digits
+    output units
+    """
+    stretch = max_stretch(transform)
+    if stretch <= 1:
+        return digits
+    return digits + int(math.ceil(math.log10(stretch)))
+
+
+def quantize_transform(transform, digits):
+    a, b, c, d, e, f = transform
+    linear = digits + LINEAR_EXTRA_DIGITS
+    return (
+        _round(a, linear), _round(b, linear), _round(c, linear), _round(d, linear),
+        _round(e, digits), _round(f, digits),
+    )
+
+
+class _Quantizer(object):
+    def __init__(self, digits):
+        self.digits = digits
+        self.quantized = {}  # (id, digits) -> (shape, quantized shape)
+        self.values = 0
+        self.merged = 0
+
+    def quantize(self, group, transform, digits):
+        """
+        Copy of `group` quantized, `digits` being the decimal places of its parent
+        """
+        group = copy_shape(group)
+        group.__dict__['transform'] = quantize_transform(group.transform, digits)
+        transform = mmult(transform, group.transform)
+        inner = digits_for(transform, self.digits)
+        group.__dict__['contents'] = [
+            self.quantize(child, transform, inner) if isinstance(child, Group) else self.quantize_shape(child, inner)
+            for child in group.contents
+        ]
+        return group
+
+    def quantize_shape(self, shape, digits):
+        key = (id(shape), digits)
+        try:
+            original, quantized = self.quantized[key]
+        except KeyError:
+            quantized = self._quantized(shape, digits)
+            self.quantized[key] = (shape, quantized)  # keeps `shape`, and its id, alive
+        return quantized
+
+    def _quantized(self, shape, digits):
+        if isinstance(shape, (Path, Polygon, PolyLine)):
+            quantized = copy_shape(shape)
+            points = round_points(shape.points, digits)
+            if isinstance(shape, Path):
+                points, operators = merge_points(points, shape.operators)
+                quantized.__dict__['operators'] = operators
+            else:
+                points, _ = merge_points(points)
+            self.values += len(shape.points)
+            self.merged += (len(shape.points) - len(points)) // 2
+            quantized.__dict__['points'] = points
+        else:
+            for kind, names in SHAPE_LENGTHS:
+                if isinstance(shape, kind):
+                    break
+            else:
+                return shape
+            quantized = copy_shape(shape)
+            for name in names:
+                quantized.__dict__[name] = _round(getattr(shape, name), digits)
+            self.values += len(names)
+
+        width = getattr(shape, 'strokeWidth', None)
+        if width and _round(width, digits):
+            quantized.__dict__['strokeWidth'] = _round(width, digits)
+        dashes = getattr(shape, 'strokeDashArray', None)
+        if dashes and all(_round(v, digits) for v in dashes):
+            quantized.__dict__['strokeDashArray'] = [_round(v, digits) for v in dashes]
+        return quantized
+
+
+def quantize_group(group, digits):
+    """
+    Rounds the coordinates, lengths and transforms below `group` to `digits` decimal
+    places in output units.  `group` keeps its own transform and is the only group
+    changed.
+    :rtype: QuantizeStats
+    """
+    quantizer = _Quantizer(digits)
+    inner = digits_for(group.transform, digits)
+    transform = tuple(group.transform)
+    group.__dict__['contents'] = [
+        quantizer.quantize(child, transform, inner) if isinstance(child, Group)
+        else quantizer.quantize_shape(child, inner)
+        for child in group.contents
+    ]
+    stats = QuantizeStats(quantizer.values, quantizer.merged)
+    _logger.debug("Quantized %d values to %d places, %d points merged" % (stats.values, digits, stats.merged))
+    return stats
@@ -1,16 +1,24 @@
 # -*- coding: utf-8 -*-
 from __future__ import print_function, absolute_import, unicode_literals
 
-import copy
 import logging
 import re
 from collections import defaultdict, namedtuple
 
-from reportlab.graphics.shapes import Group, Drawing, Rect
+from lxml import etree
+from reportlab.graphics import renderPDF
+from reportlab.graphics.renderbase import StateTracker
+from reportlab.graphics.shapes import Group, Drawing, Rect, mmult
 
+from svg2rlg.bake import bake_group, transform_points
+from svg2rlg.cull import cull_group
+from svg2rlg.displaylist import DisplayListBuilder
+from svg2rlg.optimize import IDENTITY, optimize_group
 from svg2rlg.paths import ClippingPath
+from svg2rlg.quantize import quantize_group
 from svg2rlg.shapes import ShapeConverter
-from svg2rlg.utils import node_name, node_attr, node_attrs, node_xlink_href
+from svg2rlg.simplify import simplify_group
+from svg2rlg.utils import is_string, node_name, node_attr, node_attrs, node_xlink_href
 from . import attributes
 
 _logger = logging.getLogger(__name__)
@@ -25,18 +33,66 @@ class SvgRenderer:
     transforming it into a ReportLab Drawing instance.
     """
 
-    def __init__(self, file_path=None):
-        self.shape_converter = ShapeConverter(file_path=file_path)
+    def __init__(self, file_path=None, compact_paths=False, optimize=False, bake_transforms=False,
+                 simplify_tolerance=None, quantize_digits=None, cull=False):
+        """
+        :param compact_paths: convert paths to compact array backed paths, see `paths.CompactPath`
+        :param optimize: collapse redundant groups once converted, see `optimize.optimize_group`
+        :param bake_transforms: apply group transforms to the shapes' coordinates once
+            converted, see `bake.bake_group`; fewer nodes, but usually bigger PDFs
+        :param simplify_tolerance: remove the path vertices within this distance, in points,
+            of the simplified outline, see `simplify.simplify_group`
+        :param quantize_digits: round coordinates, lengths and transforms to this many
+            decimal places in points, see `quantize.quantize_group`
+        :param cull: drop the shapes lying outside the view box, see `cull.cull_group`
+        """
+        self.shape_converter = ShapeConverter(file_path=file_path, compact_paths=compact_paths)
+        self.optimize = optimize
+        self.bake_transforms = bake_transforms
+        self.simplify_tolerance = simplify_tolerance
+        self.quantize_digits = quantize_digits
+        self.cull = cull
+        self.stats = {}
         self.handled_shapes = self.shape_converter.get_handled_shapes()
         self.definitions = {}
         self.waiting_use_nodes = defaultdict(list)
+        self.instances = {}
+        self.instantiating = set()
+        self.clip_paths = {}
         self.box = Box(x=0, y=0, width=0, height=0)
 
     def render(self, svg_node):
+        self.index_definitions(svg_node)
         main_group = self.render_node(svg_node)
+        return self.finish(main_group)
+
+    def index_definitions(self, svg_node):
+        """
+        Registers every element with an id up front, so that references to elements
+        further down the document resolve immediately.  The first of duplicate ids wins.
+        """
+        for node in reversed(svg_node.xpath('//*[@id]')):
+            self.definitions[node.get('id')] = node
+
+    def finish(self, main_group):
+        """
+        Places the rendered main group in a Drawing of the size of the view box
+        """
         for xlink in self.waiting_use_nodes.keys():
             _logger.debug("Ignoring unavailable object width ID '%s'." % xlink)
 
+        if self.cull:
+            self.stats['cull'] = cull_group(main_group, self.box)
+        if self.bake_transforms:
+            self.stats['bake'] = bake_group(main_group)
+        if self.simplify_tolerance is not None:
+            self.stats['simplify'] = simplify_group(main_group, self.simplify_tolerance)
+        if self.optimize:
+            self.stats['optimize'] = optimize_group(main_group)
+        if self.quantize_digits is not None:
+            # last, the other passes compute new coordinates and transforms
+            self.stats['quantize'] = quantize_group(main_group, self.quantize_digits)
+
         main_group.scale(1, -1)
         main_group.translate(0 - self.box.x, -self.box.height - self.box.y)
         drawing = Drawing(self.box.width, self.box.height)
@@ -44,6 +100,9 @@ class SvgRenderer:
         return drawing
 
     def render_node(self, node, parent=None):
+        # styles are computed top down, so each node only needs its parent's style
+        self.shape_converter.styles.computed(node)
+
         nid = node_attr(node, "id")
         ignored = False
         item = None
@@ -98,6 +157,31 @@ class SvgRenderer:
                 for use_node, group in to_render:
                     self.render_use(use_node, group=group)
 
+    def get_instance(self, ref, use_node):
+        """
+        Group of the shapes rendered from a definition, as referenced by a <use>.
+
+        A definition is rendered once per distinct style of the <use> elements that
+        reference it, which it inherits from; the shapes are shared between those.
+        """
+        use_style = self.shape_converter.styles.computed(use_node)
+        key = (ref, use_style)
+        instance = self.instances.get(key)
+        if instance is None:
+            if ref in self.instantiating:
+                _logger.warning("Ignoring circular reference to '%s'." % ref)
+                return Group()
+
+            instance = Group()
+            self.instantiating.add(ref)
+            try:
+                with self.shape_converter.styles.instance(self.definitions[ref], use_style):
+                    self.render_node(self.definitions[ref], parent=instance)
+            finally:
+                self.instantiating.discard(ref)
+            self.instances[key] = instance
+        return instance
+
     def get_definition(self, ref):
         return self.definitions.get(ref.replace("#", ""), None)
 
@@ -114,8 +198,18 @@ class SvgRenderer:
             """
             for child in innernode.getchildren():
                 if node_name(child) == 'path':
-                    group = self.shape_converter.convert(child)
-                    return group.contents[-1]
+                    path = self.shape_converter.convert(child)
+                    transform = IDENTITY
+                    while isinstance(path, Group):
+                        # the converted path, inside a group for its transform or closed copy
+                        transform = tuple(mmult(transform, path.transform))
+                        path = path.contents[-1] if path.contents else None
+                    if path is not None and transform != IDENTITY:
+                        # the clipping path is drawn without the groups, so with their
+                        # transform applied to its points
+                        path = ClippingPath(copy_from=path)
+                        path.__dict__['points'] = transform_points(path.points, transform)
+                    return path
                 if node_name(child) == 'rect':
                     # convert a rect into a path and apply the rect's styles
                     rect = self.shape_converter.convert(child)  # type: Rect
@@ -138,13 +232,18 @@ class SvgRenderer:
             m = re.match(r'url\(#([^\)]*)\)', clip_path)
             if m:
                 ref = m.groups()[0]
+                if ref in self.clip_paths:
+                    return self.clip_paths[ref]
                 if ref in self.definitions:
+                    # the clipping path is converted once and shared by every element it
+                    # clips, the transform of an element is on the group holding it
                     path = get_path_from_node(self.definitions[ref])
                     if path:
                         path = ClippingPath(copy_from=path)
-                        return path
                     else:
                         _logger.debug("couldn't find path reference %s" % ref)
+                    self.clip_paths[ref] = path
+                    return path
 
     def get_viewbox(self, node):
         width, height, view_box = node_attrs(node, "width", "height", "viewBox")
@@ -208,18 +307,15 @@ class SvgRenderer:
 
         # strip the leading "#"
         if xlink_href[1:] not in self.definitions:
-            # The missing definition should appear later in the file
+            # The missing definition may appear later in a document that is being streamed
             self.waiting_use_nodes[xlink_href[1:]].append((node, group))
             return group
 
         if clipping:
             group.add(clipping)
 
-        if len(node.getchildren()) == 0:
-            # Append a copy of the referenced node as the <use> child (if not already done)
-            node.append(copy.deepcopy(self.definitions[xlink_href[1:]]))
-
-        self.render_node(node.getchildren()[-1], parent=group)
+        for item in self.get_instance(xlink_href[1:], node).contents:
+            group.add(item)
 
         x, y, transform = node_attrs(node, "x", "y", "transform")
         if x or y:
@@ -229,3 +325,313 @@ class SvgRenderer:
             self.shape_converter.apply_transform(transform, group)
 
         return group
+
+
+class StreamingSvgRenderer(SvgRenderer):
+    """
+    Renderer that converts an SVG document while it is being parsed.
+
+    The children of the root <svg> and of the groups (<g> and <a>) in it are converted
+    as soon as they have been parsed, then removed from the tree.  The document is
+    scanned once beforehand for the ids referenced by a <use>, a clip-path...; the
+    elements with such an id, and the elements containing them, are kept, and a group
+    with such an id is converted whole rather than streamed.  A source that can't be
+    read twice isn't scanned, and every element with an id is kept.  Peak memory is
+    bounded by the depth of the document and the size of the elements that are kept,
+    rather than by the size of the document.
+    """
+
+    def __init__(self, *args, **kwargs):
+        SvgRenderer.__init__(self, *args, **kwargs)
+        self.referenced = None
+
+    def render_stream(self, source):
+        """
+        :param source: file name or file-like object of an SVG document
+        :rtype: reportlab.graphics.shapes.Drawing
+        """
+        self.referenced = self.scan_references(source)
+        root = None
+        main_group = None
+        containers = []  # (node, group) of the groups being streamed, innermost last
+
+        for event, node in etree.iterparse(source, events=('start', 'end'), remove_comments=True, recover=True):
+            parent = node.getparent()
+            if event == 'start':
+                if root is None:
+                    root = node
+                if self.is_streamed(node) and (parent is None or (containers and containers[-1][0] is parent)):
+                    containers.append((node, self.start_container(node)))
+
+            elif containers and containers[-1][0] is node:
+                node, group = containers.pop()
+                if containers:
+                    self.end_container(node, group, parent=containers[-1][1])
+                    self.discard(node)
+                else:
+                    main_group = group
+
+            elif containers and containers[-1][0] is parent:
+                self.render_node(node, parent=containers[-1][1])
+                self.discard(node)
+
+        if main_group is None:
+            # not an <svg> document, nothing has been streamed
+            return self.render(root)
+        return self.finish(main_group)
+
+    def scan_references(self, source):
+        """
+        Ids referenced in the document, or None if `source` can't be read twice
+        """
+        if not is_string(source):
+            try:
+                position = source.tell()
+            except (AttributeError, IOError, OSError, ValueError):
+                return None
+
+        referenced = set()
+        for _, node in etree.iterparse(source, remove_comments=True, recover=True):
+            for name, value in node.attrib.items():
+                if name.endswith('href'):
+                    if value.startswith('#'):
+                        referenced.add(value[1:])
+                elif 'url(' in value:
+                    referenced.update(re.findall(r'url\(#([^\)]*)\)', value))
+            # only the elements being parsed are kept
+            node.clear()
+            parent = node.getparent()
+            if parent is not None:
+                while node.getprevious() is not None:
+                    del parent[0]
+
+        if not is_string(source):
+            source.seek(position)
+        return referenced
+
+    def is_referenced(self, nid):
+        return self.referenced is None or nid in self.referenced
+
+    def is_streamed(self, node):
+        name = node_name(node)
+        if name == 'svg':
+            return node.getparent() is None
+        if name not in ('g', 'a'):
+            return False
+        nid = node_attr(node, 'id')
+        return not nid or not self.is_referenced(nid)
+
+    def start_container(self, node):
+        self.shape_converter.styles.computed(node)
+
+        if node_name(node) == 'svg':
+            if node_attr(node, "{%s}space" % XML_NS) == 'preserve':
+                self.shape_converter.preserve_space = True
+            self.box = self.get_viewbox(node)
+            return Group()
+
+        group = Group()
+        if node_name(node) == 'g':
+            clipping = self.get_clippath(node)
+            if clipping:
+                group.add(clipping)
+        return group
+
+    def end_container(self, node, group, parent):
+        transform = node_attr(node, "transform")
+        if transform:
+            self.shape_converter.apply_transform(transform, group)
+
+        if node_name(node) == 'a' or node_attr(node, "display") != "none":
+            parent.add(group)
+
+    def discard(self, node):
+        """
+        Removes a converted element from the tree, unless it is, or contains, a
+        definition that may be referenced later or a <use> waiting for its reference
+        """
+        definitions = []
+        for element in node.iter():
+            nid = element.get('id')
+            if nid and self.definitions.get(nid) is element:
+                if self.is_referenced(nid):
+                    return
+                definitions.append(nid)
+            xlink_href = node_xlink_href(element) if node_name(element) == 'use' else None
+            if xlink_href and any(element is use_node for use_node, _ in self.waiting_use_nodes.get(xlink_href[1:], ())):
+                return
+
+        for nid in definitions:
+            del self.definitions[nid]
+        self.shape_converter.styles.forget(node)
+        node.clear()
+        node.getparent().remove(node)
+
+
+class _CanvasSink(object):
+    """
+    Stands in for the Group that converted shapes are added to, and draws them on a
+    canvas right away instead of keeping them.  Groups of the document are opened and
+    closed as graphics states of the canvas, the way renderPDF draws a Group.
+    """
+
+    def __init__(self, canvas, x=0, y=0):
+        self.canvas = canvas
+        self.origin = (x, y)
+        self.renderer = renderPDF._PDFRenderer()
+        self.shapes = 0
+
+    def start(self, box):
+        # as renderPDF.draw does for a whole drawing
+        drawing = Drawing(box.width, box.height)
+        renderer = self.renderer
+        renderer._tracker = StateTracker(defaultObj=drawing)
+        renderer._canvas = self.canvas
+        self.canvas.__dict__['_drawing'] = renderer._drawing = drawing
+        self.canvas.saveState()
+        renderer.initState(*self.origin)
+
+    def stop(self):
+        self.renderer.pop()
+        self.canvas.restoreState()
+        del self.renderer._canvas, self.renderer._drawing, self.canvas._drawing, self.renderer._tracker
+
+    def push(self, transform, clipping=None):
+        self.canvas.saveState()
+        deltas = {'transform': transform}
+        self.renderer._tracker.push(deltas)
+        self.renderer.applyStateChanges(deltas, {})
+        if clipping is not None:
+            self.add(clipping)
+
+    def pop(self):
+        self.renderer._tracker.pop()
+        self.canvas.restoreState()
+
+    def add(self, shape):
+        # as renderPDF's drawGroup does for each of its contents
+        self.renderer.fillDerivedValues(shape)
+        shape._canvas = self.canvas
+        try:
+            self.renderer.drawNode(shape)
+        finally:
+            del shape._canvas
+        self.shapes += 1
+
+
+class SinkRenderer(SvgRenderer):
+    """
+    Renderer that hands the shapes to a sink as soon as they are converted, instead of
+    building a Drawing.
+
+    Elements are converted as with `SvgRenderer`, but the groups of the document (<svg>,
+    <g> and <a>) are opened and closed on the sink rather than made into Group objects,
+    so no shape is kept once handed over.  The shapes of <use> definitions are kept, to
+    be handed over at every reference.  A sink has the methods
+
+      start(box): before anything else, with the view box
+      push(transform, clipping=None): opens a group, clipped by the clipping path if any
+      pop(): closes the last group opened
+      add(shape): a shape or Group in the current group
+      stop(): after everything else
+
+    The passes over a converted drawing (culling, optimizing...) don't apply.
+    """
+
+    def __init__(self, file_path=None, compact_paths=False):
+        SvgRenderer.__init__(self, file_path=file_path, compact_paths=compact_paths)
+        self.sink = None
+
+    def render(self, svg_node, sink):
+        """
+        Hands the document over to `sink`
+        :returns: the view box
+        """
+        self.index_definitions(svg_node)
+        self.sink = sink
+        try:
+            self.render_node(svg_node)
+        finally:
+            self.sink = None
+        for xlink in self.waiting_use_nodes.keys():
+            _logger.debug("Ignoring unavailable object width ID '%s'." % xlink)
+        return self.box
+
+    def render_node(self, node, parent=None):
+        name = node_name(node)
+        if parent is None and name == 'svg':
+            self.draw_svg(node)
+        elif parent is self.sink and name in ('g', 'a'):
+            self.draw_group(node)
+        else:
+            SvgRenderer.render_node(self, node, parent=parent)
+            if parent is self.sink:
+                self.shape_converter.styles.forget(node)
+
+    def draw_svg(self, node):
+        self.shape_converter.styles.computed(node)
+        if node_attr(node, "{%s}space" % XML_NS) == 'preserve':
+            self.shape_converter.preserve_space = True
+        self.box = self.get_viewbox(node)
+
+        self.sink.start(self.box)
+        # flipped, as the main group of a Drawing in `finish`
+        self.sink.push((1, 0, 0, -1, -self.box.x, self.box.height + self.box.y))
+        for child in node.getchildren():
+            self.render_node(child, parent=self.sink)
+        self.sink.pop()
+        self.sink.stop()
+
+    def draw_group(self, node):
+        self.shape_converter.styles.computed(node)
+        name = node_name(node)
+        if name == 'g' and node_attr(node, "display") == "none":
+            return
+
+        group = Group()
+        transform = node_attr(node, "transform")
+        if transform:
+            self.shape_converter.apply_transform(transform, group)
+        self.sink.push(tuple(group.transform), self.get_clippath(node) if name == 'g' else None)
+        for child in node.getchildren():
+            self.render_node(child, parent=self.sink)
+        self.sink.pop()
+
+
+class CanvasRenderer(SinkRenderer):
+    """
+    Renderer that draws an SVG document straight on a ReportLab canvas, e.g. a PDF
+    page, instead of building a Drawing: the groups of the document become graphics
+    states of the canvas and the shapes are drawn as they are converted, see
+    `SinkRenderer`.
+    """
+
+    def render(self, svg_node, canvas, x=0, y=0):
+        """
+        Draws the document with the bottom left corner of its view box at `x`, `y`
+        :returns: the view box
+        """
+        sink = _CanvasSink(canvas, x, y)
+        SinkRenderer.render(self, svg_node, sink)
+        self.stats['shapes'] = sink.shapes
+        return self.box
+
+
+class DisplayListRenderer(SinkRenderer):
+    """
+    Renderer that converts an SVG document to a flat `displaylist.DisplayList` of draw
+    commands, without building a Drawing, see `SinkRenderer`.  Paths are converted
+    to compact paths by default, whose arrays the commands share.
+    """
+
+    def __init__(self, file_path=None, compact_paths=True):
+        SinkRenderer.__init__(self, file_path=file_path, compact_paths=compact_paths)
+
+    def render(self, svg_node):
+        """
+        :rtype: displaylist.DisplayList
+        """
+        builder = DisplayListBuilder()
+        SinkRenderer.render(self, svg_node, builder)
+        self.stats['commands'] = len(builder.commands)
+        return builder.display_list()
@@ -4,15 +4,61 @@ from __future__ import print_function, absolute_import, unicode_literals
 import os
 from reportlab.pdfbase import pdfmetrics, ttfonts
 
-FONT_ALIASES = {
+
+class FontAliases(dict):
+    """
+    Dict counting its changes, so that the fonts resolved through it are looked up
+    again when an alias is added, removed or remapped
+    """
+    changes = 0
+
+    def _changed(method):
+        def wrapper(self, *args, **kwargs):
+            self.changes += 1
+            return method(self, *args, **kwargs)
+        wrapper.__name__ = method.__name__
+        return wrapper
+
+    __setitem__ = _changed(dict.__setitem__)
+    __delitem__ = _changed(dict.__delitem__)
+    clear = _changed(dict.clear)
+    pop = _changed(dict.pop)
+    popitem = _changed(dict.popitem)
+    setdefault = _changed(dict.setdefault)
+    update = _changed(dict.update)
+    del _changed
+
+
+# change it in place, or assign another FontAliases
+FONT_ALIASES = FontAliases({
     "sans-serif": "Helvetica",
     "serif": "Times-Roman",
     "monospace": "Courier",
-}
+})
 
 DEFAULT_FONT = 'Helvetica'
 
+# number of distinct colour strings whose conversion is remembered
+COLOR_CACHE_SIZE = 1024
+
+# number of (text, font, size) advance widths that are remembered
+TEXT_WIDTH_CACHE_SIZE = 4096
+
+# number of distinct embedded images that are remembered, see `images`
+IMAGE_CACHE_SIZE = 64
+
+# number of image files whose validity, format and size are remembered, see `images`
+IMAGE_FILE_CACHE_SIZE = 1024
+
+# bytes of decoded image pixels kept, see `images`
+IMAGE_PIXEL_BYTES = 256 * 1024 * 1024
+
 __all__ = [
     'FONT_ALIASES',
     'DEFAULT_FONT',
+    'COLOR_CACHE_SIZE',
+    'TEXT_WIDTH_CACHE_SIZE',
+    'IMAGE_CACHE_SIZE',
+    'IMAGE_FILE_CACHE_SIZE',
+    'IMAGE_PIXEL_BYTES',
 ]
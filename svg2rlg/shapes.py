@@ -1,31 +1,23 @@
 # -*- coding: utf-8 -*
 from __future__ import print_function, absolute_import, unicode_literals
 
-import base64
-import hashlib
 import logging
 import os
-import re
-import tempfile
 from functools import partial
-from os.path import dirname
-from xml.dom.minidom import Element
 
 import itertools
 from reportlab.graphics.shapes import Line, Rect, Circle, Ellipse, Group, Polygon, PolyLine, String, Path, Image, Shape
 from reportlab.lib import colors
-from reportlab.pdfbase.pdfmetrics import stringWidth
 from reportlab.pdfgen.canvas import FILL_NON_ZERO, FILL_EVEN_ODD
-from reportlab.pdfgen.pdfimages import PDFImage
 
-from svg2rlg.paths import NoStrokePath
+from svg2rlg.paths import CompactPath, NoStrokePath
+from svg2rlg.style import StyleResolver
+from svg2rlg.pathdata import OP_CLOSEPATH
 from svg2rlg.utils import node_name, node_attr
-from . import utils, attributes, settings
+from . import utils, attributes, images, settings, pathdata, text as textmetrics
 
 _logger = logging.getLogger(__name__)
 
-OP_MOVETO, OP_LINETO, OP_CURVETO, OP_CLOSEPATH = list(range(4))
-
 
 # [
 #   { code:'M', command:'moveto', x:3, y:7 },
@@ -52,19 +44,41 @@ OP_MOVETO, OP_LINETO, OP_CURVETO, OP_CLOSEPATH = list(range(4))
 #   { code:'Z', command:'closepath' }
 # ]
 
+# tuple format: (svgAttr, rlgAttr, converter, default)
+STYLE_MAPPING = (
+    ("fill", "fillColor", "convert_color", "black"),
+    ("fill-opacity", "fillOpacity", "convert_opacity", 1),
+    ("stroke", "strokeColor", "convert_color", "none"),
+    ("fill-rule", "_fillRule", "convert_fill_rule", "nonzero"),
+    ("stroke-width", "strokeWidth", "convert_length", "1"),
+    ("stroke-opacity", "strokeOpacity", "convert_opacity", 1),
+    ("stroke-linejoin", "strokeLineJoin", "convert_line_join", "0"),
+    ("stroke-linecap", "strokeLineCap", "convert_line_cap", "0"),
+    ("stroke-dasharray", "strokeDashArray", "convert_dash_array", "none"),
+)
+TEXT_STYLE_MAPPING = (
+    ("font-family", "fontName", "convert_font_family", "Helvetica"),
+    ("font-size", "fontSize", "convert_length", "12"),
+    ("text-anchor", "textAnchor", "identity", "start"),
+)
+
 
 class ShapeConverter(object):
     """
     Converter from SVG shapes to RLG (ReportLab Graphics) shapes.
     """
 
-    def __init__(self, file_path):
+    def __init__(self, file_path, compact_paths=False):
         """
         :param file_path: Path to the original file, used to resolve images/external files
         :type file_path: str| None
+        :param compact_paths: make array backed `paths.CompactPath`s instead of `Path`s
         """
         self.preserve_space = False
         self.svg_source_file = file_path
+        self.compact_paths = compact_paths
+        self.styles = StyleResolver()
+        self._resolved_styles = {}
 
     def get_handled_shapes(self):
         """
@@ -194,13 +208,14 @@ class ShapeConverter(object):
         preserve_space = utils.node_preserve_space(node, self.preserve_space)
 
         gr = Group()
-        frag_lengths = []
+        offset = 0  # advance of the fragments laid out so far
 
         dx0, dy0 = 0, 0
         x1, y1 = 0, 0
 
-        ff = attributes.convert_font_family(attributes.find(node, "font-family"))  # default is set inside convert_...
-        fs = attributes.convert_length(attributes.find(node, "font-size") or "12")
+        style = self.styles.computed(node)
+        ff = attributes.convert_font_family(style.font_family, style.font_weight, style.font_style)  # default is set inside convert_...
+        fs = attributes.convert_length(style.font_size or "12")
         convert_len = partial(attributes.convert_length, em_base=fs)
 
         for c in itertools.chain([node], node.getchildren()):
@@ -228,13 +243,12 @@ class ShapeConverter(object):
             else:
                 continue
 
-            frag_lengths.append(stringWidth(text, ff, fs))
-            new_x = (x1 + dx) if has_x else (x + dx0 + sum(frag_lengths[:-1]))
+            new_x = (x1 + dx) if has_x else (x + dx0 + offset)
             new_y = (y1 + dy) if has_y else (y + dy0)
+            offset += textmetrics.string_width(text, ff, fs)
             shape = String(new_x, -(new_y - baseline_shift), text)
-            self.apply_style(to_shape=shape, from_node=node)
-            if node_name(c) == 'tspan':
-                self.apply_style(to_shape=shape, from_node=c)
+            # the computed style of a tspan already includes everything it inherits from the text
+            self.apply_style(to_shape=shape, from_node=c)
 
             gr.add(shape)
 
@@ -253,147 +267,14 @@ class ShapeConverter(object):
 
     # noinspection PyUnusedLocal
     def convert_path(self, node):
-        normalized_path = utils.normalize_svg_path(node_attr(node, 'd'))
+        ops, args = pathdata.parse_path_data(node_attr(node, 'd'))
+        if not ops:
+            return None
 
-        path = Path()
-        points = path.points
+        path = CompactPath() if self.compact_paths else Path()
 
         # Track subpaths needing to be closed later
-        unclosed_subpath_pointers = []
-        subpath_start = []
-        last_op = ''
-
-        for op, nums in utils.pairwise(normalized_path):
-
-            if op in ('m', 'M') and last_op != '' and path.operators[-1] != OP_CLOSEPATH:
-                unclosed_subpath_pointers.append(len(path.operators))
-
-            # moveto absolute
-            if op == 'M':
-                path.moveTo(*nums)
-                subpath_start = points[-2:]
-
-            # lineto absolute
-            elif op == 'L':
-                path.lineTo(*nums)
-
-            # moveto relative
-            elif op == 'm':
-                if len(points) >= 2:
-                    if last_op in ('Z', 'z'):
-                        starting_point = subpath_start
-                    else:
-                        starting_point = points[-2:]
-                    xn, yn = starting_point[0] + nums[0], starting_point[1] + nums[1]
-                    path.moveTo(xn, yn)
-                else:
-                    path.moveTo(*nums)
-                subpath_start = points[-2:]
-
-            # lineto relative
-            elif op == 'l':
-                xn, yn = points[-2] + nums[0], points[-1] + nums[1]
-                path.lineTo(xn, yn)
-
-            # horizontal/vertical line absolute
-            elif op == 'H':
-                path.lineTo(nums[0], points[-1])
-            elif op == 'V':
-                path.lineTo(points[-2], nums[0])
-
-            # horizontal/vertical line relative
-            elif op == 'h':
-                path.lineTo(points[-2] + nums[0], points[-1])
-            elif op == 'v':
-                path.lineTo(points[-2], points[-1] + nums[0])
-
-            # cubic bezier, absolute
-            elif op == 'C':
-                path.curveTo(*nums)
-            elif op == 'S':
-                x2, y2, xn, yn = nums
-                if len(points) < 4 or last_op not in {'c', 'C', 's', 'S'}:
-                    xp, yp, x0, y0 = points[-2:] * 2
-                else:
-                    xp, yp, x0, y0 = points[-4:]
-                xi, yi = x0 + (x0 - xp), y0 + (y0 - yp)
-                path.curveTo(xi, yi, x2, y2, xn, yn)
-
-            # cubic bezier, relative
-            elif op == 'c':
-                xp, yp = points[-2:]
-                x1, y1, x2, y2, xn, yn = nums
-                path.curveTo(xp + x1, yp + y1, xp + x2, yp + y2, xp + xn, yp + yn)
-            elif op == 's':
-                x2, y2, xn, yn = nums
-                if len(points) < 4 or last_op not in {'c', 'C', 's', 'S'}:
-                    xp, yp, x0, y0 = points[-2:] * 2
-                else:
-                    xp, yp, x0, y0 = points[-4:]
-                xi, yi = x0 + (x0 - xp), y0 + (y0 - yp)
-                path.curveTo(xi, yi, x0 + x2, y0 + y2, x0 + xn, y0 + yn)
-
-            # quadratic bezier, absolute
-            elif op == 'Q':
-                x0, y0 = points[-2:]
-                x1, y1, xn, yn = nums
-                (x0, y0), (x1, y1), (x2, y2), (xn, yn) = \
-                    utils.convert_quadratic_path_to_cubic((x0, y0), (x1, y1), (xn, yn))
-                path.curveTo(x1, y1, x2, y2, xn, yn)
-
-            elif op == 'T':
-                if len(points) < 4:
-                    xp, yp, x0, y0 = points[-2:] * 2
-                else:
-                    xp, yp, x0, y0 = points[-4:]
-                xi, yi = x0 + (x0 - xp), y0 + (y0 - yp)
-                xn, yn = nums
-                (x0, y0), (x1, y1), (x2, y2), (xn, yn) = \
-                    utils.convert_quadratic_path_to_cubic((x0, y0), (xi, yi), (xn, yn))
-                path.curveTo(x1, y1, x2, y2, xn, yn)
-
-            # quadratic bezier, relative
-            elif op == 'q':
-                x0, y0 = points[-2:]
-                x1, y1, xn, yn = nums
-                x1, y1, xn, yn = x0 + x1, y0 + y1, x0 + xn, y0 + yn
-                (x0, y0), (x1, y1), (x2, y2), (xn, yn) = \
-                    utils.convert_quadratic_path_to_cubic((x0, y0), (x1, y1), (xn, yn))
-                path.curveTo(x1, y1, x2, y2, xn, yn)
-            elif op == 't':
-                if len(points) < 4:
-                    xp, yp, x0, y0 = points[-2:] * 2
-                else:
-                    xp, yp, x0, y0 = points[-4:]
-                x0, y0 = points[-2:]
-                xn, yn = nums
-                xn, yn = x0 + xn, y0 + yn
-                xi, yi = x0 + (x0 - xp), y0 + (y0 - yp)
-                (x0, y0), (x1, y1), (x2, y2), (xn, yn) = \
-                    utils.convert_quadratic_path_to_cubic((x0, y0), (xi, yi), (xn, yn))
-                path.curveTo(x1, y1, x2, y2, xn, yn)
-
-            # elliptical arc
-            elif op in ('A', 'a'):
-                rx, ry, phi, fA, fS, x2, y2 = nums
-                x1, y1 = points[-2:]
-                if op == 'a':
-                    x2 += x1
-                    y2 += y1
-                if abs(rx) <= 1e-10 or abs(ry) <= 1e-10:
-                    path.lineTo(x2, y2)
-                else:
-                    bp = utils.bezier_arc_from_end_points(x1, y1, rx, ry, phi, fA, fS, x2, y2)
-                    for _, _, x1, y1, x2, y2, xn, yn in bp:
-                        path.curveTo(x1, y1, x2, y2, xn, yn)
-
-            # close path
-            elif op in ('Z', 'z'):
-                path.closePath()
-
-            else:
-                _logger.debug("Suspicious path operator: %s" % op)
-            last_op = op
+        unclosed_subpath_pointers = pathdata.build_path(path, ops, args)
 
         gr = Group()
         self.apply_style(path, node)
@@ -405,9 +286,7 @@ class ShapeConverter(object):
             # ReportLab doesn't fill unclosed paths, so we are creating a copy
             # of the path with all subpaths closed, but without stroke.
             # https://bitbucket.org/rptlab/reportlab/issues/99/
-            closed_path = NoStrokePath(copy_from=path)
-            for pointer in reversed(unclosed_subpath_pointers):
-                closed_path.operators.insert(pointer, OP_CLOSEPATH)
+            closed_path = NoStrokePath(copy_from=path, close_at=unclosed_subpath_pointers)
             gr.add(closed_path)
             path.fillColor = None
 
@@ -415,32 +294,19 @@ class ShapeConverter(object):
         return gr
 
     def convert_image(self, node):
-        _logger.warn("Adding box instead of image.")
-
-        x, y, width, height = self._length_attrs(node, ('x', 'y', "width", "height"))
+        x, y, width, height = self._length_attrs(node, 'x', 'y', "width", "height")
         xlink_href = utils.node_xlink_href(node)
 
-        magic = "data:image/jpeg;base64"
-        if xlink_href[:len(magic)] == magic:
-            pat = "data:image/(\w+?);base64"
-            ext = re.match(pat, magic).groups()[0]
-            jpeg_data = base64.decodestring(xlink_href[len(magic):].encode('ascii'))
-            _, path = tempfile.mkstemp(suffix='.%s' % ext)
-            with open(path, b'wb') as fh:
-                fh.write(jpeg_data)
-            img = Image(int(x), int(y + height), int(width), int(-height), path)
-            # this needs to be removed later, not here...
-            # if exists(path): os.remove(path)
+        if images.is_data_uri(xlink_href):
+            path = images.decode_data_uri(xlink_href)
         else:
-            xlink_href = os.path.join(os.path.dirname(self.svg_source_file), xlink_href)
-            img = Image(int(x), int(y + height), int(width), int(-height), xlink_href)
-            try:
-                # this will catch invalid image
-                PDFImage(xlink_href, 0, 0)
-            except IOError:
-                _logger.error("Unable to read the image %s. Skipping..." % img.path)
-                return None
-        return img
+            path = images.open_image_file(os.path.join(os.path.dirname(self.svg_source_file), xlink_href))
+        if path is None:
+            return None
+        # ReportLab doesn't draw images of negative height, the flip goes on a group
+        group = Group(Image(int(x), -int(y + height), int(width), int(height), path))
+        group.scale(1, -1)
+        return group
 
     def apply_transform(self, transform, group):
         """
@@ -483,6 +349,48 @@ class ShapeConverter(object):
             else:
                 _logger.debug("Ignoring unknown transform: %s %s" % (op, values))
 
+    def resolve_style(self, style, text=False, only_explicit=False):
+        """
+        Convert a computed style to a tuple of (rlgAttr, value) pairs.
+
+        The result is cached per distinct computed style, so identically styled shapes
+        share the converted values (and their interned colours) instead of converting
+        them again.  Lists, e.g. dash arrays, are copied to each shape by `apply_style`;
+        the other shared values must never be mutated.
+        """
+        key = (style, text, only_explicit)
+        resolved = self._resolved_styles.get(key)
+        if resolved is not None:
+            return resolved
+
+        values = []
+        for (svg_attr_name, rlg_attr, func, default) in (STYLE_MAPPING + TEXT_STYLE_MAPPING if text else STYLE_MAPPING):
+            value = style.get(svg_attr_name)
+            if value == '':
+                if only_explicit:
+                    continue
+                value = default
+
+            if value == "currentColor":
+                value = style.color or default
+
+            try:
+                if svg_attr_name == "font-family":
+                    values.append((rlg_attr, attributes.convert_font_family(value, style.font_weight, style.font_style)))
+                else:
+                    values.append((rlg_attr, getattr(attributes, func)(value)))
+            except (AttributeError, KeyError, ValueError):
+                pass
+
+        # opacity goes into a (shared) copy of the fill colour, never into the colour itself
+        converted = dict(values)
+        if converted.get('fillOpacity') and isinstance(converted.get('fillColor'), colors.Color):
+            fill_color = attributes.color_with_alpha(converted['fillColor'], converted['fillOpacity'])
+            values = [(k, fill_color if k == 'fillColor' else v) for k, v in values]
+
+        resolved = self._resolved_styles[key] = tuple(values)
+        return resolved
+
     def apply_style(self, to_shape, from_node, only_explicit=False):
         """
         Apply styles from SVG elements to an RLG shape.
@@ -490,52 +398,18 @@ class ShapeConverter(object):
 
         assert isinstance(to_shape, Shape), "to_shape must be a RLG shape instance (line, polygon, circle, etc...)"
 
-        # tuple format: (svgAttr, rlgAttr, converter, default)
-        mapping_n = (
-            ("fill", "fillColor", "convert_color", "black"),
-            ("fill-opacity", "fillOpacity", "convert_opacity", 1),
-            ("stroke", "strokeColor", "convert_color", "none"),
-            ("fill-rule", "_fillRule", "convert_fill_rule", "nonzero"),
-            ("stroke", "strokeColor", "convert_color", "none"),
-            ("stroke-width", "strokeWidth", "convert_length", "1"),
-            ("stroke-opacity", "strokeOpacity", "convert_opacity", 1),
-            ("stroke-linejoin", "strokeLineJoin", "convert_line_join", "0"),
-            ("stroke-linecap", "strokeLineCap", "convert_line_cap", "0"),
-            ("stroke-dasharray", "strokeDashArray", "convert_dash_array", "none"),
-        )
-        mapping_f = (
-            ("font-family", "fontName", "convert_font_family", "Helvetica"),
-            ("font-size", "fontSize", "convert_length", "12"),
-            ("text-anchor", "textAnchor", "identity", "start"),
-        )
-
         if to_shape.__class__ == Group:
             # Recursively apply style on Group subelements
             for subshape in to_shape.contents:
                 self.apply_style(subshape, from_node, only_explicit=only_explicit)
             return
 
-        for mapping in (mapping_n, mapping_f):
-            # values in mapping_f ONLY apply to strings, so skip if other shape
-            if to_shape.__class__ != String and mapping == mapping_f:
-                continue
-
-            for (svg_attr_name, rlg_attr, func, default) in mapping:
-                value = attributes.find(from_node, svg_attr_name)
-                if value == '':
-                    if only_explicit:
-                        continue
-                    value = default
-
-                if value == "currentColor":
-                    value = attributes.find(from_node.parentNode, "color") or default
-
-                try:
-                    conversion_func = getattr(attributes, func)
-                    setattr(to_shape, rlg_attr, conversion_func(value))
-                except (AttributeError, KeyError, ValueError):
-                    pass
-
-        if getattr(to_shape, 'fillOpacity', None):
-            if getattr(to_shape, 'fillColor', None):
-                to_shape.fillColor.alpha = to_shape.fillOpacity
+        # values in TEXT_STYLE_MAPPING ONLY apply to strings
+        style = self.styles.computed(from_node)
+        for rlg_attr, value in self.resolve_style(style, to_shape.__class__ == String, only_explicit):
+            if isinstance(value, list):
+                value = list(value)  # e.g. strokeDashArray, which the shape may change in place
+            try:
+                setattr(to_shape, rlg_attr, value)
+            except (AttributeError, KeyError, ValueError):
+                pass
@@ -0,0 +1,273 @@
+# -*- coding: utf-8 -*
+"""
+Path simplification: removes the vertices of paths, polygons and polylines that are
+within a tolerance of the simplified outline, e.g. the near collinear points of traced
+artwork and GIS exports.
+
+  * nearly flat cubic curves, whose control points are within the tolerance of their
+    chord, become straight lines,
+  * runs of straight lines are decimated with the Ramer-Douglas-Peucker algorithm.
+
+The tolerance is in points of the final drawing; it is scaled into the coordinates of
+each shape with the transforms above it.  Shapes may be shared, so simplified shapes
+are copies, made once for every shape and tolerance.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+import math
+from collections import namedtuple
+
+from reportlab.graphics.shapes import Group, Path, PolyLine, Polygon, mmult
+
+from svg2rlg.optimize import IDENTITY, copy_shape
+from svg2rlg.pathdata import OP_CLOSEPATH, OP_CURVETO, OP_LINETO, OP_MOVETO
+
+try:
+    import numpy
+except ImportError:  # optional, only used to speed up long runs of lines
+    numpy = None
+
+_logger = logging.getLogger(__name__)
+
+# runs with fewer vertices are decimated in pure python
+NUMPY_MIN_VERTICES = 128
+
+SimplifyStats = namedtuple('SimplifyStats', ['vertices', 'removed'])
+
+
+def max_stretch(transform):
+    """
+    The largest factor by which `transform` stretches a length, its spectral norm
+    """
+    a, b, c, d = transform[:4]
+    # square roots of the eigenvalues of M^T M
+    s = a * a + b * b + c * c + d * d
+    det = a * d - b * c
+    return math.sqrt((s + math.sqrt(max(s * s - 4 * det * det, 0))) / 2)
+
+
+def _farthest_python(xs, ys, first, last):
+    """
+    Index and squared distance of the vertex between `first` and `last` farthest from
+    the segment joining them
+    """
+    ax, ay, bx, by = xs[first], ys[first], xs[last], ys[last]
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    index, farthest = first, -1.0
+    for i in range(first + 1, last):
+        px, py = xs[i] - ax, ys[i] - ay
+        t = (px * dx + py * dy) / length if length else 0.0
+        if t <= 0:
+            distance = px * px + py * py
+        elif t >= 1:
+            distance = (xs[i] - bx) ** 2 + (ys[i] - by) ** 2
+        else:
+            distance = (px * dy - py * dx) ** 2 / length
+        if distance > farthest:
+            index, farthest = i, distance
+    return index, farthest
+
+
+def _farthest_numpy(xs, ys, first, last):
+    ax, ay, bx, by = xs[first], ys[first], xs[last], ys[last]
+    dx, dy = bx - ax, by - ay
+    length = dx * dx + dy * dy
+    px = xs[first + 1:last] - ax
+    py = ys[first + 1:last] - ay
+    if length:
+        t = numpy.clip((px * dx + py * dy) / length, 0, 1)
+    else:
+        t = 0
+    distances = (px - t * dx) ** 2 + (py - t * dy) ** 2
+    i = int(numpy.argmax(distances))
+    return first + 1 + i, float(distances[i])
+
+
+def decimate(xs, ys, tolerance):
+    """
+    Indices of the vertices kept by Ramer-Douglas-Peucker decimation of the polyline
+    `xs`, `ys`, within `tolerance`.  The ends are always kept.
+    """
+    count = len(xs)
+    if count < 3:
+        return list(range(count))
+    use_numpy = numpy is not None and count >= NUMPY_MIN_VERTICES
+    if use_numpy:
+        # python floats for the short ranges, numpy scalars are slow one at a time
+        vxs, vys = numpy.asarray(xs, dtype=float), numpy.asarray(ys, dtype=float)
+    tolerance2 = tolerance * tolerance
+    keep = [False] * count
+    keep[0] = keep[-1] = True
+    stack = [(0, count - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        if use_numpy and last - first >= NUMPY_MIN_VERTICES:
+            index, distance = _farthest_numpy(vxs, vys, first, last)
+        else:
+            index, distance = _farthest_python(xs, ys, first, last)
+        if distance > tolerance2:
+            keep[index] = True
+            stack.append((first, index))
+            stack.append((index, last))
+    return [i for i in range(count) if keep[i]]
+
+
+def _is_flat(x0, y0, curve, tolerance):
+    x1, y1, x2, y2, x3, y3 = curve
+    xs, ys = [x0, x1, x3], [y0, y1, y3]
+    if _farthest_python(xs, ys, 0, 2)[1] > tolerance * tolerance:
+        return False
+    xs[1], ys[1] = x2, y2
+    return _farthest_python(xs, ys, 0, 2)[1] <= tolerance * tolerance
+
+
+def simplify_points(points, tolerance, closed=False):
+    """
+    Decimated copy of a flat x, y, x, y... sequence of the same type, or None if no
+    vertex can be removed.  A closed outline keeps at least three vertices.
+    """
+    xs, ys = points[0::2], points[1::2]
+    if closed:
+        xs, ys = list(xs) + [xs[0]], list(ys) + [ys[0]]
+    kept = decimate(xs, ys, tolerance)
+    if closed:
+        kept = kept[:-1]
+        if len(kept) < 3:
+            return None
+    if len(kept) == len(points) // 2:
+        return None
+    result = points[:0]
+    for i in kept:
+        result.append(xs[i])
+        result.append(ys[i])
+    return result
+
+
+def simplify_path(path, tolerance):
+    """
+    (points, operators) of `path` simplified, of the same types as the path's, or None
+    if no vertex can be removed
+    """
+    points = path.points
+    result_points = points[:0]
+    result_operators = path.operators[:0]
+    removed = False
+
+    # the current run of straight lines, starting at the current point
+    run_x, run_y = [], []
+    start_x = start_y = 0.0
+
+    def flush():
+        kept = decimate(run_x, run_y, tolerance)
+        for i in kept[1:]:
+            result_operators.append(OP_LINETO)
+            result_points.append(run_x[i])
+            result_points.append(run_y[i])
+        return len(kept) < len(run_x)
+
+    i = 0
+    for op in path.operators:
+        if op == OP_LINETO:
+            run_x.append(points[i])
+            run_y.append(points[i + 1])
+            i += 2
+            continue
+        if op == OP_CURVETO and run_x and _is_flat(run_x[-1], run_y[-1], points[i:i + 6], tolerance):
+            run_x.append(points[i + 4])
+            run_y.append(points[i + 5])
+            i += 6
+            removed = True
+            continue
+
+        removed = flush() or removed
+        result_operators.append(op)
+        if op == OP_MOVETO:
+            start_x, start_y = points[i], points[i + 1]
+            result_points.extend(points[i:i + 2])
+            run_x, run_y = [start_x], [start_y]
+            i += 2
+        elif op == OP_CURVETO:
+            result_points.extend(points[i:i + 6])
+            run_x, run_y = [points[i + 4]], [points[i + 5]]
+            i += 6
+        elif op == OP_CLOSEPATH:
+            run_x, run_y = [start_x], [start_y]
+    removed = flush() or removed
+
+    if not removed:
+        return None
+    return result_points, result_operators
+
+
+class _Simplifier(object):
+    def __init__(self, tolerance):
+        self.tolerance = tolerance
+        self.simplified = {}  # (id, tolerance) -> (shape, simplified shape)
+        self.vertices = 0
+        self.removed = 0
+
+    def simplify(self, group, transform):
+        """
+        `group`, or a copy of it if any shape below it is simplified
+        """
+        transform = mmult(transform, group.transform)
+        stretch = max_stretch(transform)
+        tolerance = self.tolerance / stretch if stretch else None
+        contents = [
+            self.simplify(child, transform) if isinstance(child, Group) else self.simplify_shape(child, tolerance)
+            for child in group.contents
+        ]
+        if all(a is b for a, b in zip(contents, group.contents)):
+            return group
+        group = copy_shape(group)
+        group.__dict__['contents'] = contents
+        return group
+
+    def simplify_shape(self, shape, tolerance):
+        if not isinstance(shape, (Path, Polygon, PolyLine)):
+            return shape
+        vertices = len(shape.points) // 2
+        self.vertices += vertices
+        if tolerance is None:
+            return shape
+
+        key = (id(shape), tolerance)
+        try:
+            original, simplified = self.simplified[key]
+        except KeyError:
+            simplified = self._simplified(shape, tolerance)
+            self.simplified[key] = (shape, simplified)  # keeps `shape`, and its id, alive
+        self.removed += vertices - len(simplified.points) // 2
+        return simplified
+
+    def _simplified(self, shape, tolerance):
+        if isinstance(shape, Path):
+            result = simplify_path(shape, tolerance)
+            if result is None:
+                return shape
+            simplified = copy_shape(shape)
+            simplified.__dict__['points'], simplified.__dict__['operators'] = result
+            return simplified
+        points = simplify_points(shape.points, tolerance, closed=isinstance(shape, Polygon))
+        if points is None:
+            return shape
+        simplified = copy_shape(shape)
+        simplified.__dict__['points'] = points
+        return simplified
+
+
+def simplify_group(group, tolerance):
+    """
+    Simplifies the paths, polygons and polylines below `group`, removing vertices within
+    `tolerance` points of the result.  `group` is the only group changed.
+    :rtype: SimplifyStats
+    """
+    simplifier = _Simplifier(tolerance)
+    group.__dict__['contents'] = simplifier.simplify(group, IDENTITY).contents
+    stats = SimplifyStats(simplifier.vertices, simplifier.removed)
+    _logger.debug("Simplified paths: %d of %d vertices removed" % (stats.removed, stats.vertices))
+    return stats
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*
+"""
+Computed styles: the inherited presentation properties of an element, resolved once
+per element from its attributes, its `style` declarations and its parent's computed
+style.
+
+This replaces climbing the tree with `attributes.find` for every property of every
+shape; a shape's style is looked up in its computed style record instead.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+from collections import namedtuple
+from contextlib import contextmanager
+
+from . import attributes
+
+_logger = logging.getLogger(__name__)
+
+# SVG properties that are inherited by child elements, and are used when converting
+INHERITED_PROPERTIES = (
+    'color',
+    'fill',
+    'fill-opacity',
+    'fill-rule',
+    'stroke',
+    'stroke-width',
+    'stroke-opacity',
+    'stroke-linejoin',
+    'stroke-linecap',
+    'stroke-dasharray',
+    'font-family',
+    'font-size',
+    'font-weight',
+    'font-style',
+    'text-anchor',
+)
+
+_FIELDS = {name: i for i, name in enumerate(INHERITED_PROPERTIES)}
+
+
+class ComputedStyle(namedtuple('ComputedStyle', [p.replace('-', '_') for p in INHERITED_PROPERTIES])):
+    """
+    Immutable record of the raw (unconverted) inherited property values of an element.
+    Properties that are not specified anywhere up the tree are ''.
+    """
+    __slots__ = ()
+
+    def get(self, name, default=''):
+        """
+        Value of a property by its SVG name, e.g. style.get('stroke-width')
+        """
+        return self[_FIELDS[name]] or default
+
+
+INITIAL_STYLE = ComputedStyle(*[''] * len(INHERITED_PROPERTIES))
+
+
+def cascade(node, parent_style):
+    """
+    Compute the style of `node`, given the computed style of its parent.
+
+    Presentation attributes win over `style` declarations, and both over the inherited
+    value.  "inherit" is the same as not specifying the property.
+    """
+    attrib = node.attrib
+    declared = attributes.parse_multi_attribute_string(attrib['style']) if attrib.get('style') else {}
+    if not declared and not any(name in attrib for name in INHERITED_PROPERTIES):
+        return parent_style
+
+    values = list(parent_style)
+    for i, name in enumerate(INHERITED_PROPERTIES):
+        value = attrib.get(name, '').strip()
+        if not value or value == 'inherit':
+            value = declared.get(name, '')
+        if value and value != 'inherit':
+            values[i] = value
+    return ComputedStyle(*values)
+
+
+class StyleResolver(object):
+    """
+    Computes and remembers the style of elements.
+
+    Rendering walks the tree top down, so the parent of an element is already known
+    when the element is reached and each style is computed exactly once.  Elements
+    reached out of order (e.g. a referenced clip path) have their missing ancestors
+    resolved first.
+    """
+
+    def __init__(self):
+        self._styles = {}
+
+    def computed(self, node):
+        """
+        :rtype: ComputedStyle
+        """
+        style = self._styles.get(node)
+        if style is not None:
+            return style
+
+        # climb to the closest ancestor with a known style, then cascade back down
+        pending = []
+        while node is not None and style is None:
+            pending.append(node)
+            node = node.getparent()
+            style = self._styles.get(node) if node is not None else INITIAL_STYLE
+
+        for node in reversed(pending):
+            style = cascade(node, style)
+            self._styles[node] = style
+        return style
+
+    @contextmanager
+    def instance(self, node, parent_style):
+        """
+        Within the context, `node` and its descendants are styled as if `node` were a
+        child of an element with the computed style `parent_style`, e.g. the <use>
+        referencing it, without changing the tree.
+        """
+        saved = self._styles
+        self._styles = {node: cascade(node, parent_style)}
+        try:
+            yield
+        finally:
+            self._styles = saved
+
+    def forget(self, node):
+        """
+        Drops the styles of `node` and its descendants, once they are no longer needed
+        """
+        for element in node.iter():
+            self._styles.pop(element, None)
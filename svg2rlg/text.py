@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*
+"""
+Text metrics.  Advance widths are remembered across documents, as the same captions
+tend to be rendered over and over.
+"""
+from __future__ import print_function, absolute_import, unicode_literals
+
+import logging
+
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from . import utils, settings
+
+_logger = logging.getLogger(__name__)
+
+# (text, font name, font size) -> advance width
+_widths = utils.LRUCache(settings.TEXT_WIDTH_CACHE_SIZE)
+
+
+def string_width(text, font_name, font_size):
+    """
+    Advance width of `text` in points, like `pdfmetrics.stringWidth`
+    """
+    key = (text, font_name, font_size)
+    width = _widths.get(key)
+    if width is None:
+        width = stringWidth(text, font_name, font_size)
+        _widths.set(key, width)
+    return width
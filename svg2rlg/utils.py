@@ -7,6 +7,8 @@ import logging
 import os
 import re
 import sys
+import threading
+from collections import OrderedDict
 from math import ceil, radians, cos, sin, sqrt, hypot, degrees, copysign, acos, fabs
 
 from reportlab.graphics.shapes import mmult, rotate, translate, transformPoint
@@ -138,6 +140,49 @@ def pairwise(iterable):
             return
 
 
+class LRUCache(object):
+    """
+    A mapping holding at most `maxsize` items; when full, the least recently used
+    item is discarded.  Safe to share between threads.
+    """
+
+    def __init__(self, maxsize=128):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, key, default=None):
+        with self._lock:
+            try:
+                value = self._items.pop(key)
+            except KeyError:
+                self.misses += 1
+                return default
+            self._items[key] = value  # most recently used goes last
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._items.pop(key, None)
+            self._items[key] = value
+            while len(self._items) > self.maxsize:
+                self._items.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.hits = self.misses = 0
+
+
 def split_dots(item_list):
     """
     Yield elements in the existing list, but yield >1 for certain broken numeric elements
@@ -233,11 +278,14 @@ def bezier_arc_from_centre(cx, cy, rx, ry, start_ang=0.0, extent=90.0):
     """
     https://github.com/deeplook/svglib/blob/master/svglib/utils.py
     """
-    if abs(extent) <= 90:
+    # half ellipses (e.g. arcs with too small radii) can come out a rounding error
+    # above 180 degrees (acos is ill-conditioned there), which shouldn't add a near
+    # zero length fragment
+    if abs(extent) <= 90 + 1e-4:
         n_frag = 1
         frag_angle = float(extent)
     else:
-        n_frag = int(ceil(abs(extent) / 90.))
+        n_frag = int(ceil((abs(extent) - 1e-4) / 90.))
         frag_angle = float(extent) / n_frag
 
     frag_rad = radians(frag_angle)
@@ -527,9 +575,14 @@ def monkeypatch_reportlab():
     https://bitbucket.org/rptlab/reportlab/issues/95/
     ReportLab always use 'Even-Odd' filling mode for paths, this patch forces
     RL to honor the path fill rule mode (possibly 'Non-Zero Winding') instead.
+
+    Patching more than once has no further effect.
     """
     from reportlab.pdfgen.canvas import Canvas
     from reportlab.graphics import shapes
+    if getattr(shapes._renderPath, '_svg2rlg_patched', False):
+        return
+
     original_render_path = shapes._renderPath
 
     # noinspection PyPep8Naming
@@ -542,6 +595,7 @@ def monkeypatch_reportlab():
             pass
         return original_render_path(path, drawFuncs, **kwargs)
 
+    patched_render_path._svg2rlg_patched = True
     shapes._renderPath = patched_render_path
 
     original_draw_path = Canvas.drawPath
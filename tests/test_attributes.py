@@ -4,8 +4,9 @@ from __future__ import print_function, absolute_import, unicode_literals
 import unittest
 
 from reportlab.lib import colors, units
+from reportlab.pdfbase import pdfmetrics
 
-from svg2rlg import attributes
+from svg2rlg import attributes, settings
 
 
 class TestAttributes(unittest.TestCase):
@@ -55,6 +56,61 @@ class TestAttributes(unittest.TestCase):
             result = attributes.convert_color(input_val)
             self.assertEqual(colors.red, result, "Error converting %s" % input_val)
 
+    def test_convert_color_forms(self):
+        mapping = [
+            ("darkseagreen", colors.Color(143 / 255.0, 188 / 255.0, 143 / 255.0)),
+            ("LightGray", colors.Color(211 / 255.0, 211 / 255.0, 211 / 255.0)),
+            ("#0080FF", colors.HexColor("#0080ff")),
+            ("rgb(0, 128, 255)", colors.HexColor("#0080ff")),
+            ("rgb(0 128 255)", colors.HexColor("#0080ff")),
+            ("rgb(300,-5,50%)", colors.Color(1, 0, 0.5)),
+            ("rgba(255,0,0,0.5)", colors.Color(1, 0, 0, 0.5)),
+            ("rgba(100%,0%,0%,50%)", colors.Color(1, 0, 0, 0.5)),
+        ]
+        for input_val, expected in mapping:
+            result = attributes.convert_color(input_val)
+            self.assertEqual(expected, result, "Error converting %s" % input_val)
+            self.assertEqual(expected.alpha, result.alpha, "Error converting %s" % input_val)
+
+    def test_convert_color_invalid(self):
+        for input_val in ["", "none", "nocolor", "#12", "#ggg", "rgb(1,2)", "rgb(a,b,c)"]:
+            self.assertIsNone(attributes.convert_color(input_val), input_val)
+        self.assertEqual("currentColor", attributes.convert_color("currentColor"))
+
+    def test_convert_color_is_shared(self):
+        self.assertIs(attributes.convert_color("#f00"), attributes.convert_color("rgb(255,0,0)"))
+
+    def test_convert_font_family(self):
+        mapping = [
+            (("",), "Helvetica"),
+            (("sans-serif",), "Helvetica"),
+            (("'Courier'",), "Courier"),
+            (("times-roman",), "Times-Roman"),
+            (("Unknown, serif",), "Times-Roman"),
+            (("Unknown",), "Helvetica"),
+            (("Helvetica", "bold"), "Helvetica-Bold"),
+            (("serif", "700", "italic"), "Times-BoldItalic"),
+            (("Courier", "normal", "oblique"), "Courier-Oblique"),
+            (("Unknown", "bold"), "Helvetica-Bold"),
+        ]
+        for args, expected in mapping:
+            self.assertEqual(expected, attributes.convert_font_family(*args), "Error converting %r" % (args,))
+
+    def test_convert_font_family_sees_new_registrations(self):
+        self.assertEqual("Helvetica-Bold", attributes.convert_font_family("TestAttributesFamily", "bold"))
+        pdfmetrics.registerFontFamily("TestAttributesFamily", normal="Courier", bold="Courier-Bold")
+        self.assertEqual("Courier-Bold", attributes.convert_font_family("TestAttributesFamily", "bold"))
+
+    def test_convert_font_family_sees_remapped_aliases(self):
+        self.assertEqual("Helvetica", attributes.convert_font_family("sans-serif"))
+        saved = settings.FONT_ALIASES['sans-serif']
+        settings.FONT_ALIASES['sans-serif'] = 'Courier'
+        try:
+            self.assertEqual("Courier", attributes.convert_font_family("sans-serif"))
+        finally:
+            settings.FONT_ALIASES['sans-serif'] = saved
+        self.assertEqual("Helvetica", attributes.convert_font_family("sans-serif"))
+
     def test_transform_length(self):
         mapping = [
             ("0", 0),
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import glob
+import os
+import unittest
+
+from reportlab.graphics.shapes import Circle, Ellipse, Group, Line, Path, Polygon, PolyLine, Rect, String, mmult
+
+from svg2rlg import bake, data_to_rlg
+from svg2rlg.optimize import IDENTITY, is_clipping
+from svg2rlg.paths import ClippingPath
+
+SAMPLES = os.path.join(os.path.dirname(__file__), 'samples', 'misc', '*.svg')
+
+POINT_SHAPES = (Path, Polygon, PolyLine)
+
+
+def leaves(group, transform=IDENTITY):
+    """
+    The shapes of a drawing with the transform they are drawn with
+    """
+    transform = mmult(transform, group.transform)
+    for child in group.contents:
+        if isinstance(child, Group):
+            for leaf in leaves(child, transform):
+                yield leaf
+        else:
+            yield child, transform
+
+
+def group(transform, *shapes):
+    result = Group(*shapes)
+    result.transform = transform
+    return result
+
+
+class TestBakeShape(unittest.TestCase):
+    def assertPointsEqual(self, expected, points):
+        self.assertEqual(len(expected), len(points))
+        for a, b in zip(expected, points):
+            self.assertAlmostEqual(a, b)
+
+    def test_path_under_similarity(self):
+        path = Path(points=[0, 0, 1, 0], operators=[0, 1], strokeWidth=2, strokeDashArray=[1, 2])
+        baked = bake.bake_shape(path, (0, 2, -2, 0, 10, 20))  # rotate 90°, scale 2
+        self.assertPointsEqual([10, 20, 10, 22], baked.points)
+        self.assertEqual(4, baked.strokeWidth)
+        self.assertEqual([2, 4], baked.strokeDashArray)
+        self.assertEqual([0, 0, 1, 0], path.points)
+        self.assertEqual(2, path.strokeWidth)
+
+    def test_stroke_needs_similarity(self):
+        line = Line(0, 0, 1, 1)
+        self.assertIsNone(bake.bake_shape(line, (2, 0, 0, 1, 0, 0)))
+        line.strokeColor = None
+        self.assertPointsEqual([0, 0, 2, 1], [line.x1, line.y1] + [
+            getattr(bake.bake_shape(line, (2, 0, 0, 1, 0, 0)), a) for a in ('x2', 'y2')])
+
+    def test_rect(self):
+        rect = Rect(0, 0, 2, 1, strokeColor=None)
+        baked = bake.bake_shape(rect, (-2, 0, 0, 3, 1, 1))
+        self.assertIsInstance(baked, Rect)
+        self.assertEqual((-3, 1, 4, 3), (baked.x, baked.y, baked.width, baked.height))
+
+        baked = bake.bake_shape(rect, (0, 1, -1, 0, 0, 0))
+        self.assertIsInstance(baked, Path)
+        self.assertPointsEqual([0, 0, 0, 2, -1, 2, -1, 0], baked.points)
+        self.assertIsNone(baked.strokeColor)
+        self.assertEqual(rect.fillColor, baked.fillColor)
+
+    def test_circle(self):
+        circle = Circle(1, 1, 1, strokeWidth=1)
+        baked = bake.bake_shape(circle, (0, 2, -2, 0, 0, 0))
+        self.assertIsInstance(baked, Circle)
+        self.assertPointsEqual([-2, 2, 2, 2], [baked.cx, baked.cy, baked.r, baked.strokeWidth])
+
+        circle.strokeColor = None
+        baked = bake.bake_shape(circle, (2, 0, 0, 3, 0, 0))
+        self.assertIsInstance(baked, Ellipse)
+        self.assertPointsEqual([2, 3, 2, 3], [baked.cx, baked.cy, baked.rx, baked.ry])
+
+        baked = bake.bake_shape(Ellipse(0, 0, 2, 1, strokeColor=None), (1, 1, 0, 1, 0, 0))
+        self.assertIsInstance(baked, Path)
+        self.assertEqual(baked.operators[-1], 3)
+
+    def test_string(self):
+        string = String(1, 2, 'text')
+        baked = bake.bake_shape(string, (1, 0, 0, 1, 10, 20))
+        self.assertEqual((11, 22, 'text'), (baked.x, baked.y, baked.text))
+        self.assertIsNone(bake.bake_shape(string, (1, 0, 0, -1, 0, 0)))
+
+
+class TestBakeGroup(unittest.TestCase):
+    def test_flattens(self):
+        path = Path(points=[0, 0, 1, 1], operators=[0, 1])
+        string = String(0, 0, 'text')
+        shared = group((1, 0, 0, 1, 5, 5), path)
+        root = Group(group((2, 0, 0, 2, 0, 0), shared, string), shared)
+
+        stats = bake.bake_group(root)
+        self.assertEqual((2, 1), stats)
+        baked, kept, moved = root.contents
+        self.assertEqual([10, 10, 12, 12], baked.points)
+        self.assertEqual([string], kept.contents)
+        self.assertEqual((2, 0, 0, 2, 0, 0), tuple(kept.transform))
+        self.assertEqual([5, 5, 6, 6], moved.points)
+        self.assertEqual([0, 0, 1, 1], path.points)
+        self.assertEqual([path], shared.contents)
+
+    def test_keeps_clipping_scopes(self):
+        clip = ClippingPath(points=[0, 0, 1, 0, 1, 1], operators=[0, 1, 1, 3])
+        clip.strokeColor = None
+        rect = Rect(0, 0, 1, 1)
+        root = Group(group((1, 0, 0, 1, 2, 0), clip, rect), Rect(0, 0, 1, 1))
+
+        bake.bake_group(root)
+        scope = root.contents[0]
+        self.assertEqual(IDENTITY, tuple(scope.transform))
+        self.assertTrue(is_clipping(scope.contents[0]))
+        self.assertEqual([2, 0, 3, 0, 3, 1], scope.contents[0].points)
+        self.assertEqual(2, scope.contents[1].x)
+
+    def test_samples_draw_the_same_paths(self):
+        for path in glob.glob(SAMPLES):
+            with open(path, 'rb') as f:
+                data = f.read()
+            expected = list(leaves(data_to_rlg(data).contents[0]))
+            result = list(leaves(data_to_rlg(data, bake_transforms=True).contents[0]))
+            self.assertEqual(len(expected), len(result), path)
+            for (shape, transform), (baked, baked_transform) in zip(expected, result):
+                if isinstance(shape, POINT_SHAPES) and baked_transform == IDENTITY:
+                    points = bake.transform_points(shape.points, transform)
+                    self.assertEqual(len(points), len(baked.points), path)
+                    for a, b in zip(points, baked.points):
+                        self.assertAlmostEqual(a, b, 6, path)
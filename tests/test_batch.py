@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from reportlab.graphics.shapes import Drawing
+
+import svg2rlg
+from svg2rlg.cache import DiskCache
+
+SAMPLE = os.path.join(os.path.dirname(__file__), 'samples', 'misc', 'tiger.svg')
+RECT = '<svg xmlns="http://www.w3.org/2000/svg" width="10" height="10"><rect width="5" height="5"/></svg>'
+
+
+class TestConvertMany(unittest.TestCase):
+    ITEMS = [SAMPLE, RECT.encode('utf-8'), os.path.join('does', 'not', 'exist.svg'), RECT]
+
+    def check(self, results):
+        self.assertEqual(len(self.ITEMS), len(results))
+        for result in results:
+            if result.index == 2:
+                self.assertIsNone(result.drawing)
+                self.assertIn("does not exist", result.error)
+            else:
+                self.assertIsInstance(result.drawing, Drawing)
+                self.assertIsNone(result.error)
+
+    def test_in_process(self):
+        results = list(svg2rlg.convert_many(self.ITEMS, workers=0))
+        self.assertEqual([0, 1, 2, 3], [r.index for r in results])
+        self.check(results)
+
+    def test_process_pool(self):
+        results = list(svg2rlg.convert_many(self.ITEMS, workers=2, chunksize=2))
+        self.assertEqual([0, 1, 2, 3], [r.index for r in results])
+        self.check(results)
+
+    def test_process_pool_unordered(self):
+        results = list(svg2rlg.convert_many(iter(self.ITEMS), workers=2, ordered=False))
+        self.assertEqual([0, 1, 2, 3], sorted(r.index for r in results))
+        self.check(results)
+
+    def test_process_pool_with_disk_cache(self):
+        directory = tempfile.mkdtemp()
+        try:
+            cache = DiskCache(directory)
+            for _ in range(2):
+                results = list(svg2rlg.convert_many(self.ITEMS, workers=2, cache=cache))
+                self.check(results)
+            # the tiger, and the rect as bytes and as text
+            self.assertEqual(2, cache.stats().entries)
+        finally:
+            shutil.rmtree(directory)
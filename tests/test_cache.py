@@ -0,0 +1,169 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import os
+import shutil
+import tempfile
+import threading
+import time
+import unittest
+
+from reportlab.graphics.shapes import Rect
+from reportlab.lib import fonts
+
+from svg2rlg import data_to_rlg, settings
+from svg2rlg.cache import DrawingCache, DiskCache, cache_key
+
+DOCUMENT = '<svg xmlns="http://www.w3.org/2000/svg" width="%d" height="10"><rect width="5" height="5"/></svg>'
+
+
+class TestDrawingCache(unittest.TestCase):
+    def test_hit_returns_independent_copy(self):
+        cache = DrawingCache()
+        first = data_to_rlg(DOCUMENT % 10, cache=cache)
+        first.contents[0].add(Rect(0, 0, 1, 1))
+        second = data_to_rlg((DOCUMENT % 10).encode('utf-8'), cache=cache)
+        third = data_to_rlg(DOCUMENT % 10, cache=cache)
+
+        self.assertEqual((2, 1, 0, 1), cache.stats()[:4])
+        self.assertEqual(len(first.contents[0].contents) - 1, len(second.contents[0].contents))
+        self.assertIsNot(second.contents[0], third.contents[0])
+
+    def test_count_eviction(self):
+        cache = DrawingCache(maxsize=2)
+        for width in (1, 2, 3, 1):
+            data_to_rlg(DOCUMENT % width, cache=cache)
+        stats = cache.stats()
+        self.assertEqual((0, 4, 2, 2), stats[:4])
+
+    def test_size_eviction(self):
+        cache = DrawingCache(maxsize=100)
+        data_to_rlg(DOCUMENT % 1, cache=cache)
+        cache.maxbytes = cache.size * 2 + 1
+        for width in (2, 3):
+            data_to_rlg(DOCUMENT % width, cache=cache)
+        self.assertEqual(2, len(cache))
+        self.assertLessEqual(cache.size, cache.maxbytes)
+
+    def test_key_depends_on_settings(self):
+        key = cache_key(DOCUMENT % 1)
+        self.assertEqual(key, cache_key((DOCUMENT % 1).encode('utf-8')))
+        self.assertNotEqual(key, cache_key(DOCUMENT % 1, file_path="/some/file.svg"))
+
+        settings.FONT_ALIASES['cursive'] = 'Times-Italic'
+        try:
+            self.assertNotEqual(key, cache_key(DOCUMENT % 1))
+        finally:
+            del settings.FONT_ALIASES['cursive']
+
+    def test_key_depends_on_image_files(self):
+        directory = tempfile.mkdtemp()
+        try:
+            file_path = os.path.join(directory, 'image.svg')
+            data = DOCUMENT.replace('<rect', '<image xlink:href="pixel.png" /><rect') % 1
+            key = cache_key(data, file_path)
+            with open(os.path.join(directory, 'pixel.png'), 'wb') as f:
+                f.write(b'not an image')
+            key_written = cache_key(data, file_path)
+            self.assertNotEqual(key, key_written)
+            self.assertEqual(key_written, cache_key(data, file_path))
+            with open(os.path.join(directory, 'pixel.png'), 'ab') as f:
+                f.write(b', still not an image')
+            self.assertNotEqual(key_written, cache_key(data, file_path))
+        finally:
+            shutil.rmtree(directory)
+
+    def test_key_depends_on_font_mappings(self):
+        key = cache_key(DOCUMENT % 1)
+        fonts.addMapping('TestCacheFamily', 0, 0, 'Courier')
+        key_courier = cache_key(DOCUMENT % 1)
+        self.assertNotEqual(key, key_courier)
+        fonts.addMapping('TestCacheFamily', 0, 0, 'Times-Roman')  # remapped, not added
+        self.assertNotEqual(key_courier, cache_key(DOCUMENT % 1))
+
+
+class TestDiskCache(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_shared_between_instances(self):
+        first = data_to_rlg(DOCUMENT % 10, cache=DiskCache(self.directory))
+        cache = DiskCache(self.directory)
+        second = data_to_rlg(DOCUMENT % 10, cache=cache)
+
+        self.assertEqual((1, 0, 0, 1), cache.stats()[:4])
+        self.assertEqual(first.width, second.width)
+        self.assertEqual(len(first.contents[0].contents), len(second.contents[0].contents))
+
+    def test_unreadable_entry_is_a_miss(self):
+        cache = DiskCache(self.directory)
+        data_to_rlg(DOCUMENT % 10, cache=cache)
+        key = cache_key(DOCUMENT % 10)
+        with open(cache._path(key), 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(cache.get(key))
+        self.assertFalse(os.path.exists(cache._path(key)))
+
+    def test_least_recently_used_are_evicted(self):
+        cache = DiskCache(self.directory)
+        data_to_rlg(DOCUMENT % 1, cache=cache)
+        cache.maxbytes = cache.stats().size * 5 // 2
+        data_to_rlg(DOCUMENT % 2, cache=cache)
+
+        # make the first entry the least recently used one, by a margin
+        path = cache._path(cache_key(DOCUMENT % 2))
+        os.utime(path, (os.stat(path).st_atime - 60, os.stat(path).st_mtime - 60))
+        data_to_rlg(DOCUMENT % 3, cache=cache)
+
+        self.assertEqual(1, cache.evictions)
+        self.assertIsNotNone(cache.get(cache_key(DOCUMENT % 1)))
+        self.assertIsNone(cache.get(cache_key(DOCUMENT % 2)))
+        self.assertLessEqual(cache.stats().size, cache.maxbytes)
+
+    def test_size_is_bounded_with_many_writers(self):
+        # instances standing for processes sharing the directory
+        first, second = DiskCache(self.directory), DiskCache(self.directory)
+        data_to_rlg(DOCUMENT % 1, cache=first)
+        maxbytes = first.stats().size * 9 // 2
+        for cache in (first, second):
+            cache.maxbytes = maxbytes
+            cache.SCAN_INTERVAL = 0
+        for width in range(2, 20):
+            data_to_rlg(DOCUMENT % width, cache=(first, second)[width % 2])
+            self.assertLessEqual(first.stats().size, maxbytes)
+
+    def test_stale_temporary_files_are_removed(self):
+        cache = DiskCache(self.directory)
+        data_to_rlg(DOCUMENT % 1, cache=cache)
+        subdirectory = os.path.dirname(cache._path(cache_key(DOCUMENT % 1)))
+        stale, fresh = [os.path.join(subdirectory, name + DiskCache.TEMP_SUFFIX) for name in ('stale', 'fresh')]
+        for path in (stale, fresh):
+            with open(path, 'wb') as f:
+                f.write(b'partial')
+        modified = time.time() - DiskCache.TEMP_MAX_AGE - 60
+        os.utime(stale, (modified, modified))
+
+        cache.clear()
+        self.assertEqual(0, cache.stats().entries)
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(fresh))  # may still be written
+
+    def test_counts_from_threads(self):
+        cache = DiskCache(self.directory)
+        key = cache_key(DOCUMENT % 1)
+        data_to_rlg(DOCUMENT % 1, cache=cache)
+
+        def lookup():
+            for _ in range(50):
+                cache.get(key)
+                cache.get('0' * 40)
+
+        threads = [threading.Thread(target=lookup) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual((200, 201), cache.stats()[:2])
@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import unittest
+
+from lxml import etree
+from reportlab.graphics.shapes import Circle, Group, Path, Rect, String
+
+from svg2rlg import cull
+from svg2rlg.paths import ClippingPath
+from svg2rlg.render import SvgRenderer
+
+
+def rect(x, y, width=10, height=10):
+    return Rect(x, y, width, height, strokeColor=None)
+
+
+class TestBounds(unittest.TestCase):
+    def test_shape_bounds(self):
+        self.assertEqual((0, 0, 10, 10), cull.shape_bounds(rect(0, 0)))
+        self.assertEqual((-5, -5, 5, 5), cull.shape_bounds(Circle(0, 0, 5, strokeColor=None)))
+        stroked = Path(points=[0, 0, 10, 0], operators=[0, 1], strokeWidth=2, strokeMiterLimit=4)
+        self.assertEqual((-4, -4, 14, 4), cull.shape_bounds(stroked))
+        string = String(100, 0, 'text', fontName='Helvetica', fontSize=10)
+        x0, y0, x1, y1 = cull.shape_bounds(string)
+        self.assertTrue(x0 < 100 - 15 and x1 > 100 + 15 and y0 == -10 and y1 == 10)
+        self.assertIsNone(cull.shape_bounds(String(0, 0, 'text', fontName='Unknown')))
+
+    def test_transform_bounds(self):
+        self.assertEqual((-10, 0, 0, 20), cull.transform_bounds((0, 0, 10, 20), (-1, 0, 0, 1, 0, 0)))
+        x0, y0, x1, y1 = cull.transform_bounds((0, 0, 1, 1), (0.6, 0.8, -0.8, 0.6, 0, 0))
+        self.assertAlmostEqual(-0.8, x0)
+        self.assertAlmostEqual(1.4, y1)
+
+
+class TestCull(unittest.TestCase):
+    def test_cull_group(self):
+        inside, across, outside = rect(10, 10), rect(95, 95), rect(200, 0)
+        moved = Group(rect(10, 10))
+        moved.translate(500, 0)
+        shared = Group(outside, inside)
+        clipped = Group(ClippingPath(points=[300, 300, 310, 300, 310, 310], operators=[0, 1, 1, 3]), rect(0, 0, 500, 500))
+        root = Group(inside, across, outside, moved, shared, clipped)
+
+        stats = cull.cull_group(root, (0, 0, 100, 100))
+        self.assertEqual((4, 3), stats[:2])
+        self.assertTrue(stats.bytes > 0)
+        self.assertEqual([inside, across], root.contents[:2])
+        self.assertEqual([inside], root.contents[2].contents)
+        self.assertEqual(3, len(root.contents))
+        self.assertEqual([outside, inside], shared.contents)
+
+    def test_keeps_unknown_and_clipping(self):
+        unknown = String(1000, 1000, 'text', fontName='Unknown')
+        clip = ClippingPath(points=[0, 0, 10, 0, 10, 10], operators=[0, 1, 1, 3])
+        group = Group(clip, rect(-100, -100, 50, 50), rect(0, 0))
+        root = Group(unknown, group)
+        cull.cull_group(root, (0, 0, 100, 100))
+        self.assertIs(unknown, root.contents[0])
+        self.assertEqual([clip, group.contents[2]], root.contents[1].contents)
+
+    def test_renderer(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+            '<rect x="10" y="10" width="10" height="10"/>'
+            '<g transform="translate(1000 0)"><rect width="10" height="10"/><circle r="5"/></g>'
+            '<rect x="100" y="100" width="10" height="10" stroke="black" stroke-width="4"/>'
+            '</svg>'
+        )
+        renderer = SvgRenderer(cull=True)
+        drawing = renderer.render(svg)
+        self.assertEqual((1, 2), renderer.stats['cull'][:2])
+        self.assertEqual(2, len(drawing.contents[0].contents))
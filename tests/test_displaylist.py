@@ -0,0 +1,113 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import pickle
+import unittest
+
+from lxml import etree
+from reportlab.graphics.shapes import Group, mmult
+
+from svg2rlg import api, displaylist
+from svg2rlg.optimize import IDENTITY, is_clipping
+from svg2rlg.paths import NoStrokePath
+from svg2rlg.render import DisplayListRenderer
+from svg2rlg.text import string_width
+
+DOCUMENT = """<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     width="200" height="100" fill="red">
+  <defs>
+    <clipPath id="outer"><rect x="0" y="0" width="50" height="50"/></clipPath>
+    <clipPath id="inner"><rect x="2" y="2" width="20" height="20"/></clipPath>
+    <path id="triangle" d="M0 0 L10 0 L5 10 Z" stroke="blue" stroke-dasharray="2 1"/>
+  </defs>
+  <g transform="translate(5, 5)" stroke="green" clip-path="url(#outer)">
+    <rect width="10" height="10" fill-opacity="0.5"/>
+    <g clip-path="url(#inner)"><circle cx="5" cy="5" r="2"/><use xlink:href="#triangle" x="20"/></g>
+    <path d="M0 0 L10 10 L0 10" fill="blue"/>
+  </g>
+  <text x="100" y="50" font-size="10" text-anchor="middle">middle</text>
+  <path d="M0 0 H10 V10 H0 Z M2 2 H8 V8 H2 Z" fill-rule="evenodd" stroke="none"/>
+  <rect width="5" height="5" fill="none"/>
+</svg>
+"""
+
+
+def drawn_shapes(shape, transform=IDENTITY):
+    """
+    (shape, absolute transform) of the shapes of a drawing that draw something
+    """
+    if isinstance(shape, Group):
+        transform = mmult(transform, shape.transform)
+        for child in shape.contents:
+            for item in drawn_shapes(child, transform):
+                yield item
+    elif not is_clipping(shape):
+        stroked = getattr(shape, 'strokeColor', None) is not None and not isinstance(shape, NoStrokePath)
+        if getattr(shape, 'fillColor', None) is not None or stroked:
+            yield shape, tuple(transform)
+
+
+class TestDisplayList(unittest.TestCase):
+    def setUp(self):
+        self.display_list = api.data_to_display_list(DOCUMENT)
+
+    def test_same_shapes_as_drawing(self):
+        expected = list(drawn_shapes(api.data_to_rlg(DOCUMENT)))
+        commands = self.display_list.commands
+        self.assertEqual((200, 100), (self.display_list.width, self.display_list.height))
+        self.assertEqual(len(expected), len(commands))
+        for (shape, transform), command in zip(expected, commands):
+            self.assertEqual(transform, command.transform)
+            kind = displaylist.TextCommand if shape.__class__.__name__ == 'String' else displaylist.PathCommand
+            self.assertIsInstance(command, kind)
+
+    def test_styles_are_resolved(self):
+        rect, circle, triangle, closed_copy, open_path, text, holed = self.display_list.commands
+        self.assertEqual((1.0, 0.0, 0.0, 0.5), rect.fill.color)
+        self.assertAlmostEqual(0.5, rect.stroke.color[1], places=2)
+        self.assertEqual((2, 1), triangle.stroke.dashes)
+        self.assertIs(circle.stroke, rect.stroke)  # equal styles are shared
+        # the open path is stroked only, its fill is drawn by a closed copy
+        self.assertEqual((None, rect.stroke), (open_path.fill, open_path.stroke))
+        self.assertEqual((None, (0.0, 0.0, 1.0, 1.0)), (closed_copy.stroke, closed_copy.fill.color))
+        self.assertEqual(displaylist.EVENODD, holed.fill.rule)
+        self.assertEqual([0, 1, 1, 1, 3, 0, 1, 1, 1, 3], list(holed.operators))
+        self.assertEqual(displaylist.NONZERO, rect.fill.rule)
+
+    def test_transforms_are_absolute(self):
+        rect, circle, triangle = self.display_list.commands[:3]
+        self.assertEqual((1, 0, 0, -1, 5, 95), rect.transform)
+        self.assertEqual((1, 0, 0, -1, 25, 95), triangle.transform)
+        self.assertEqual([0, 0, 10, 0, 5, 10], list(triangle.points))
+
+    def test_clip_paths(self):
+        rect, circle, triangle, closed_copy, open_path, text, holed = self.display_list.commands
+        outer, inner = self.display_list.clips
+        self.assertEqual((None, 0), (outer.parent, inner.parent))
+        self.assertEqual((0, 1, 1, 0), (rect.clip, circle.clip, triangle.clip, closed_copy.clip))
+        self.assertEqual((None, None), (text.clip, holed.clip))
+        self.assertEqual((1, 0, 0, -1, 5, 95), inner.transform)
+
+    def test_text_anchor_is_resolved(self):
+        text = self.display_list.commands[5]
+        self.assertEqual('middle', text.text)
+        width = string_width('middle', text.font_name, 10)
+        self.assertAlmostEqual(100 - width / 2.0, text.x)
+
+    def test_pickles(self):
+        loaded = pickle.loads(pickle.dumps(self.display_list, pickle.HIGHEST_PROTOCOL))
+        self.assertEqual(self.display_list, loaded)
+        self.assertIs(loaded.commands[0].stroke, loaded.commands[1].stroke)
+
+    def test_no_drawing_is_made(self):
+        renderer = DisplayListRenderer()
+        result = renderer.render(etree.fromstring(DOCUMENT))
+        self.assertEqual(7, renderer.stats['commands'])
+        self.assertEqual(self.display_list, result)
+        # only the shapes of the <use>d definitions are kept
+        self.assertEqual(['triangle'], [ref for ref, _ in renderer.instances])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,206 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import base64
+import os
+import pickle
+import shutil
+import tempfile
+import threading
+import unittest
+
+from PIL import Image as PILImage
+from reportlab import rl_config
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Group, Image
+
+from svg2rlg import api, images, settings, utils
+
+
+def encoded(format, size=(4, 3), color='red'):
+    data = utils.BytesIO()
+    PILImage.new('RGB', size, color).save(data, format)
+    return data.getvalue()
+
+
+def data_uri(format, mime, size=(4, 3), color='red'):
+    return 'data:image/%s;base64,%s' % (mime, base64.b64encode(encoded(format, size, color)).decode('ascii'))
+
+
+def document(*hrefs):
+    return (
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink" '
+        'width="100" height="100">%s</svg>' % ''.join(
+            '<image x="10" y="20" width="8" height="6" xlink:href="%s"/>' % href for href in hrefs)
+    )
+
+
+def converted_images(drawing):
+    """
+    The Image shapes of a drawing
+    """
+    result = []
+    for shape in drawing.contents:
+        if isinstance(shape, Group):
+            result.extend(converted_images(shape))
+        elif isinstance(shape, Image):
+            result.append(shape)
+    return result
+
+
+class TestDataUri(unittest.TestCase):
+    def test_formats(self):
+        for format, mime in (('PNG', 'png'), ('GIF', 'gif'), ('JPEG', 'jpeg'), ('JPEG', 'jpg')):
+            image = images.decode_data_uri(data_uri(format, mime))
+            self.assertIsInstance(image, images.EmbeddedImage)
+            self.assertEqual((format, (4, 3)), (image.format, image.size))
+
+    def test_unsupported_or_broken(self):
+        self.assertIsNone(images.decode_data_uri('data:image/svg+xml;base64,PHN2Zy8+'))
+        self.assertIsNone(images.decode_data_uri('data:image/png;base64,bm90IGFuIGltYWdl'))
+        self.assertIsNone(images.decode_data_uri('data:image/png;base64,%%%'))
+
+    def test_same_data_same_image(self):
+        href = data_uri('PNG', 'png', color='blue')
+        image = images.decode_data_uri(href)
+        # line breaks in the attribute don't matter
+        wrapped = href[:40] + '\n  ' + href[40:]
+        self.assertIs(image, images.decode_data_uri(wrapped))
+        self.assertIsNot(image, images.decode_data_uri(data_uri('PNG', 'png', color='green')))
+
+    def test_pickled_as_encoded_data(self):
+        href = data_uri('PNG', 'png', size=(200, 200))
+        image = images.decode_data_uri(href)
+        image.load()  # decodes the pixels
+        pickled = pickle.dumps(image, pickle.HIGHEST_PROTOCOL)
+        self.assertLess(len(pickled), len(image.data) + 200)
+        self.assertEqual((200, 200), pickle.loads(pickled).size)
+
+
+class TestConvertImage(unittest.TestCase):
+    def setUp(self):
+        self.saved = rl_config.pageCompression
+        rl_config.pageCompression = 0
+
+    def tearDown(self):
+        rl_config.pageCompression = self.saved
+
+    def test_deduplicated_in_memory(self):
+        png, jpeg = data_uri('PNG', 'png'), data_uri('JPEG', 'jpeg')
+        first, second, third = converted_images(api.data_to_rlg(document(png, jpeg, png)))
+        self.assertIsInstance(first.path, images.EmbeddedImage)  # no file
+        self.assertIs(first.path, third.path)
+        self.assertIsNot(first.path, second.path)
+        # and across documents
+        self.assertIs(first.path, converted_images(api.data_to_rlg(document(png)))[0].path)
+
+    def test_drawn_upright(self):
+        drawing = api.data_to_rlg(document(data_uri('PNG', 'png'), data_uri('JPEG', 'jpeg')))
+        png, jpeg = converted_images(drawing)
+        self.assertEqual((10, -26, 8, 6), (png.x, png.y, png.width, png.height))
+        pdf = renderPDF.drawToString(drawing)
+        self.assertEqual(2, pdf.count(b'\nBI '))
+        self.assertEqual(1, pdf.count(b'/DCT]'))  # JPEG data copied as it is
+
+
+class TestImageFile(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.document = os.path.join(self.directory, 'label.svg')
+        self.write('photo.png', encoded('PNG'))
+        self.write('text.png', b'not an image')
+        self.headers = []
+        self.original_header = images._header
+
+        def header(fp):
+            self.headers.append(fp)
+            return self.original_header(fp)
+
+        images._header = header
+        self.saved = rl_config.pageCompression
+        rl_config.pageCompression = 0
+
+    def tearDown(self):
+        rl_config.pageCompression = self.saved
+        images._header = self.original_header
+        shutil.rmtree(self.directory)
+
+    def write(self, name, data):
+        with open(os.path.join(self.directory, name), 'wb') as f:
+            f.write(data)
+
+    def convert(self, *names):
+        return converted_images(api.data_to_rlg(document(*names), file_path=self.document))
+
+    def test_read_once(self):
+        first, second = self.convert('photo.png', 'photo.png')
+        self.assertIsInstance(first.path, images.FileImage)
+        self.assertIs(first.path, second.path)
+        self.assertEqual(('PNG', 'RGB', (4, 3)), (first.path.format, first.path.mode, first.path.size))
+        self.assertIs(first.path, self.convert('photo.png')[0].path)
+        self.assertEqual(1, len(self.headers))
+
+    def test_changed_file_is_read_again(self):
+        image = images.open_image_file(os.path.join(self.directory, 'photo.png'))
+        self.write('photo.png', encoded('PNG', size=(40, 30)))
+        changed = images.open_image_file(os.path.join(self.directory, 'photo.png'))
+        self.assertEqual((40, 30), changed.size)
+        self.assertIsNot(image, changed)
+
+    def test_invalid_or_missing(self):
+        self.assertEqual([], self.convert('text.png', 'text.png', 'missing.png'))
+        self.assertEqual(1, len(self.headers))  # remembered as invalid
+
+    def test_pixels_decoded_when_drawn(self):
+        image = self.convert('photo.png')[0].path
+        image.unload()
+        self.assertIsNone(image._image)
+        self.assertEqual(1, renderPDF.drawToString(api.data_to_rlg(
+            document('photo.png'), file_path=self.document)).count(b'\nBI '))
+        self.assertIsNotNone(image._image)
+        self.assertEqual(image.path, pickle.loads(pickle.dumps(image)).path)
+
+    def test_decoded_pixels_are_bounded(self):
+        self.write('large.png', encoded('PNG', size=(100, 100)))
+        small, large = [image.path for image in self.convert('photo.png', 'large.png')]
+        saved = settings.IMAGE_PIXEL_BYTES
+        settings.IMAGE_PIXEL_BYTES = 100 * 100 * 3
+        try:
+            small.image, large.image
+            self.assertIsNone(small._image)
+            self.assertIsNotNone(large._image)
+        finally:
+            settings.IMAGE_PIXEL_BYTES = saved
+            large.unload()
+
+    def test_images_are_decoded_concurrently(self):
+        self.write('other.png', encoded('PNG', color='blue'))
+        slow, other = [image.path for image in self.convert('photo.png', 'other.png')]
+        slow.unload()
+        other.unload()
+        opening, release = threading.Event(), threading.Event()
+
+        def open_slowly():
+            opening.set()
+            release.wait(2)
+            return images.FileImage.open(slow)
+
+        slow.open = open_slowly
+        thread = threading.Thread(target=lambda: slow.image)
+        thread.start()
+        try:
+            opening.wait(2)
+            other.image
+            # decoded while the first image is still being decoded
+            self.assertTrue(thread.is_alive())
+        finally:
+            release.set()
+            thread.join()
+            del slow.open
+        self.assertIsNotNone(slow._image)
+        slow.unload()
+        other.unload()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import glob
+import os
+import unittest
+
+from reportlab.graphics.shapes import Group, Rect, mmult
+
+from svg2rlg import data_to_rlg, optimize
+from svg2rlg.paths import ClippingPath
+
+SAMPLES = os.path.join(os.path.dirname(__file__), 'samples', 'misc', '*.svg')
+
+
+def flatten(group, transform=optimize.IDENTITY, clips=()):
+    """
+    What a drawing renders: every shape with its transform and the clipping paths
+    (with theirs) in effect
+    """
+    transform = tuple(round(v, 9) for v in mmult(transform, group.transform))
+    drawn = []
+    for child in group.contents:
+        if isinstance(child, Group):
+            drawn.extend(flatten(child, transform, clips))
+        elif optimize.is_clipping(child):
+            clips = clips + ((id(child), transform),)
+        else:
+            drawn.append((id(child), transform, clips))
+    return drawn
+
+
+class TestOptimizeGroup(unittest.TestCase):
+    def test_collapses_groups(self):
+        a, b, c = Rect(0, 0, 1, 1), Rect(0, 0, 2, 2), Rect(0, 0, 3, 3)
+        inner = Group(a)
+        inner.translate(5, 0)
+        outer = Group(inner)
+        outer.scale(2, 2)
+        root = Group(Group(), Group(Group(b)), outer, c)
+        expected = flatten(root)
+
+        stats = optimize.optimize_group(root)
+        self.assertEqual((9, 5), stats)
+        self.assertEqual(expected, flatten(root))
+        self.assertEqual([b, c], [root.contents[0], root.contents[2]])
+        self.assertEqual((2, 0, 0, 2, 10, 0), tuple(root.contents[1].transform))
+        # the original groups are left alone
+        self.assertEqual((1, 0, 0, 1, 5, 0), tuple(inner.transform))
+
+    def test_keeps_clipping_scopes(self):
+        clip, a, b = ClippingPath(), Rect(0, 0, 1, 1), Rect(0, 0, 2, 2)
+        root = Group(Group(Group(clip, Group(a))), b)
+        expected = flatten(root)
+
+        optimize.optimize_group(root)
+        self.assertEqual(expected, flatten(root))
+        self.assertEqual(2, len(root.contents))
+        self.assertEqual([clip, a], root.contents[0].contents)
+
+    def test_samples_render_the_same(self):
+        for path in glob.glob(SAMPLES):
+            with open(path, 'rb') as f:
+                data = f.read()
+            expected = data_to_rlg(data)
+            result = data_to_rlg(data, optimize=True)
+            self.assertEqual(
+                [t for _, t, _ in flatten(expected)], [t for _, t, _ in flatten(result)], path
+            )
+            self.assertLessEqual(optimize.count_nodes(result), optimize.count_nodes(expected), path)
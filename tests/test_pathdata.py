@@ -0,0 +1,129 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import random
+import unittest
+
+from reportlab.graphics.shapes import Path
+
+from svg2rlg import pathdata, utils
+from svg2rlg.paths import CompactPath
+
+
+class TestParsePathData(unittest.TestCase):
+    longMessage = True
+
+    def assertParsed(self, d, ops, args):
+        result = pathdata.parse_path_data(d)
+        self.assertEqual(ops, result.ops, "ops for %r" % d)
+        self.assertEqual(args, list(result.args), "args for %r" % d)
+
+    def test_empty(self):
+        self.assertParsed("", "", [])
+        self.assertParsed(None, "", [])
+
+    def test_implicit_lineto_after_moveto(self):
+        self.assertParsed("M 10 20 30 40", "ML", [10, 20, 30, 40])
+        self.assertParsed("m 10 20 30 40 50 60", "mll", [10, 20, 30, 40, 50, 60])
+
+    def test_explicit_moveto_starts_new_subpath(self):
+        self.assertParsed("M 10 20, M 30 40, L 40 40, Z", "MMLZ", [10, 20, 30, 40, 40, 40])
+
+    def test_repeated_commands(self):
+        self.assertParsed("M0 0c1 2 3 4 5 6 7 8 9 10 11 12", "Mcc", [0, 0] + list(range(1, 13)))
+
+    def test_squashed_numbers(self):
+        self.assertParsed("M-.5.5.5-1", "ML", [-0.5, 0.5, 0.5, -1])
+        self.assertParsed("M1.5.25l-.3-.4", "Ml", [1.5, 0.25, -0.3, -0.4])
+
+    def test_exponents(self):
+        self.assertParsed("M1e2-1E-2L+2.5e+1,3e0", "ML", [100, -0.01, 25, 3])
+
+    def test_squashed_arc_flags(self):
+        self.assertParsed("M0 0a25 25 -30 0150-25", "Ma", [0, 0, 25, 25, -30, 0, 1, 50, -25])
+
+    def test_stops_at_first_error(self):
+        self.assertParsed("M 1 2 L 3 4 5 Z", "ML", [1, 2, 3, 4])
+        self.assertParsed("M 1 2 z 3", "Mz", [1, 2])
+        self.assertParsed("M 1 2 L 3 4 X 5 6", "ML", [1, 2, 3, 4])
+        self.assertParsed("L 1 2", "", [])
+        self.assertParsed("M 0 0 a 1 1 0 2 1 5 5", "M", [0, 0])
+
+    def test_matches_normalize_svg_path(self):
+        # the parser replaces normalize_svg_path in convert_path; both give the same
+        # segments, except for consecutive movetos, which the parser keeps as such, and
+        # exponents, which normalize_svg_path splits at the "e"
+        for d in [
+            "m246.026 120.178c-.558-.295-1.186-.768-1.395-1.054-.314-.438-.132-.456 1.163-.104 "
+            "2.318.629 3.814.383 5.298-.873l1.308-1.103 1.54.784z",
+            "M 10 20 L 30 40, 40 40, Z m 1 2 3 4",
+            "M0 0 A5 5 0 0 1 10 0 q1 2 3 4 t1 1 H3 v2 s1 2 3 4 C1 2 3 4 5 6 h-10 V.5",
+        ]:
+            ops, args = pathdata.parse_path_data(d)
+            parsed, i = [], 0
+            for op in ops:
+                n = i + pathdata.ARG_COUNT[op]
+                parsed.extend([op, list(args[i:n])])
+                i = n
+            self.assertEqual(utils.normalize_svg_path(d), parsed, d)
+
+
+class TestBuildPath(unittest.TestCase):
+    longMessage = True
+
+    PATHS = [
+        "M10 10 l5 0 0 5 -5 0 z m20 0 h5 v5 h-5 z",
+        "m10 10 5 5 M0 0 L5 5 10 0 m1 1 2 2",
+        "M0 0 C0 10 10 10 10 0 S20 -10 20 0 s10 10 20 0 c1 2 3 4 5 6 S1 1 2 2",
+        "M0 0 Q5 10 10 0 T20 0 t10 0 10 0 q1 1 2 0 t5 5 L3 3 T4 4 z l1 1",
+        "M0 0 A5 5 0 0 1 10 0 a5 5 0 1 0 10 0 a0 5 0 0 0 5 5 l1 1 z A1 1 0 0 0 4 4",
+    ]
+
+    def build(self, d, use_numpy, path_class=Path):
+        path = path_class()
+        ops, args = pathdata.parse_path_data(d)
+        unclosed = pathdata.build_path(path, ops, args, use_numpy=use_numpy)
+        return path, unclosed
+
+    def test_unclosed_subpaths(self):
+        path, unclosed = self.build("M0 0 L1 1 M2 2 L3 3 Z M4 4 L5 5", use_numpy=False)
+        self.assertEqual([2], unclosed)
+
+    def random_path(self, segments, commands, origin=100, seed=0):
+        # absolute coordinates around `origin`, relative ones small; arcs are often
+        # too small for their end points and scaled up, which magnifies any rounding
+        rnd = random.Random(seed)
+        parts = ["M%d %d" % (origin, origin)]
+        for _ in range(segments):
+            op = rnd.choice(commands)
+            numbers = [rnd.uniform(-50, 50) + (0 if op.islower() else origin)
+                       for _ in range(pathdata.ARG_COUNT[op])]
+            if op in "aA":
+                numbers[:5] = [rnd.uniform(1, 20), rnd.uniform(1, 20), rnd.uniform(-90, 90),
+                               rnd.randint(0, 1), rnd.randint(0, 1)]
+            parts.append(op + " ".join("%.4f" % v for v in numbers))
+        return " ".join(parts)
+
+    def assertSameAsPythonEngine(self, d):
+        expected, expected_unclosed = self.build(d, use_numpy=False)
+        for path_class in (Path, CompactPath):
+            result, unclosed = self.build(d, use_numpy=True, path_class=path_class)
+            self.assertEqual(list(expected.operators), list(result.operators), d[:80])
+            self.assertEqual(expected_unclosed, unclosed, d[:80])
+            self.assertEqual(list(expected.points), list(result.points), d[:80])
+
+    @unittest.skipIf(pathdata.numpy is None, "NumPy is not installed")
+    def test_numpy_engine_matches_python_engine(self):
+        for d in self.PATHS:
+            self.assertSameAsPythonEngine(d)
+
+    @unittest.skipIf(pathdata.numpy is None, "NumPy is not installed")
+    def test_numpy_engine_matches_python_engine_on_arcs(self):
+        self.assertSameAsPythonEngine(self.random_path(2000, "aAlLzm"))
+
+    @unittest.skipIf(pathdata.numpy is None, "NumPy is not installed")
+    def test_numpy_engine_matches_python_engine_at_large_coordinates(self):
+        # e.g. UTM coordinates, where summing the whole path rounds visibly
+        self.assertSameAsPythonEngine(self.random_path(50000, "lL", origin=4000000))
+        for seed, commands in enumerate(["MmLlHhVvCcSsQqTtAaZz", "mlzZ", "mlqtTz"]):
+            self.assertSameAsPythonEngine(self.random_path(3000, commands, origin=4000000, seed=seed))
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import unittest
+from array import array
+
+from reportlab.graphics.shapes import Group, Path, PolyLine, Rect
+
+from svg2rlg import data_to_rlg, quantize
+from svg2rlg.pathdata import OP_CLOSEPATH, OP_CURVETO, OP_LINETO, OP_MOVETO
+
+
+class TestQuantize(unittest.TestCase):
+    def test_round_points(self):
+        self.assertEqual([1.23, 0.0, 2.0], quantize.round_points([1.2345, -0.0001, 1.999], 2))
+        points = quantize.round_points(array(str('d'), [1.2345, 2.5]), 1)
+        self.assertEqual(array(str('d'), [1.2, 2.5]), points)
+
+    def test_merge_points(self):
+        points = [0, 0, 0, 0, 1, 1, 1, 1, 2, 2, 3, 3, 4, 4]
+        operators = [OP_MOVETO, OP_LINETO, OP_LINETO, OP_LINETO, OP_CURVETO, OP_CLOSEPATH]
+        self.assertEqual(
+            ([0, 0, 0, 0, 1, 1, 2, 2, 3, 3, 4, 4],
+             [OP_MOVETO, OP_LINETO, OP_LINETO, OP_CURVETO, OP_CLOSEPATH]),
+            quantize.merge_points(points, operators),
+        )
+        self.assertEqual(([0, 0, 1, 1, 0, 0], None), quantize.merge_points([0, 0, 1, 1, 1, 1, 0, 0]))
+        self.assertEqual(([1, 1, 1, 1], None), quantize.merge_points([1, 1, 1, 1, 1, 1]))
+
+    def test_digits_for(self):
+        self.assertEqual(2, quantize.digits_for((1, 0, 0, -1, 5, 5), 2))
+        self.assertEqual(2, quantize.digits_for((0.1, 0, 0, 0.1, 0, 0), 2))
+        self.assertEqual(3, quantize.digits_for((10, 0, 0, 10, 0, 0), 2))
+        self.assertEqual(4, quantize.digits_for((0, 20, -20, 0, 0, 0), 2))
+
+    def test_quantize_group(self):
+        path = Path(points=[0.123456, 0, 1.5, 1, 1.504, 1], operators=[OP_MOVETO, OP_LINETO, OP_LINETO])
+        path.strokeWidth = 0.001
+        scaled = Group(path)
+        scaled.transform = (10.123456789, 0, 0, 10, 0.123456, 0)
+        rect = Rect(0.126, 1, 2, 3.3333)
+        root = Group(path, scaled, rect)
+
+        stats = quantize.quantize_group(root, 2)
+        self.assertEqual((18, 1), stats)
+        self.assertEqual([0.12, 0, 1.5, 1], root.contents[0].points)
+        self.assertEqual([OP_MOVETO, OP_LINETO], root.contents[0].operators)
+        self.assertEqual(0.001, root.contents[0].strokeWidth)
+        self.assertEqual((10.12346, 0, 0, 10, 0.12, 0), root.contents[1].transform)
+        self.assertEqual([0.1235, 0, 1.5, 1, 1.504, 1], root.contents[1].contents[0].points)
+        self.assertEqual((0.13, 1, 2, 3.33), (root.contents[2].x, root.contents[2].y,
+                                               root.contents[2].width, root.contents[2].height))
+        # nothing shared changes
+        self.assertEqual([0.123456, 0, 1.5, 1, 1.504, 1], path.points)
+        self.assertEqual(10.123456789, scaled.transform[0])
+        self.assertEqual(0.126, rect.x)
+
+    def test_renderer(self):
+        data = (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+            '<polyline fill="none" stroke="black" points="0.3333,1 0.3334,1 2.66666,3"/></svg>'
+        )
+        polyline = data_to_rlg(data, quantize_digits=1).contents[0].contents[0]
+        self.assertIsInstance(polyline, PolyLine)
+        self.assertEqual([0.3, 1, 2.7, 3], polyline.points)
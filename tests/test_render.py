@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import re
+import unittest
+
+from reportlab import rl_config
+from reportlab.graphics import renderPDF
+from reportlab.graphics.shapes import Group
+
+from lxml import etree
+
+from svg2rlg import api, render
+from svg2rlg.paths import ClippingPath
+
+DOCUMENT = """<?xml version="1.0"?>
+<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+     width="200" height="100" fill="red">
+  <!-- forward reference -->
+  <use xlink:href="#later" x="10" y="10"/>
+  <defs>
+    <clipPath id="clip"><rect x="0" y="0" width="50" height="50"/></clipPath>
+    <path id="triangle" d="M0 0 L10 0 L5 10 Z" stroke="blue"/>
+  </defs>
+  <g transform="translate(5, 5)" stroke="green" clip-path="url(#clip)">
+    <rect width="10" height="10"/>
+    <g fill="blue"><circle cx="5" cy="5" r="2"/><use xlink:href="#triangle"/></g>
+    <g display="none"><rect width="1" height="1"/></g>
+  </g>
+  <a><text x="1" y="2" font-size="8">link<tspan fill="green">!</tspan></text></a>
+  <g id="later" fill="yellow"><ellipse cx="1" cy="2" rx="3" ry="4"/></g>
+  <polyline points="0 0 10 10 20 0" fill="none" stroke="black"/>
+</svg>
+"""
+
+
+def structure(shape):
+    """
+    Comparable representation of a rendered shape tree
+    """
+    if isinstance(shape, Group):
+        return ('Group', tuple(shape.transform), [structure(s) for s in shape.contents])
+    properties = [(k, repr(v)) for k, v in shape.getProperties().items()]
+    return (shape.__class__.__name__, sorted((k, v) for k, v in properties if ' at 0x' not in v))
+
+
+class TestStreamingRenderer(unittest.TestCase):
+    def test_same_drawing_as_tree_renderer(self):
+        expected = api.data_to_rlg(DOCUMENT)
+        result = api.data_to_rlg(DOCUMENT, streaming=True)
+        self.assertEqual((expected.width, expected.height), (result.width, result.height))
+        self.assertEqual(structure(expected.contents[0]), structure(result.contents[0]))
+
+    def test_converted_elements_are_discarded(self):
+        renderer = render.StreamingSvgRenderer()
+        root = []
+        original_finish = renderer.finish
+
+        def finish(main_group):
+            root.append(renderer.definitions['later'].getroottree().getroot())
+            return original_finish(main_group)
+
+        renderer.finish = finish
+        renderer.render_stream(api.utils.BytesIO(DOCUMENT.encode('utf-8')))
+
+        # only the referenced definitions (and the elements containing them) are left
+        self.assertEqual(['use', 'defs', 'g'], [child.tag.split('}')[-1] for child in root[0]])
+        # and the styles of discarded elements are forgotten
+        for node in renderer.shape_converter.styles._styles:
+            self.assertIs(root[0], node.getroottree().getroot())
+
+    def test_groups_with_an_id_are_streamed(self):
+        # as Inkscape saves a drawing: an id on every element, a group per layer
+        document = """<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink"
+             width="100" height="100">
+          <g id="layer1" transform="translate(1, 2)">
+            <rect id="rect1" width="10" height="10"/>
+            <g id="g1"><circle id="circle1" cx="5" cy="5" r="2"/><path id="shared" d="M0 0 L5 5"/></g>
+          </g>
+          <clipPath id="clip"><rect id="rect2" width="50" height="50"/></clipPath>
+          <g id="layer2" clip-path="url(#clip)"><use id="use1" xlink:href="#shared" x="3"/></g>
+        </svg>"""
+        renderer = render.StreamingSvgRenderer()
+        result = renderer.render_stream(api.utils.BytesIO(document.encode('utf-8')))
+        expected = api.data_to_rlg(document)
+        self.assertEqual(structure(expected.contents[0]), structure(result.contents[0]))
+
+        # only the referenced definitions (and the elements containing them) are left
+        root = renderer.definitions['shared'].getroottree().getroot()
+        self.assertEqual(['layer1', 'clip'], [child.get('id') for child in root])
+        self.assertEqual(['g1'], [child.get('id') for child in root[0]])
+        self.assertEqual(['shared'], [child.get('id') for child in root[0][0]])
+        self.assertEqual(set(['shared', 'clip', 'rect2']), set(renderer.definitions))
+
+
+def page_operators(pdf):
+    """
+    The drawing operators of the (only) page of a PDF, without graphics state nesting
+    """
+    content = max(re.findall(br'stream\r?\n(.*?)endstream', pdf, re.S), key=len)
+    return [line for line in content.splitlines() if line not in (b'q', b'Q', b'1 0 0 1 0 0 cm')]
+
+
+class TestCanvasRenderer(unittest.TestCase):
+    def setUp(self):
+        self.saved = rl_config.pageCompression, rl_config.invariant
+        rl_config.pageCompression, rl_config.invariant = 0, 1
+
+    def tearDown(self):
+        rl_config.pageCompression, rl_config.invariant = self.saved
+
+    def test_same_page_as_drawing(self):
+        expected = renderPDF.drawToString(api.data_to_rlg(DOCUMENT))
+        out = api.utils.BytesIO()
+        api.data_to_pdf(DOCUMENT, out)
+        self.assertEqual(page_operators(expected), page_operators(out.getvalue()))
+        self.assertIn(b'/MediaBox [ 0 0 200 100 ]', out.getvalue())
+
+    def test_shapes_are_drawn_not_kept(self):
+        out = api.utils.BytesIO()
+        canvas = api.Canvas(out)
+        renderer = render.CanvasRenderer()
+        self.assertEqual((0, 0, 200, 100), renderer.render(etree.fromstring(DOCUMENT), canvas))
+        self.assertEqual(8, renderer.stats['shapes'])  # the clipping path included
+        # only the shapes of the <use>d definitions are kept
+        self.assertEqual(['later', 'triangle'], sorted(ref for ref, _ in renderer.instances))
+
+
+class TestUse(unittest.TestCase):
+    def test_definitions_are_rendered_once_per_style(self):
+        svg = etree.fromstring(DOCUMENT)
+        elements = len(list(svg.iter()))
+        renderer = render.SvgRenderer()
+        drawing = renderer.render(svg)
+
+        # the parsed tree is left alone
+        self.assertEqual(elements, len(list(svg.iter())))
+        self.assertEqual(set(['later', 'triangle']), set(ref for ref, style in renderer.instances))
+        # the forward reference is drawn at its position, as the element it refers to
+        use = drawing.contents[0].contents[0]
+        self.assertEqual((1, 0, 0, 1, 10, 10), tuple(use.transform))
+        later = drawing.contents[0].contents[-2]
+        self.assertEqual(structure(later), structure(use.contents[0]))
+
+    def test_uses_with_the_same_style_share_shapes(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+            '<defs><path id="p" d="M0 0 L1 1"/></defs>'
+            '<use xlink:href="#p" x="1"/><use xlink:href="#p" x="2"/><use xlink:href="#p" fill="red"/>'
+            '</svg>'
+        )
+        first, second, third = render.SvgRenderer().render(svg).contents[0].contents
+        self.assertEqual((1, 0, 0, 1, 1, 0), tuple(first.transform))
+        self.assertEqual((1, 0, 0, 1, 2, 0), tuple(second.transform))
+        self.assertIs(first.contents[0], second.contents[0])
+        self.assertIsNot(first.contents[0], third.contents[0])
+
+    def test_circular_references_are_ignored(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+            '<g id="a"><rect width="1" height="1"/><use xlink:href="#b"/></g>'
+            '<g id="b"><use xlink:href="#a"/></g>'
+            '</svg>'
+        )
+        render.SvgRenderer().render(svg)
+
+
+class TestForwardReferences(unittest.TestCase):
+    def test_clip_path_defined_later(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<g clip-path="url(#clip)"><rect width="10" height="10"/></g>'
+            '<clipPath id="clip"><rect width="5" height="5"/></clipPath>'
+            '</svg>'
+        )
+        group = render.SvgRenderer().render(svg).contents[0].contents[0]
+        self.assertIsInstance(group.contents[0], ClippingPath)
+
+    def test_use_defined_later_is_rendered_in_place(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+            '<use xlink:href="#r"/><defs><rect id="r" width="1" height="1"/></defs>'
+            '</svg>'
+        )
+        renderer = render.SvgRenderer()
+        use = renderer.render(svg).contents[0].contents[0]
+        self.assertEqual(1, len(use.contents))
+        self.assertFalse(renderer.waiting_use_nodes)
+
+
+class TestClipPaths(unittest.TestCase):
+    def test_converted_once_and_shared(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<clipPath id="clip"><rect width="5" height="5"/></clipPath>'
+            '<rect width="10" height="10" clip-path="url(#clip)"/>'
+            '<g clip-path="url(#clip)" transform="scale(2)"><rect width="10" height="10"/></g>'
+            '<g clip-path="url(#none)"><rect width="10" height="10"/></g>'
+            '</svg>'
+        )
+        renderer = render.SvgRenderer()
+        rect, group, unclipped = renderer.render(svg).contents[0].contents
+        self.assertIsInstance(rect.contents[0], ClippingPath)
+        self.assertIs(rect.contents[0], group.contents[0])
+        self.assertNotIsInstance(unclipped.contents[0], ClippingPath)
+        self.assertEqual(['clip'], list(renderer.clip_paths))
+
+    def test_path_geometry_is_copied(self):
+        svg = etree.fromstring(
+            '<svg xmlns="http://www.w3.org/2000/svg">'
+            '<clipPath id="clip"><path d="M0 0 L5 0 L5 5" transform="scale(2)"/></clipPath>'
+            '<rect width="10" height="10" clip-path="url(#clip)"/>'
+            '</svg>'
+        )
+        clipping = render.SvgRenderer().render(svg).contents[0].contents[0].contents[0]
+        self.assertIsInstance(clipping, ClippingPath)
+        self.assertEqual([0, 0, 10, 0, 10, 10], list(clipping.points))
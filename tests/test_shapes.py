@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import unittest
+from array import array
+
+from lxml import etree
+from reportlab.lib import colors
+from reportlab.pdfbase.pdfmetrics import stringWidth
+
+from svg2rlg.paths import CompactPath, NoStrokePath
+from svg2rlg.pathdata import OP_MOVETO, OP_LINETO, OP_CURVETO, OP_CLOSEPATH
+from svg2rlg.shapes import ShapeConverter
+
+
+def path_node(d, **attrs):
+    node = etree.Element("path", d=d)
+    for key, value in attrs.items():
+        node.set(key, value)
+    return node
+
+
+class TestConvertPath(unittest.TestCase):
+    def setUp(self):
+        self.converter = ShapeConverter(file_path=None)
+
+    def convert(self, d, **attrs):
+        return self.converter.convert_path(path_node(d, **attrs)).contents[-1]
+
+    def test_empty_path_is_skipped(self):
+        self.assertIsNone(self.converter.convert_path(path_node("")))
+
+    def test_relative_lines(self):
+        path = self.convert("m10 10 5 0 0 5h-5v-5")
+        self.assertEqual([10, 10, 15, 10, 15, 15, 10, 15, 10, 10], path.points)
+        self.assertEqual([OP_MOVETO] + [OP_LINETO] * 4, path.operators)
+
+    def test_current_point_after_close(self):
+        path = self.convert("M10 10 L20 10 Z l5 5")
+        self.assertEqual([10, 10, 20, 10, 15, 15], path.points)
+        self.assertEqual([OP_MOVETO, OP_LINETO, OP_CLOSEPATH, OP_LINETO], path.operators)
+
+    def test_smooth_cubic_reflects_previous_control_point(self):
+        path = self.convert("M0 0 C0 10 10 10 10 0 S20 -10 20 0")
+        self.assertEqual([0, 0, 0, 10, 10, 10, 10, 0, 10, -10, 20, -10, 20, 0], path.points)
+
+    def test_smooth_quadratic_reflects_previous_control_point(self):
+        path = self.convert("M0 0 Q5 10 10 0 T20 0")
+        # the reflected quadratic control point is (15, -10)
+        self.assertEqual([OP_MOVETO, OP_CURVETO, OP_CURVETO], path.operators)
+        expected = [40. / 3, -20. / 3, 50. / 3, -20. / 3, 20, 0]
+        self.assertEqual([round(v, 9) for v in expected], [round(v, 9) for v in path.points[8:]])
+
+    def test_filled_unclosed_path_gets_a_closed_copy(self):
+        group = self.converter.convert_path(path_node("M0 0 L1 1 L2 0 M5 5 L6 6 Z M9 9 L8 8", fill="red"))
+        closed, path = group.contents
+        self.assertIsInstance(closed, NoStrokePath)
+        self.assertIs(path.points, closed.points)
+        self.assertEqual(
+            [OP_MOVETO, OP_LINETO, OP_LINETO, OP_CLOSEPATH, OP_MOVETO, OP_LINETO, OP_CLOSEPATH,
+             OP_MOVETO, OP_LINETO, OP_CLOSEPATH],
+            closed.operators
+        )
+        self.assertEqual(colors.red, closed.fillColor)
+        self.assertEqual(0, closed.getProperties()['strokeWidth'])
+        self.assertIsNone(path.fillColor)
+
+    def test_shapes_with_the_same_style_do_not_share_dash_arrays(self):
+        first = self.convert("M0 0 L10 10", stroke="black", **{'stroke-dasharray': "2 1"})
+        second = self.convert("M0 0 L10 0", stroke="black", **{'stroke-dasharray': "2 1"})
+        self.assertEqual([2, 1], second.strokeDashArray)
+        first.strokeDashArray.append(3)
+        self.assertEqual([2, 1], second.strokeDashArray)
+
+    def test_compact_path(self):
+        converter = ShapeConverter(file_path=None, compact_paths=True)
+        group = converter.convert_path(path_node("M0 0 L1 1 L2 0", fill="red"))
+        closed, path = group.contents
+        self.assertIsInstance(path, CompactPath)
+        self.assertEqual(array(str('d'), [0, 0, 1, 1, 2, 0]), path.points)
+        self.assertEqual(array(str('b'), [OP_MOVETO, OP_LINETO, OP_LINETO]), path.operators)
+        self.assertIs(path.points, closed.points)
+        self.assertEqual([OP_MOVETO, OP_LINETO, OP_LINETO, OP_CLOSEPATH], list(closed.operators))
+        self.assertEqual((0, 0, 2, 1), path.getBounds())
+
+
+class TestConvertText(unittest.TestCase):
+    def setUp(self):
+        self.converter = ShapeConverter(file_path=None)
+
+    def test_fragments_follow_each_other(self):
+        node = etree.fromstring(
+            '<text x="10" y="20" font-family="Courier" font-size="10" fill="red">ab'
+            '<tspan fill="blue">cde</tspan><tspan dx="5">f</tspan><tspan x="0">g</tspan></text>'
+        )
+        strings = self.converter.convert_text(node).contents
+        self.assertEqual(["ab", "cde", "f", "g"], [s.text for s in strings])
+
+        width = stringWidth("a", "Courier", 10)
+        self.assertEqual([10, 10 + 2 * width, 10 + 5 * width + 5, 0], [s.x for s in strings])
+        self.assertEqual([colors.red, colors.blue, colors.red, colors.red], [s.fillColor for s in strings])
+        self.assertEqual(["Courier"] * 4, [s.fontName for s in strings])
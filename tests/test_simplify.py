@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import unittest
+from array import array
+
+from reportlab.graphics.shapes import Group, Path, Polygon, PolyLine
+
+from svg2rlg import data_to_rlg, simplify
+from svg2rlg.paths import CompactPath
+from svg2rlg.pathdata import OP_CLOSEPATH, OP_CURVETO, OP_LINETO, OP_MOVETO
+
+
+class TestDecimate(unittest.TestCase):
+    def test_decimate(self):
+        xs = [0, 1, 2, 3, 4, 5]
+        ys = [0, 0.01, -0.01, 2, 0, 0]
+        self.assertEqual([0, 2, 3, 4, 5], simplify.decimate(xs, ys, 0.1))
+        self.assertEqual([0, 5], simplify.decimate(xs, ys, 3))
+        self.assertEqual([0, 1], simplify.decimate([0, 1], [0, 0], 1))
+
+    def test_decimate_numpy(self):
+        if simplify.numpy is None:
+            self.skipTest("NumPy isn't installed")
+        xs = [float(i) for i in range(1000)]
+        ys = [(i % 7) * 0.01 + (100 if i == 500 else 0) for i in range(1000)]
+        self.assertEqual([0, 499, 500, 501, 999], simplify.decimate(xs, ys, 0.1))
+        self.assertEqual(simplify.decimate(xs, ys, 0.01), simplify.decimate(list(xs), ys, 0.01))
+
+    def test_points(self):
+        square = [0, 0, 1, 0, 2, 0, 2, 2, 0, 2, 0, 1]
+        self.assertEqual([0, 0, 2, 0, 2, 2, 0, 2], simplify.simplify_points(square, 0.1, closed=True))
+        self.assertIsNone(simplify.simplify_points([0, 0, 1, 0, 1, 1], 0.1, closed=True))
+        self.assertEqual([0, 0, 2, 0], simplify.simplify_points([0, 0, 1, 0, 2, 0], 0.1))
+
+    def test_path(self):
+        path = CompactPath()
+        path.moveTo(0, 0)
+        path.lineTo(1, 0.01)
+        path.lineTo(2, 0)
+        path.curveTo(3, 0.01, 4, -0.01, 5, 0)  # flat
+        path.lineTo(6, 0)
+        path.curveTo(7, 5, 8, 5, 9, 0)
+        path.closePath()
+        path.lineTo(0, 5)
+
+        points, operators = simplify.simplify_path(path, 0.1)
+        self.assertEqual(array(str('d'), [0, 0, 6, 0, 7, 5, 8, 5, 9, 0, 0, 5]), points)
+        self.assertEqual(
+            array(str('b'), [OP_MOVETO, OP_LINETO, OP_CURVETO, OP_CLOSEPATH, OP_LINETO]), operators
+        )
+        self.assertIsNone(simplify.simplify_path(path, 0.001))
+
+
+class TestSimplifyGroup(unittest.TestCase):
+    def test_scaled_tolerance(self):
+        line = PolyLine([0, 0, 1, 0.05, 2, 0])
+        shared = Group(line)
+        scaled = Group(shared)
+        scaled.scale(10, 10)
+        root = Group(shared, scaled, Polygon([0, 0, 1, 0, 2, 0, 2, 2]))
+
+        stats = simplify.simplify_group(root, 0.1)
+        self.assertEqual((10, 2), stats)
+        self.assertEqual([0, 0, 2, 0], root.contents[0].contents[0].points)
+        self.assertIs(line, root.contents[1].contents[0].contents[0])
+        self.assertEqual([0, 0, 2, 0, 2, 2], root.contents[2].points)
+        self.assertEqual([0, 0, 1, 0.05, 2, 0], line.points)
+        self.assertEqual([line], shared.contents)
+
+    def test_renderer(self):
+        points = ' '.join('%d,%s' % (i, i % 2 * 0.01) for i in range(100))
+        data = (
+            '<svg xmlns="http://www.w3.org/2000/svg" width="100" height="100">'
+            '<polyline fill="none" stroke="black" points="%s"/></svg>' % points
+        )
+        drawing = data_to_rlg(data, simplify_tolerance=0.5)
+        polyline = drawing.contents[0].contents[0]
+        self.assertEqual([0, 0, 99, 0.01], polyline.points)
+        self.assertIsInstance(data_to_rlg(data).contents[0].contents[0], PolyLine)
+        self.assertEqual(200, len(data_to_rlg(data).contents[0].contents[0].points))
+
+    def test_leaves_other_shapes(self):
+        path = Path()
+        self.assertEqual((0, 0), simplify.simplify_group(Group(path), 1))
@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*
+from __future__ import print_function, absolute_import, unicode_literals
+
+import unittest
+
+from lxml import etree
+
+from svg2rlg.style import StyleResolver, INITIAL_STYLE
+
+
+class TestStyleResolver(unittest.TestCase):
+    def setUp(self):
+        self.svg = etree.fromstring(
+            '<svg fill="red" stroke-width="2">'
+            '  <g style="stroke: blue; font-size: 10">'
+            '    <g fill="inherit" style="opacity: 0.5">'
+            '      <rect id="r" fill="green" style="fill: yellow; stroke: inherit"/>'
+            '      <circle id="c" style="fill: yellow"/>'
+            '    </g>'
+            '  </g>'
+            '</svg>'
+        )
+        self.resolver = StyleResolver()
+
+    def node(self, node_id):
+        return self.svg.xpath('//*[@id="%s"]' % node_id)[0]
+
+    def test_attribute_wins_over_style_declaration(self):
+        self.assertEqual('green', self.resolver.computed(self.node('r')).fill)
+
+    def test_style_declaration_wins_over_inherited_value(self):
+        self.assertEqual('yellow', self.resolver.computed(self.node('c')).fill)
+
+    def test_inherits_through_elements_with_unrelated_style(self):
+        style = self.resolver.computed(self.node('r'))
+        self.assertEqual('blue', style.stroke)
+        self.assertEqual('2', style.get('stroke-width'))
+        self.assertEqual('10', style.get('font-size'))
+
+    def test_unspecified_properties(self):
+        style = self.resolver.computed(self.node('c'))
+        self.assertEqual('', style.text_anchor)
+        self.assertEqual('start', style.get('text-anchor', 'start'))
+        self.assertEqual(INITIAL_STYLE, self.resolver.computed(etree.Element('rect')))
+
+    def test_styles_are_computed_once(self):
+        first = self.resolver.computed(self.node('r'))
+        self.assertIs(first, self.resolver.computed(self.node('r')))
+        # elements without any style of their own share their parent's record
+        parent = self.resolver.computed(self.svg[0])
+        self.assertIs(parent, self.resolver.computed(etree.SubElement(self.svg[0], 'rect')))
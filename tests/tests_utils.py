@@ -71,3 +71,15 @@ class TestUtils(unittest.TestCase):
             utils.convert_quadratic_path_to_cubic(*quadratic),
             cubic
         )
+
+    def test_lru_cache_discards_least_recently_used(self):
+        cache = utils.LRUCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        self.assertEqual(1, cache.get("a"))
+        cache.set("c", 3)
+        self.assertEqual(2, len(cache))
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(1, cache.get("a"))
+        self.assertEqual(3, cache.get("c"))
+        self.assertEqual((3, 1), (cache.hits, cache.misses))